@@ -12,7 +12,6 @@ from datetime import datetime, date, timedelta
 import locale
 import os
 from utils.data_manager import DataManager
-from categorias_completas import CategorizadorAutomatico
 from sistema_cartoes import gerenciador_cartoes
 from sistema_metas import gerenciador_metas
 from sistema_lembretes import gerenciador_lembretes
@@ -31,10 +30,13 @@ app.config.suppress_callback_exceptions = True
 app.title = "Nathfinance | Controle Financeiro Pessoal"
 
 data_manager = DataManager()
-df_raw = data_manager.load_data()
-categorizador = CategorizadorAutomatico()
+gerenciador_transacoes = data_manager.carregar_transacoes()
+
+def preparar_dataframe(df_raw):
+    """Converte o snapshot do livro para as colunas usadas pelos gráficos"""
+    if df_raw.empty:
+        return pd.DataFrame()
 
-if not df_raw.empty:
     df = df_raw.copy()
     mapeamento_colunas = {
         'Descrição': 'Descricao',
@@ -46,9 +48,24 @@ if not df_raw.empty:
         df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce')
 
     if 'Data' in df.columns:
-        df['Data'] = pd.to_datetime(df['Data'], format='%d/%m/%Y', errors='coerce')
-else:
-    df = pd.DataFrame()
+        df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+    return df
+
+# Callbacks leem snapshots imutáveis; escritas passam pelo gerenciador. O
+# store-dados guarda só a versão do livro, e cada versão é preparada uma vez
+_dados_preparados = (None, pd.DataFrame())
+
+def obter_dados_livro():
+    """DataFrame dos gráficos para o snapshot atual do livro"""
+    global _dados_preparados
+    snapshot = gerenciador_transacoes.snapshot()
+    versao, df_preparado = _dados_preparados
+    if versao != snapshot.versao:
+        df_preparado = preparar_dataframe(snapshot.dados)
+        _dados_preparados = (snapshot.versao, df_preparado)
+    return df_preparado
+
+df = obter_dados_livro()
 
 print(f"Carregadas {len(df)} transações")
 print("Iniciando Nathfinance | Controle Financeiro Pessoal...")
@@ -202,7 +219,7 @@ def criar_grafico_despesas_categoria(df):
         return go.Figure()
 
     despesas['Valor_Abs'] = abs(despesas['Valor'])
-    despesas_por_categoria = despesas.groupby('Categoria')['Valor_Abs'].sum().reset_index()
+    despesas_por_categoria = despesas.groupby('Categoria', observed=True)['Valor_Abs'].sum().reset_index()
     despesas_por_categoria['Categoria_Formatada'] = despesas_por_categoria['Categoria'].apply(formatar_categoria)
 
     cores = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8']
@@ -355,8 +372,8 @@ app.layout = dbc.Container([
     # Conteúdo das abas
     html.Div(id="conteudo-abas"),
 
-    # Store para dados
-    dcc.Store(id='store-dados', data=df.to_dict('records') if not df.empty else []),
+    # Store com a versão do livro exibida; os callbacks leem o snapshot dela
+    dcc.Store(id='store-dados', data=gerenciador_transacoes.versao),
 
     # Modal de exportação
     dbc.Modal([
@@ -407,8 +424,8 @@ app.layout = dbc.Container([
     Output('card-saldo', 'children'),
     Input('store-dados', 'data')
 )
-def atualizar_card_saldo(dados):
-    df = pd.DataFrame(dados) if dados else pd.DataFrame()
+def atualizar_card_saldo(versao):
+    df = obter_dados_livro()
     return criar_card_saldo(df)
 
 # Callback para atualizar cards de resumo
@@ -416,8 +433,8 @@ def atualizar_card_saldo(dados):
     Output('cards-resumo', 'children'),
     Input('store-dados', 'data')
 )
-def atualizar_cards_resumo(dados):
-    df = pd.DataFrame(dados) if dados else pd.DataFrame()
+def atualizar_cards_resumo(versao):
+    df = obter_dados_livro()
     return criar_cards_resumo(df)
 
 # Callback para alertas
@@ -425,7 +442,7 @@ def atualizar_cards_resumo(dados):
     Output('alertas-container', 'children'),
     Input('store-dados', 'data')
 )
-def atualizar_alertas(dados):
+def atualizar_alertas(versao):
     alertas = gerenciador_lembretes.gerar_alertas()
 
     if not alertas:
@@ -457,8 +474,8 @@ def atualizar_alertas(dados):
     [Input('tabs-navegacao', 'active_tab'),
      Input('store-dados', 'data')]
 )
-def atualizar_conteudo_abas(aba_ativa, dados):
-    df = pd.DataFrame(dados) if dados else pd.DataFrame()
+def atualizar_conteudo_abas(aba_ativa, versao):
+    df = obter_dados_livro()
 
     if aba_ativa == "resumo":
         return [
@@ -915,16 +932,16 @@ def toggle_modal_exportacao(btn_exportar, btn_cancelar, btn_confirmar, is_open):
     [State('formato-exportacao', 'value'),
      State('store-dados', 'data')]
 )
-def processar_exportacao(n_clicks, formato, dados):
+def processar_exportacao(n_clicks, formato, versao):
     if not n_clicks:
         return []
 
     try:
         # Preparar dados completos
-        df_transacoes = pd.DataFrame(dados) if dados else pd.DataFrame()
+        df_transacoes = obter_dados_livro()
 
         dados_completos = {
-            'transacoes': dados if dados else [],
+            'transacoes': df_transacoes.to_dict('records'),
             'cartoes': gerenciador_cartoes.exportar_para_dict()['cartoes'],
             'metas': gerenciador_metas.exportar_para_dict()['metas'],
             'orcamentos': gerenciador_metas.exportar_para_dict()['orcamentos'],
@@ -972,45 +989,28 @@ def processar_exportacao(n_clicks, formato, dados):
      State('store-dados', 'data')],
     prevent_initial_call=True
 )
-def adicionar_transacao(n_clicks, data_input, tipo, descricao, valor, dados_atuais):
+def adicionar_transacao(n_clicks, data_input, tipo, descricao, valor, versao_atual):
     if not n_clicks:
-        return dados_atuais or []
+        return versao_atual
 
     if not descricao or not valor:
         print("Descrição ou valor não fornecidos")
-        return dados_atuais or []
+        return versao_atual
 
     try:
-        # Preparar nova transação
-        nova_transacao = {
-            'Data': data_input,
-            'Tipo': tipo,
-            'Categoria': categorizador.categorizar_transacao(descricao),
-            'Descrição': descricao,
-            'Valor (R$)': float(valor) if tipo == 'entrada' else -float(valor),
-            'Recorrente': 'Não',
-            'Semana': 1,
-            'Saldo Acumulado': 0,
-            '% do Salário': '',
-            'Meta 50-30-20': ''
-        }
-
-        # Adicionar aos dados existentes
-        if dados_atuais:
-            dados_atuais.append(nova_transacao)
-        else:
-            dados_atuais = [nova_transacao]
+        valor_transacao = float(valor) if tipo == 'entrada' else -float(valor)
+        data_transacao = pd.to_datetime(data_input).date() if data_input else date.today()
 
-        # Salvar no CSV
-        df_novo = pd.DataFrame(dados_atuais)
-        data_manager.save_data(df_novo)
+        # Persistida pelo diário do DataManager (um append com fsync)
+        gerenciador_transacoes.adicionar_transacao(data_transacao, descricao, valor_transacao)
 
+        # Os callbacks que dependem do store puxam o snapshot da nova versão
         print(f"Transação adicionada: {descricao} - R$ {valor}")
-        return dados_atuais
+        return gerenciador_transacoes.versao
 
     except Exception as e:
         print(f"Erro ao adicionar transação: {str(e)}")
-        return dados_atuais or []
+        return versao_atual
 
 
 
@@ -0,0 +1 @@
+# Módulo de benchmarks do FinTrack360
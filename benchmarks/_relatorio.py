@@ -0,0 +1,93 @@
+"""
+Relatórios JSON compartilhados pelos benchmarks
+
+Cada benchmark monta seus resultados e usa este módulo para a linha de
+comando comum (--semente, --saida, --comparar), os metadados do ambiente,
+a gravação em data/benchmarks/<nome>_<timestamp>.json e a comparação com
+um relatório anterior.
+"""
+
+import argparse
+import json
+import os
+import platform
+from datetime import datetime
+from typing import Callable, Dict, Hashable, List, Optional
+
+DIRETORIO_RESULTADOS = os.path.join('data', 'benchmarks')
+
+
+def criar_parser(descricao: str, nome: str) -> argparse.ArgumentParser:
+    """Parser com as opções comuns; cada benchmark acrescenta as suas"""
+    parser = argparse.ArgumentParser(description=descricao)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', help=f"Arquivo JSON de saída (padrão: {DIRETORIO_RESULTADOS}/{nome}_<timestamp>.json)")
+    parser.add_argument('--comparar', help="Relatório JSON anterior para comparação")
+    return parser
+
+
+def metadados(semente: int) -> Dict:
+    """Campos de ambiente que abrem todo relatório"""
+    return {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semente': semente,
+    }
+
+
+def salvar_relatorio(relatorio: Dict, nome: str, caminho: Optional[str] = None) -> str:
+    """Grava o relatório em JSON e retorna o caminho usado"""
+    if caminho is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        caminho = os.path.join(DIRETORIO_RESULTADOS, f"{nome}_{timestamp}.json")
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    return caminho
+
+
+def comparar_relatorios(anterior: Dict, atual: Dict, chave: Callable[[Dict], Hashable], metricas: List[str],
+                        rotulo: Callable[[Dict], str]):
+    """
+    Mostra a variação de cada métrica em relação a um relatório anterior
+
+    Os resultados são pareados por chave(resultado); os que não existem no
+    anterior (ou têm a métrica zerada lá) ficam de fora.
+    """
+    anteriores = {chave(resultado): resultado for resultado in anterior.get('resultados', [])}
+
+    print("\nComparação com relatório anterior")
+    for resultado in atual['resultados']:
+        base = anteriores.get(chave(resultado))
+        if base is None:
+            continue
+        variacoes = []
+        for metrica in metricas:
+            if base.get(metrica):
+                variacao = (resultado[metrica] - base[metrica]) / base[metrica] * 100
+                variacoes.append(f"{metrica} {variacao:+.1f}%")
+        if variacoes:
+            print(f"{rotulo(resultado)} | " + " | ".join(variacoes))
+
+
+def publicar(relatorio: Dict, nome: str, argumentos: argparse.Namespace, chave: Callable[[Dict], Hashable],
+             metricas: List[str], rotulo: Callable[[Dict], str]) -> Optional[Dict]:
+    """
+    Grava o relatório (em --saida ou no caminho padrão) e, com --comparar,
+    mostra a variação em relação ao relatório anterior
+
+    Returns:
+        O relatório anterior lido de --comparar, ou None
+    """
+    caminho = salvar_relatorio(relatorio, nome, argumentos.saida)
+    print(f"\nResultados salvos em {caminho}")
+
+    if not argumentos.comparar:
+        return None
+    with open(argumentos.comparar, encoding='utf-8') as arquivo:
+        anterior = json.load(arquivo)
+    comparar_relatorios(anterior, relatorio, chave, metricas, rotulo)
+    return anterior
@@ -0,0 +1,228 @@
+"""
+Benchmark de desempenho e acurácia da categorização automática
+
+Gera um corpus de descrições bancárias brasileiras com rótulo esperado,
+mede vazão, latência por chamada, pico de memória e acurácia de
+CategorizadorAutomatico.classificar_transacao e grava o resultado em JSON
+para comparação entre versões.
+
+Uso:
+    python -m benchmarks.categorizacao
+    python -m benchmarks.categorizacao --tamanhos 10000 100000 --comparar data/benchmarks/anterior.json
+"""
+
+import random
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks._relatorio import criar_parser, metadados, publicar
+from models.categories import CategorizadorAutomatico, normalizar_texto
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+METRICAS = ['linhas_por_segundo', 'latencia_p50_us', 'latencia_p99_us', 'memoria_pico_mb', 'acuracia']
+
+# (descrição do estabelecimento, sinal do valor, rótulo esperado)
+# O rótulo é o que uma pessoa esperaria, não necessariamente o que as regras
+# produzem hoje; casos como 'BARBEARIA' (contém 'bar'), 'HORTIFRUTI' (contém
+# 'uti') e 'POSTO GASOLINA' (contém 'gas') medem limitações reais da
+# comparação por substring.
+MODELOS_TRANSACAO: List[Tuple[str, int, Tuple[str, Optional[str], str]]] = [
+    # Receitas
+    ("SALARIO EMPRESA XYZ LTDA", 1, ('entrada', None, 'salario_fixo')),
+    ("FREELANCE PROJETO SITE", 1, ('entrada', None, 'renda_variavel')),
+    ("REEMBOLSO DESPESAS", 1, ('entrada', None, 'restituicao')),
+    ("DIVIDENDO RECEBIDO ITSA4", 1, ('entrada', None, 'renda_passiva')),
+    ("VENDA MARKETPLACE", 1, ('entrada', None, 'vendas_avulsas')),
+    ("13 SALARIO", 1, ('entrada', None, 'decimo_terceiro')),
+    ("FÉRIAS", 1, ('entrada', None, 'ferias')),
+    ("INSS APOSENTADORIA", 1, ('entrada', None, 'auxilios_beneficios')),
+    ("JOAO DA SILVA", 1, ('entrada', None, 'renda_geral')),
+    # Essenciais
+    ("SUPERMERCADO PAO DE ACUCAR", -1, ('saida', 'essencial', 'alimentacao_supermercado')),
+    ("HORTIFRUTI NATURAL", -1, ('saida', 'essencial', 'alimentacao_feiras')),
+    ("PADARIA SANTA ROSA", -1, ('saida', 'essencial', 'alimentacao_mercearia')),
+    ("POSTO SHELL GASOLINA", -1, ('saida', 'essencial', 'transporte_combustivel')),
+    ("ALUGUEL APTO", -1, ('saida', 'essencial', 'moradia_aluguel')),
+    ("CONDOMINIO EDIFICIO", -1, ('saida', 'essencial', 'moradia_condominio')),
+    ("ENERGIA ELETRICA ENEL", -1, ('saida', 'essencial', 'moradia_contas_domesticas')),
+    ("DROGARIA FARMÁCIA", -1, ('saida', 'essencial', 'saude_medicamentos')),
+    ("LABORATORIO EXAME", -1, ('saida', 'essencial', 'saude_exames')),
+    ("MENSALIDADE FACULDADE", -1, ('saida', 'essencial', 'educacao_essencial_mensalidade')),
+    ("IPVA", -1, ('saida', 'essencial', 'transporte_impostos_veiculo')),
+    ("OFICINA MECANICA", -1, ('saida', 'essencial', 'transporte_manutencao_veiculo')),
+    ("PLANO SAUDE UNIMED", -1, ('saida', 'essencial', 'saude_plano_saude')),
+    ("FRALDAS PAMPERS", -1, ('saida', 'essencial', 'filhos_fraldas')),
+    # Variáveis
+    ("NETFLIX.COM", -1, ('saida', 'variavel', 'lazer_entretenimento_assinaturas')),
+    ("SPOTIFY", -1, ('saida', 'variavel', 'lazer_entretenimento_assinaturas')),
+    ("IFOOD *RESTAURANTE", -1, ('saida', 'variavel', 'lazer_entretenimento_restaurantes')),
+    ("CINEMARK CINEMA", -1, ('saida', 'variavel', 'lazer_entretenimento_cinema_teatro')),
+    ("BARBEARIA DO ZE", -1, ('saida', 'variavel', 'cuidados_pessoais_cabelo')),
+    ("ACADEMIA SMARTFIT", -1, ('saida', 'variavel', 'cuidados_pessoais_academia')),
+    ("PETSHOP BANHO TOSA", -1, ('saida', 'variavel', 'pets_petshop')),
+    ("ZARA ROUPA", -1, ('saida', 'variavel', 'compras_pessoais_roupas_calcados')),
+    ("HOTEL VIAGEM", -1, ('saida', 'variavel', 'lazer_entretenimento_viagens')),
+    ("MERCADO LIVRE ELETRONICO", -1, ('saida', 'variavel', 'compras_pessoais_eletronicos')),
+    ("VETERINÁRIO", -1, ('saida', 'variavel', 'pets_veterinario')),
+    ("SALAO DE BELEZA", -1, ('saida', 'variavel', 'cuidados_pessoais_cabelo')),
+    ("PRESENTE ANIVERSARIO", -1, ('saida', 'variavel', 'presentes_datas_aniversarios')),
+    ("LIVRARIA CULTURA LIVRO", -1, ('saida', 'variavel', 'educacao_opcional_livros_extras')),
+    ("LOJAS AMERICANAS", -1, ('saida', 'variavel', 'outros')),
+    # Investimentos
+    ("APLICACAO TESOURO DIRETO", -1, ('investimento', 'investimento', 'tesouro_direto')),
+    ("APLICACAO CDB", -1, ('investimento', 'investimento', 'renda_fixa')),
+    ("POUPANÇA", -1, ('investimento', 'investimento', 'poupanca')),
+    ("COMPRA BTC CORRETORA", -1, ('investimento', 'investimento', 'criptomoedas')),
+    ("RESERVA EMERGENCIA", -1, ('investimento', 'investimento', 'reserva_emergencia')),
+    ("PREVIDENCIA PRIVADA", -1, ('investimento', 'investimento', 'previdencia_privada')),
+    # Imprevistos
+    ("MULTA TRÂNSITO DETRAN", -1, ('saida', 'variavel', 'imprevisto_multas')),
+    ("HOSPITAL URGENCIA", -1, ('saida', 'variavel', 'imprevisto_emergencias_medicas')),
+    ("JUROS CHEQUE ESPECIAL", -1, ('saida', 'variavel', 'imprevisto_juros_multas')),
+]
+
+# Prefixos e sufixos típicos de extrato; não podem conter palavras-chave
+PREFIXOS_SAIDA = ["", "PIX ENVIADO ", "COMPRA CARTAO DEB ", "COMPRA CARTAO CRED ", "PAG ", "DEB AUTOMATICO "]
+PREFIXOS_ENTRADA = ["", "PIX RECEBIDO ", "TED RECEBIDA ", "CREDITO "]
+SUFIXOS = ["", " SAO PAULO SP", " RIO DE JANEIRO RJ", " BELO HORIZONTE MG", " CURITIBA PR"]
+
+
+def _validar_complementos(categorizador: CategorizadorAutomatico):
+    """Garante que prefixos e sufixos não alteram o rótulo esperado"""
+    for complemento in PREFIXOS_SAIDA + PREFIXOS_ENTRADA + SUFIXOS + [" 12/03", " PARC 02/10", " *1234"]:
+        if categorizador.regras.automato.buscar(normalizar_texto(complemento)):
+            raise ValueError(f"Complemento de descrição contém palavra-chave: '{complemento}'")
+
+
+def gerar_corpus(tamanho: int, semente: int = 42) -> List[Tuple[str, float, Tuple[str, Optional[str], str]]]:
+    """
+    Gera descrições realistas com rótulo esperado
+
+    Returns:
+        Lista de (descrição, valor, (tipo_transacao, tipo_gasto, categoria))
+    """
+    aleatorio = random.Random(semente)
+    corpus = []
+    for _ in range(tamanho):
+        estabelecimento, sinal, rotulo = aleatorio.choice(MODELOS_TRANSACAO)
+        prefixo = aleatorio.choice(PREFIXOS_ENTRADA if sinal > 0 else PREFIXOS_SAIDA)
+        sufixo = aleatorio.choice(SUFIXOS)
+
+        variacao = aleatorio.random()
+        if variacao < 0.2:
+            sufixo += f" {aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}"
+        elif variacao < 0.3:
+            sufixo += f" PARC {aleatorio.randint(1, 10):02d}/10"
+        elif variacao < 0.4:
+            sufixo += f" *{aleatorio.randint(1000, 9999)}"
+
+        descricao = f"{prefixo}{estabelecimento}{sufixo}"
+        if aleatorio.random() < 0.15:
+            descricao = descricao.title()
+
+        valor = round(aleatorio.uniform(5, 3000), 2) * sinal
+        corpus.append((descricao, valor, rotulo))
+    return corpus
+
+
+def _rotulo(resultado: tuple) -> Tuple[str, Optional[str], str]:
+    """Converte o retorno de classificar_transacao para o formato dos rótulos"""
+    tipo_transacao, tipo_gasto, categoria = resultado
+    return tipo_transacao.value, tipo_gasto.value if tipo_gasto else None, categoria
+
+
+def _percentil(valores_ordenados: List[int], percentual: float) -> int:
+    """Percentil pelo método do posto mais próximo"""
+    if not valores_ordenados:
+        return 0
+    posicao = int(round(percentual / 100 * (len(valores_ordenados) - 1)))
+    return valores_ordenados[posicao]
+
+
+def medir(tamanho: int, semente: int = 42) -> Dict[str, float]:
+    """
+    Executa o benchmark para um tamanho de corpus
+
+    Cada medição usa um categorizador novo (cache frio), como numa
+    importação real: a primeira passada mede vazão sem instrumentação, a
+    segunda mede latência por chamada e acurácia e a terceira o pico de
+    memória com tracemalloc.
+    """
+    corpus = gerar_corpus(tamanho, semente)
+
+    # Vazão
+    categorizador = CategorizadorAutomatico()
+    classificar = categorizador.classificar_transacao
+    inicio = time.perf_counter()
+    for descricao, valor, _ in corpus:
+        classificar(descricao, valor)
+    duracao = time.perf_counter() - inicio
+    estatisticas_cache = categorizador.estatisticas_cache()
+
+    # Latência e acurácia
+    categorizador = CategorizadorAutomatico()
+    classificar = categorizador.classificar_transacao
+    relogio = time.perf_counter_ns
+    latencias = []
+    acertos = 0
+    for descricao, valor, rotulo in corpus:
+        t0 = relogio()
+        resultado = classificar(descricao, valor)
+        latencias.append(relogio() - t0)
+        if _rotulo(resultado) == rotulo:
+            acertos += 1
+    latencias.sort()
+
+    # Memória
+    categorizador = CategorizadorAutomatico()
+    classificar = categorizador.classificar_transacao
+    tracemalloc.start()
+    for descricao, valor, _ in corpus:
+        classificar(descricao, valor)
+    _, pico_memoria = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'linhas': tamanho,
+        'duracao_s': duracao,
+        'linhas_por_segundo': tamanho / duracao if duracao > 0 else 0.0,
+        'latencia_p50_us': _percentil(latencias, 50) / 1000,
+        'latencia_p99_us': _percentil(latencias, 99) / 1000,
+        'memoria_pico_mb': pico_memoria / (1024 * 1024),
+        'acuracia': acertos / tamanho if tamanho > 0 else 0.0,
+        'taxa_acerto_cache': estatisticas_cache['taxa_acerto']
+    }
+
+
+def executar_benchmark(tamanhos: List[int] = None, semente: int = 42) -> Dict:
+    """Executa o benchmark para todos os tamanhos e monta o relatório"""
+    tamanhos = tamanhos or TAMANHOS_PADRAO
+    categorizador = CategorizadorAutomatico()
+    _validar_complementos(categorizador)
+
+    resultados = []
+    for tamanho in tamanhos:
+        resultado = medir(tamanho, semente)
+        resultados.append(resultado)
+        print(f"{tamanho:>9,} linhas | {resultado['linhas_por_segundo']:>12,.0f} linhas/s | "
+              f"p50 {resultado['latencia_p50_us']:.1f} us | p99 {resultado['latencia_p99_us']:.1f} us | "
+              f"pico {resultado['memoria_pico_mb']:.2f} MB | acurácia {resultado['acuracia']:.1%}")
+
+    return {
+        **metadados(semente),
+        'hash_regras': categorizador._hash_fonte_regras(),
+        'resultados': resultados
+    }
+
+
+if __name__ == "__main__":
+    parser = criar_parser("Benchmark da categorização automática", 'categorizacao')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO)
+    argumentos = parser.parse_args()
+
+    relatorio = executar_benchmark(argumentos.tamanhos, argumentos.semente)
+    anterior = publicar(relatorio, 'categorizacao', argumentos, chave=lambda r: r['linhas'], metricas=METRICAS,
+                        rotulo=lambda r: f"{r['linhas']:>9,} linhas")
+    if anterior is not None and anterior.get('hash_regras') != relatorio['hash_regras']:
+        print("Atenção: as regras de categorização mudaram entre os relatórios")
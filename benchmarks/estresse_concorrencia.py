@@ -0,0 +1,286 @@
+"""
+Teste de estresse de concorrência dos gerenciadores
+
+Põe várias threads leitoras e escritoras sobre o mesmo gerenciador, como os
+callbacks do Dash num servidor threaded, e a cada leitura confere um
+invariante que uma atualização vista pela metade quebraria:
+
+    transacoes  datas ordenadas e cada saldo acumulado igual ao anterior mais o valor;
+                .transacoes percorrida sem repetições e em ordem de data
+    colunar     o mesmo, no GerenciadorTransacoesColunar
+    cartoes     soma dos limites usados igual à soma das transações de cartão
+    metas       nenhum orçamento duplicado para a mesma categoria/mês/ano
+    lembretes   IDs únicos e pendentes da exportação iguais aos de obter_lembretes_pendentes
+
+Também mede leituras e escritas por segundo. Termina com código de saída 1
+se algum invariante falhar.
+
+Uso:
+    python -m benchmarks.estresse_concorrencia
+    python -m benchmarks.estresse_concorrencia --leitores 16 --escritores 4 --duracao 5
+    python -m benchmarks.estresse_concorrencia --comparar data/benchmarks/anterior.json
+"""
+
+import math
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks._relatorio import criar_parser, metadados, publicar
+from models.transaction import GerenciadorTransacoes
+from models.transaction_columnar import GerenciadorTransacoesColunar
+from sistema_cartoes import BandeiraCartao, Cartao, GerenciadorCartoes, StatusCartao, TransacaoCartao
+from sistema_lembretes import (GerenciadorLembretes, Lembrete, PrioridadeLembrete, StatusLembrete,
+                               TipoLembrete)
+from sistema_metas import GerenciadorMetas, OrcamentoCategoria
+
+DATA_INICIAL = date(2024, 1, 1)
+DESCRICOES = ['SALARIO EMPRESA', 'ALUGUEL APTO', 'SUPERMERCADO EXTRA', 'UBER TRIP',
+              'NETFLIX', 'FARMACIA', 'RESTAURANTE', 'TESOURO DIRETO']
+CATEGORIAS = ['alimentacao', 'transporte', 'lazer', 'saude', 'educacao']
+
+
+# Cada alvo devolve (gerenciador, escrever, ler): escrever(gerenciador, aleatorio)
+# faz uma escrita; ler(gerenciador) faz uma leitura e devolve uma descrição
+# da violação encontrada, ou None
+
+def _alvo_transacoes(classe: Callable) -> Tuple[object, Callable, Callable]:
+    gerenciador = classe()
+
+    def escrever(gerenciador, aleatorio: random.Random):
+        sorteio = aleatorio.random()
+        if sorteio < 0.1:
+            ids = gerenciador.snapshot().dados['ID']
+            if len(ids):
+                gerenciador.remover_transacao(int(ids.iloc[aleatorio.randrange(len(ids))]))
+                return
+        descricao = aleatorio.choice(DESCRICOES)
+        valor = round(aleatorio.uniform(10, 3000), 2)
+        gerenciador.adicionar_transacao(
+            DATA_INICIAL + timedelta(days=aleatorio.randrange(365)),
+            descricao,
+            valor if descricao == 'SALARIO EMPRESA' else -valor
+        )
+
+    def ler(gerenciador) -> Optional[str]:
+        df = gerenciador.exportar_para_dataframe()
+        if df.empty:
+            return None
+        datas = df['Data'].tolist()
+        if datas != sorted(datas):
+            return "datas fora de ordem"
+        saldos = df['Saldo Acumulado'].to_numpy(dtype=float)
+        valores = df['Valor (R$)'].to_numpy(dtype=float)
+        if not math.isclose(saldos[0], valores[0], abs_tol=1e-6) or \
+                not np.allclose(np.diff(saldos), valores[1:], atol=1e-6):
+            return "saldo acumulado inconsistente"
+        snapshot = gerenciador.snapshot()
+        if len(snapshot.dados) != snapshot.quantidade:
+            return "snapshot inconsistente"
+        # A lista de .transacoes é percorrida sem lock: inserções e remoções
+        # concorrentes não podem repetir nem desordenar o que já foi visto
+        vistos = set()
+        anterior = None
+        for indice, transacao in enumerate(gerenciador.transacoes):
+            if indice % 64 == 0:
+                time.sleep(0)  # cede o GIL, como um callback que processa cada linha
+            if transacao.id in vistos:
+                return "transação repetida em .transacoes"
+            if anterior is not None and transacao.data < anterior:
+                return "datas fora de ordem em .transacoes"
+            vistos.add(transacao.id)
+            anterior = transacao.data
+        return None
+
+    return gerenciador, escrever, ler
+
+
+def _alvo_cartoes() -> Tuple[object, Callable, Callable]:
+    gerenciador = GerenciadorCartoes()
+    for indice in range(4):
+        gerenciador.adicionar_cartao(Cartao(
+            id=f"cartao_{indice}", nome=f"Cartão {indice}", bandeira=BandeiraCartao.VISA,
+            limite_total=1e9, limite_usado=0.0, dia_vencimento=10, dia_fechamento=3,
+            status=StatusCartao.ATIVO
+        ))
+    contador = iter(range(sys.maxsize))
+
+    def escrever(gerenciador, aleatorio: random.Random):
+        gerenciador.adicionar_transacao_cartao(TransacaoCartao(
+            id=f"t{next(contador)}", cartao_id=f"cartao_{aleatorio.randrange(4)}",
+            data=DATA_INICIAL, descricao="COMPRA", valor=float(aleatorio.randrange(1, 500)),
+            categoria=aleatorio.choice(CATEGORIAS)
+        ))
+
+    def ler(gerenciador) -> Optional[str]:
+        dados = gerenciador.exportar_para_dict()
+        usado = sum(c['limite_usado'] for c in dados['cartoes'])
+        gasto = sum(t['valor'] for t in dados['transacoes'])
+        if usado != gasto:
+            return f"limite usado {usado} diferente das transações {gasto}"
+        return None
+
+    return gerenciador, escrever, ler
+
+
+def _alvo_metas() -> Tuple[object, Callable, Callable]:
+    gerenciador = GerenciadorMetas()
+
+    def escrever(gerenciador, aleatorio: random.Random):
+        gerenciador.adicionar_orcamento(OrcamentoCategoria(
+            categoria=aleatorio.choice(CATEGORIAS), valor_orcado=aleatorio.uniform(100, 1000),
+            valor_gasto=aleatorio.uniform(0, 1000), mes=aleatorio.randint(1, 12), ano=2024
+        ))
+
+    def ler(gerenciador) -> Optional[str]:
+        chaves = [(o['categoria'], o['mes'], o['ano']) for o in gerenciador.exportar_para_dict()['orcamentos']]
+        if len(chaves) != len(set(chaves)):
+            return "orçamento duplicado"
+        return None
+
+    return gerenciador, escrever, ler
+
+
+def _alvo_lembretes() -> Tuple[object, Callable, Callable]:
+    gerenciador = GerenciadorLembretes()
+    contador = iter(range(sys.maxsize))
+
+    def escrever(gerenciador, aleatorio: random.Random):
+        pendentes = gerenciador.obter_lembretes_pendentes()
+        if aleatorio.random() < 0.3 and pendentes:
+            gerenciador.marcar_como_concluido(aleatorio.choice(pendentes).id)
+            return
+        gerenciador.adicionar_lembrete(Lembrete(
+            id=f"l{next(contador)}", titulo="Conta", descricao="", tipo=TipoLembrete.CONTA_FIXA,
+            data_vencimento=date.today() + timedelta(days=aleatorio.randrange(30)),
+            valor=aleatorio.uniform(10, 500), prioridade=PrioridadeLembrete.MEDIA,
+            status=StatusLembrete.PENDENTE
+        ))
+
+    def ler(gerenciador) -> Optional[str]:
+        # Duas consultas sob a mesma leitura (reentrante) enxergam o mesmo estado
+        with gerenciador._lock.leitura():
+            lembretes = gerenciador.exportar_para_dict()['lembretes']
+            pendentes = gerenciador.obter_lembretes_pendentes()
+        if len({l['id'] for l in lembretes}) != len(lembretes):
+            return "lembrete duplicado"
+        exportados = sum(1 for l in lembretes if l['status'] == StatusLembrete.PENDENTE.value)
+        if exportados != len(pendentes):
+            return f"{len(pendentes)} pendentes, {exportados} na exportação"
+        return None
+
+    return gerenciador, escrever, ler
+
+
+ALVOS = {
+    'transacoes': lambda: _alvo_transacoes(GerenciadorTransacoes),
+    'colunar': lambda: _alvo_transacoes(GerenciadorTransacoesColunar),
+    'cartoes': _alvo_cartoes,
+    'metas': _alvo_metas,
+    'lembretes': _alvo_lembretes,
+}
+
+
+def estressar(alvo: str, leitores: int, escritores: int, duracao: float, semente: int = 42) -> Dict:
+    """Roda leitores e escritores em paralelo sobre um alvo pelo tempo informado"""
+    gerenciador, escrever, ler = ALVOS[alvo]()
+    parar = threading.Event()
+    leituras = [0] * leitores
+    escritas = [0] * escritores
+    violacoes: List[str] = []
+    erros: List[str] = []
+
+    def leitor(indice: int):
+        while not parar.is_set():
+            try:
+                violacao = ler(gerenciador)
+            except Exception as e:
+                erros.append(f"{type(e).__name__}: {e}")
+                continue
+            if violacao:
+                violacoes.append(violacao)
+            leituras[indice] += 1
+
+    def escritor(indice: int):
+        aleatorio = random.Random(semente + indice)
+        while not parar.is_set():
+            try:
+                escrever(gerenciador, aleatorio)
+            except Exception as e:
+                erros.append(f"{type(e).__name__}: {e}")
+                continue
+            escritas[indice] += 1
+
+    threads = [threading.Thread(target=leitor, args=(i,)) for i in range(leitores)]
+    threads += [threading.Thread(target=escritor, args=(i,)) for i in range(escritores)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duracao)
+    parar.set()
+    for thread in threads:
+        thread.join()
+    decorrido = time.perf_counter() - inicio
+
+    # Leitura final, sem concorrência, também precisa passar
+    violacao_final = ler(gerenciador)
+    if violacao_final:
+        violacoes.append(violacao_final)
+
+    return {
+        'alvo': alvo,
+        'leitores': leitores,
+        'escritores': escritores,
+        'duracao_s': decorrido,
+        'leituras': sum(leituras),
+        'escritas': sum(escritas),
+        'leituras_por_s': sum(leituras) / decorrido,
+        'escritas_por_s': sum(escritas) / decorrido,
+        'violacoes': len(violacoes),
+        'erros': len(erros),
+        'exemplos': (violacoes + erros)[:5]
+    }
+
+
+def executar_estresse(alvos: List[str] = None, leitores: int = 8, escritores: int = 2,
+                      duracao: float = 2.0, semente: int = 42) -> Dict:
+    """Executa o estresse para todos os alvos e monta o relatório"""
+    alvos = alvos or list(ALVOS)
+
+    resultados = []
+    for alvo in alvos:
+        resultado = estressar(alvo, leitores, escritores, duracao, semente)
+        resultados.append(resultado)
+        situacao = "OK" if not (resultado['violacoes'] or resultado['erros']) else \
+            f"FALHOU ({resultado['violacoes']} violações, {resultado['erros']} erros)"
+        print(f"{alvo:<10} | {resultado['leituras_por_s']:>9,.0f} leituras/s | "
+              f"{resultado['escritas_por_s']:>8,.0f} escritas/s | {situacao}")
+        for exemplo in resultado['exemplos']:
+            print(f"    {exemplo}")
+
+    return {
+        **metadados(semente),
+        'resultados': resultados
+    }
+
+
+if __name__ == "__main__":
+    parser = criar_parser("Teste de estresse de concorrência dos gerenciadores", 'estresse_concorrencia')
+    parser.add_argument('--alvos', nargs='+', choices=list(ALVOS), default=list(ALVOS))
+    parser.add_argument('--leitores', type=int, default=8)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--duracao', type=float, default=2.0, help="Segundos por alvo")
+    argumentos = parser.parse_args()
+
+    relatorio = executar_estresse(argumentos.alvos, argumentos.leitores, argumentos.escritores,
+                                  argumentos.duracao, argumentos.semente)
+    publicar(relatorio, 'estresse_concorrencia', argumentos, chave=lambda r: r['alvo'],
+             metricas=['leituras_por_s', 'escritas_por_s'], rotulo=lambda r: f"{r['alvo']:<10}")
+
+    if any(r['violacoes'] or r['erros'] for r in relatorio['resultados']):
+        sys.exit(1)
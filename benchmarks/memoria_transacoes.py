@@ -0,0 +1,179 @@
+"""
+Benchmark de memória por transação
+
+Carrega o mesmo livro (um CSV gerado em memória com descrições do benchmark
+de categorização) em cada representação de transações e mede com
+tracemalloc quantos bytes cada linha mantém alocados depois da carga:
+
+    dataclass  layout anterior de Transacao (dataclass com __dict__), como referência
+    slots      Transacao atual (__slots__, strings internadas, mês/semana derivados)
+    colunar    GerenciadorTransacoesColunar (colunas NumPy)
+
+Uso:
+    python -m benchmarks.memoria_transacoes
+    python -m benchmarks.memoria_transacoes --tamanhos 100000 --comparar data/benchmarks/anterior.json
+"""
+
+import csv
+import gc
+import io
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field, InitVar
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from benchmarks._relatorio import criar_parser, metadados, publicar
+from benchmarks.categorizacao import gerar_corpus
+from models.categories import TipoTransacao, TipoGasto, obter_categorizador_compartilhado
+from models.transaction import Transacao
+from models.transaction_columnar import GerenciadorTransacoesColunar
+
+TAMANHOS_PADRAO = [100_000, 1_000_000]
+DATA_INICIAL = date(2020, 1, 1)
+DIAS_PERIODO = 5 * 365
+
+
+@dataclass
+class _TransacaoReferencia:
+    """Layout anterior de Transacao, mantido aqui apenas como base de comparação"""
+    data: date
+    descricao: str
+    valor: float
+    tipo_transacao: TipoTransacao = field(init=False)
+    tipo_gasto: Optional[TipoGasto] = field(init=False)
+    categoria: str = field(init=False)
+    recorrente: bool = False
+    mes: int = field(init=False)
+    semana: int = field(init=False)
+    saldo_acumulado: float = field(init=False, default=0.0)
+    percentual_salario: float = field(init=False, default=0.0)
+    status_meta: str = field(init=False, default="")
+    classificacao: InitVar[Optional[tuple]] = None
+
+    def __post_init__(self, classificacao: Optional[tuple]):
+        self.mes = self.data.month
+        self.semana = (self.data.day - 1) // 7 + 1
+        self.tipo_transacao, self.tipo_gasto, self.categoria = classificacao
+
+
+def gerar_csv(tamanho: int, semente: int = 42) -> str:
+    """Gera um CSV (Data, Descrição, Valor (R$)) com descrições realistas"""
+    aleatorio = random.Random(semente)
+    saida = io.StringIO()
+    escritor = csv.writer(saida)
+    escritor.writerow(['Data', 'Descrição', 'Valor (R$)'])
+    for descricao, valor, _ in gerar_corpus(tamanho, semente):
+        data_transacao = DATA_INICIAL + timedelta(days=aleatorio.randrange(DIAS_PERIODO))
+        escritor.writerow([data_transacao.isoformat(), descricao, valor])
+    return saida.getvalue()
+
+
+def _classificacoes(texto_csv: str) -> Dict[Tuple[str, bool], tuple]:
+    """Classifica antes da medição cada par (descrição, entrada) distinto do CSV"""
+    categorizador = obter_categorizador_compartilhado()
+    leitor = csv.reader(io.StringIO(texto_csv))
+    next(leitor)
+    classificacoes = {}
+    for _, descricao, valor in leitor:
+        chave = (descricao, float(valor) > 0)
+        if chave not in classificacoes:
+            classificacoes[chave] = categorizador.classificar_transacao(descricao, float(valor))
+    return classificacoes
+
+
+def _carregar_objetos(classe: Callable, texto_csv: str, classificacoes: Dict[Tuple[str, bool], tuple]) -> List:
+    """Carrega o CSV como lista de objetos, como o DataManager faz (uma string nova por linha)"""
+    leitor = csv.reader(io.StringIO(texto_csv))
+    next(leitor)
+    objetos = []
+    for data_texto, descricao, valor_texto in leitor:
+        valor = float(valor_texto)
+        objetos.append(classe(
+            data=date.fromisoformat(data_texto),
+            descricao=descricao,
+            valor=valor,
+            classificacao=classificacoes[(descricao, valor > 0)]
+        ))
+    return objetos
+
+
+def _carregar_colunar(texto_csv: str, classificacoes: Dict[Tuple[str, bool], tuple]) -> GerenciadorTransacoesColunar:
+    """Carrega o CSV no gerenciador colunar (classificação em lote)"""
+    df = pd.read_csv(io.StringIO(texto_csv))
+    gerenciador = GerenciadorTransacoesColunar()
+    gerenciador.adicionar_transacoes(pd.DataFrame({
+        'data': df['Data'],
+        'descricao': df['Descrição'],
+        'valor': df['Valor (R$)']
+    }))
+    return gerenciador
+
+
+LAYOUTS = {
+    'dataclass': lambda texto, classificacoes: _carregar_objetos(_TransacaoReferencia, texto, classificacoes),
+    'slots': lambda texto, classificacoes: _carregar_objetos(Transacao, texto, classificacoes),
+    'colunar': _carregar_colunar,
+}
+
+
+def medir(layout: str, texto_csv: str, classificacoes: Dict[Tuple[str, bool], tuple], tamanho: int) -> Dict[str, float]:
+    """Mede a memória retida (e o pico durante a carga) de um layout"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    carregado = LAYOUTS[layout](texto_csv, classificacoes)
+    duracao = time.perf_counter() - inicio
+    gc.collect()
+    retido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del carregado
+
+    return {
+        'layout': layout,
+        'linhas': tamanho,
+        'duracao_s': duracao,
+        'bytes_por_transacao': retido / tamanho if tamanho > 0 else 0.0,
+        'memoria_retida_mb': retido / (1024 * 1024),
+        'memoria_pico_mb': pico / (1024 * 1024)
+    }
+
+
+def executar_benchmark(tamanhos: List[int] = None, semente: int = 42, layouts: List[str] = None) -> Dict:
+    """Executa o benchmark para todos os tamanhos e layouts e monta o relatório"""
+    tamanhos = tamanhos or TAMANHOS_PADRAO
+    layouts = layouts or list(LAYOUTS)
+
+    resultados = []
+    for tamanho in tamanhos:
+        texto_csv = gerar_csv(tamanho, semente)
+        classificacoes = _classificacoes(texto_csv)
+        referencia = None
+        for layout in layouts:
+            resultado = medir(layout, texto_csv, classificacoes, tamanho)
+            resultados.append(resultado)
+            if referencia is None:
+                referencia = resultado['bytes_por_transacao']
+            reducao = 1 - resultado['bytes_por_transacao'] / referencia if referencia else 0.0
+            print(f"{tamanho:>9,} linhas | {layout:<9} | {resultado['bytes_por_transacao']:>7,.0f} B/transação | "
+                  f"retido {resultado['memoria_retida_mb']:>8,.1f} MB | pico {resultado['memoria_pico_mb']:>8,.1f} MB | "
+                  f"redução {reducao:.0%}")
+
+    return {
+        **metadados(semente),
+        'resultados': resultados
+    }
+
+
+if __name__ == "__main__":
+    parser = criar_parser("Benchmark de memória por transação", 'memoria_transacoes')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO)
+    parser.add_argument('--layouts', nargs='+', choices=list(LAYOUTS), default=list(LAYOUTS))
+    argumentos = parser.parse_args()
+
+    relatorio = executar_benchmark(argumentos.tamanhos, argumentos.semente, argumentos.layouts)
+    publicar(relatorio, 'memoria_transacoes', argumentos, chave=lambda r: (r['layout'], r['linhas']),
+             metricas=['bytes_por_transacao'], rotulo=lambda r: f"{r['linhas']:>9,} linhas | {r['layout']:<9}")
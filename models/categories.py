@@ -4,8 +4,19 @@ Baseado na regra 50-30-20
 """
 
 from enum import Enum
-from typing import Dict, List, Optional
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
 import unicodedata
+import warnings
+import weakref
+import numpy as np
+import pandas as pd
 
 class TipoGasto(Enum):
     ESSENCIAL = "essencial"      # 50%
@@ -17,10 +28,254 @@ class TipoTransacao(Enum):
     SAIDA = "saida"
     INVESTIMENTO = "investimento"
 
+# Número máximo de descrições distintas mantidas no cache de classificação
+TAMANHO_CACHE_PADRAO = 4096
+
+# Descrições distintas enviadas a cada tarefa na classificação paralela
+TAMANHO_BLOCO_PARALELO = 5000
+
+# Snapshot em disco das regras normalizadas usado pelo categorizador compartilhado,
+# no data/ do projeto (não no diretório de onde o processo foi iniciado). Em JSON:
+# carregá-lo só lê dados, nunca executa código de um arquivo que o usuário pode editar
+CAMINHO_SNAPSHOT_REGRAS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'regras_categorizador.json'
+)
+VERSAO_FORMATO_SNAPSHOT = 2
+
+# Grupos de regras, na ordem de prioridade usada pela classificação
+GRUPO_ENTRADA = 'entrada'
+GRUPO_RECEITAS = 'receitas'
+GRUPO_INVESTIMENTOS = 'investimentos'
+GRUPO_IMPREVISTOS = 'imprevistos'
+GRUPO_ESSENCIAIS = 'essenciais'
+GRUPO_VARIAVEIS = 'variaveis'
+
+class _AutomatoPalavrasChave:
+    """
+    Autômato Aho-Corasick que localiza todas as palavras-chave de uma
+    descrição numa única varredura do texto
+    """
+
+    def __init__(self):
+        self._transicoes: List[Dict[str, int]] = [{}]
+        self._falhas: List[int] = [0]
+        self._saidas: List[List[Tuple[str, int]]] = [[]]
+
+    def adicionar(self, padrao: str, grupo: str, ordem: int):
+        """Registra um padrão já normalizado associado a (grupo, ordem)"""
+        estado = 0
+        for caractere in padrao:
+            proximo = self._transicoes[estado].get(caractere)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes.append({})
+                self._falhas.append(0)
+                self._saidas.append([])
+                self._transicoes[estado][caractere] = proximo
+            estado = proximo
+        self._saidas[estado].append((grupo, ordem))
+
+    def compilar(self):
+        """Calcula os links de falha (busca em largura) e propaga as saídas"""
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for caractere, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falhas[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falhas[falha]
+                destino = self._transicoes[falha].get(caractere, 0)
+                self._falhas[proximo] = destino if destino != proximo else 0
+                self._saidas[proximo].extend(self._saidas[self._falhas[proximo]])
+
+    def buscar(self, texto: str) -> Dict[str, int]:
+        """
+        Retorna, para cada grupo com ocorrência no texto, a menor ordem de
+        categoria encontrada (equivalente ao primeiro match na iteração)
+        """
+        transicoes = self._transicoes
+        falhas = self._falhas
+        saidas = self._saidas
+        encontrados: Dict[str, int] = {}
+
+        for grupo, ordem in saidas[0]:
+            if ordem < encontrados.get(grupo, ordem + 1):
+                encontrados[grupo] = ordem
+
+        estado = 0
+        for caractere in texto:
+            while estado and caractere not in transicoes[estado]:
+                estado = falhas[estado]
+            estado = transicoes[estado].get(caractere, 0)
+            for grupo, ordem in saidas[estado]:
+                if ordem < encontrados.get(grupo, ordem + 1):
+                    encontrados[grupo] = ordem
+        return encontrados
+
+@dataclass(frozen=True)
+class RegrasCompiladas:
+    """
+    Conjunto imutável de regras de categorização já normalizadas
+
+    Uma nova instância (com versão incrementada) é criada sempre que as
+    regras mudam; instâncias existentes nunca são alteradas.
+    """
+    versao: int
+    automato: _AutomatoPalavrasChave
+    rotulos: Dict[str, Tuple[str, ...]]
+
+    def classificar(self, descricao_normalizada: str, valor: float) -> tuple[TipoTransacao, TipoGasto, str]:
+        """Classifica uma descrição já normalizada seguindo a prioridade dos grupos"""
+        rotulos = self.rotulos
+        encontrados = self.automato.buscar(descricao_normalizada)
+
+        # Verificar se é entrada (valor positivo indica entrada)
+        # ou se é entrada baseada em palavras-chave (mesmo com valor negativo em alguns casos)
+        if valor > 0 or GRUPO_ENTRADA in encontrados:
+            ordem = encontrados.get(GRUPO_RECEITAS)
+            categoria_receita = rotulos[GRUPO_RECEITAS][ordem] if ordem is not None else 'renda_geral'
+            return TipoTransacao.ENTRADA, None, categoria_receita
+
+        # Verificar investimentos primeiro (prioridade alta)
+        ordem = encontrados.get(GRUPO_INVESTIMENTOS)
+        if ordem is not None:
+            categoria_investimento = rotulos[GRUPO_INVESTIMENTOS][ordem]
+            if valor < 0:  # Saída para investimento
+                return TipoTransacao.INVESTIMENTO, TipoGasto.INVESTIMENTO, categoria_investimento
+            else:  # Entrada de investimento (resgate)
+                return TipoTransacao.ENTRADA, None, categoria_investimento
+
+        # Verificar imprevistos
+        ordem = encontrados.get(GRUPO_IMPREVISTOS)
+        if ordem is not None:
+            return TipoTransacao.SAIDA, TipoGasto.VARIAVEL, rotulos[GRUPO_IMPREVISTOS][ordem]
+
+        # Verificar gastos essenciais
+        ordem = encontrados.get(GRUPO_ESSENCIAIS)
+        if ordem is not None:
+            return TipoTransacao.SAIDA, TipoGasto.ESSENCIAL, rotulos[GRUPO_ESSENCIAIS][ordem]
+
+        # Verificar gastos variáveis
+        ordem = encontrados.get(GRUPO_VARIAVEIS)
+        if ordem is not None:
+            return TipoTransacao.SAIDA, TipoGasto.VARIAVEL, rotulos[GRUPO_VARIAVEIS][ordem]
+
+        # Se não encontrou categoria específica, classificar como variável por padrão
+        return TipoTransacao.SAIDA, TipoGasto.VARIAVEL, 'outros'
+
+def _montar_regras(versao: int, rotulos: Dict[str, Tuple[str, ...]],
+                   palavras: List[Tuple[str, int, str]]) -> RegrasCompiladas:
+    """Compila as palavras-chave já normalizadas num único autômato Aho-Corasick"""
+    automato = _AutomatoPalavrasChave()
+    for grupo, ordem, palavra in palavras:
+        automato.adicionar(palavra, grupo, ordem)
+    automato.compilar()
+    return RegrasCompiladas(versao=versao, automato=automato, rotulos=rotulos)
+
+def _sinal_valor(valor: float) -> int:
+    """Reduz o valor ao sinal, única parte dele que influencia a classificação"""
+    if valor > 0:
+        return 1
+    if valor < 0:
+        return -1
+    return 0
+
+def normalizar_texto(texto: str) -> str:
+    """Remove acentos e normaliza texto para comparação"""
+    texto_normalizado = unicodedata.normalize('NFD', texto.lower())
+    return ''.join(c for c in texto_normalizado if unicodedata.category(c) != 'Mn')
+
+def _tabela_remocao_acentos(textos: pd.Series) -> Dict[int, None]:
+    """
+    Tabela de str.translate que remove as marcas combinantes (categoria Mn)
+    presentes nos textos já decompostos (NFD)
+
+    Só os caracteres distintos do lote são consultados, não a faixa Unicode inteira.
+    """
+    presentes = set(''.join(textos.tolist()))
+    return {ord(caractere): None for caractere in presentes if unicodedata.category(caractere) == 'Mn'}
+
+def _normalizar_serie(descricoes: pd.Series) -> np.ndarray:
+    """
+    Versão vetorizada de CategorizadorAutomatico._normalizar_texto
+
+    Só as descrições distintas passam pelas operações de texto.
+    """
+    codigos, distintas = pd.factorize(descricoes, use_na_sentinel=False)
+    decompostas = (
+        pd.Series([str(descricao) for descricao in distintas], dtype=object)
+        .str.lower()
+        .str.normalize('NFD')
+    )
+    normalizadas = decompostas.str.translate(_tabela_remocao_acentos(decompostas)).to_numpy(dtype=object)
+    return normalizadas[codigos]
+
+class CacheClassificacao:
+    """
+    Cache LRU limitado de resultados de classificação
+
+    Cada entrada guarda a versão das regras que a produziu; entradas de
+    versões anteriores são tratadas como falha, o que torna a invalidação
+    segura mesmo com leituras concorrentes durante a troca de regras.
+    """
+
+    def __init__(self, capacidade: int = TAMANHO_CACHE_PADRAO):
+        self.capacidade = capacidade
+        self._entradas: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Tuple[str, int], versao: int) -> Optional[Any]:
+        """Retorna o resultado em cache para a chave, ou None em caso de falha"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] != versao:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada[1]
+
+    def guardar(self, chave: Tuple[str, int], versao: int, resultado: Any):
+        """Guarda um resultado, descartando a entrada menos usada se necessário"""
+        if self.capacidade <= 0:
+            return
+        with self._lock:
+            self._entradas[chave] = (versao, resultado)
+            self._entradas.move_to_end(chave)
+            if len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self):
+        """Descarta todas as entradas, mantendo as estatísticas"""
+        with self._lock:
+            self._entradas.clear()
+
+    def limpar(self):
+        """Descarta todas as entradas e zera as estatísticas"""
+        with self._lock:
+            self._entradas.clear()
+            self.acertos = 0
+            self.falhas = 0
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Retorna um resumo de uso do cache"""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'tamanho': len(self._entradas),
+                'capacidade': self.capacidade,
+                'taxa_acerto': (self.acertos / consultas) if consultas > 0 else 0.0
+            }
+
 class CategorizadorAutomatico:
     """Classe responsável pela categorização automática de transações"""
 
-    def __init__(self):
+    def __init__(self, tamanho_cache: int = TAMANHO_CACHE_PADRAO, caminho_snapshot: Optional[str] = None):
         # Estrutura completa de categorias essenciais (50%)
         self.categorias_essenciais = {
             'moradia': {
@@ -142,11 +397,31 @@ class CategorizadorAutomatico:
 
         # Palavras-chave para entradas (compatibilidade)
         self.palavras_entrada = ['salario', 'freelance', 'bonus', 'renda extra', 'venda', 'receita', 'entrada', 'dividendo recebido', 'aluguel recebido']
+
+        # Regras normalizadas e compiladas; substituídas por inteiro a cada alteração
+        self._lock_regras = threading.Lock()
+        self._regras = self._carregar_ou_compilar_regras(caminho_snapshot)
+
+        # Cache de classificações por (descrição normalizada, sinal do valor)
+        self._cache = CacheClassificacao(tamanho_cache)
+
+        # Gerenciadores de transações que classificam com este categorizador:
+        # todos são reclassificados quando uma categoria personalizada muda
+        self._gerenciadores = weakref.WeakSet()
     
     def _normalizar_texto(self, texto: str) -> str:
         """Remove acentos e normaliza texto para comparação"""
-        texto_normalizado = unicodedata.normalize('NFD', texto.lower())
-        return ''.join(c for c in texto_normalizado if unicodedata.category(c) != 'Mn')
+        return normalizar_texto(texto)
+
+    @property
+    def regras(self) -> 'RegrasCompiladas':
+        """Conjunto de regras compiladas em vigor (imutável)"""
+        return self._regras
+
+    @property
+    def versao_regras(self) -> int:
+        """Versão das regras em vigor, incrementada a cada alteração"""
+        return self._regras.versao
 
     def classificar_transacao(self, descricao: str, valor: float) -> tuple[TipoTransacao, TipoGasto, str]:
         """
@@ -156,42 +431,175 @@ class CategorizadorAutomatico:
             tuple: (tipo_transacao, tipo_gasto, categoria_especifica)
         """
         descricao_normalizada = self._normalizar_texto(descricao)
+        chave = (descricao_normalizada, _sinal_valor(valor))
+        regras = self._regras
 
-        # Verificar se é entrada (valor positivo indica entrada)
-        if valor > 0:
-            categoria_receita = self._encontrar_categoria_receita(descricao_normalizada)
-            return TipoTransacao.ENTRADA, None, categoria_receita
+        resultado = self._cache.obter(chave, regras.versao)
+        if resultado is None:
+            resultado = regras.classificar(descricao_normalizada, valor)
+            self._cache.guardar(chave, regras.versao, resultado)
+        return resultado
 
-        # Verificar se é entrada baseada em palavras-chave (mesmo com valor negativo em alguns casos)
-        if any(self._normalizar_texto(palavra) in descricao_normalizada for palavra in self.palavras_entrada):
-            categoria_receita = self._encontrar_categoria_receita(descricao_normalizada)
-            return TipoTransacao.ENTRADA, None, categoria_receita
+    def classificar_lote(self, descricoes: pd.Series, valores: pd.Series, paralelo: bool = False,
+                         max_workers: Optional[int] = None,
+                         tamanho_bloco: int = TAMANHO_BLOCO_PARALELO) -> pd.DataFrame:
+        """
+        Classifica um lote de transações de uma só vez
 
-        # Verificar investimentos primeiro (prioridade alta)
-        categoria_investimento = self._encontrar_categoria_investimento(descricao_normalizada)
-        if categoria_investimento:
-            if valor < 0:  # Saída para investimento
-                return TipoTransacao.INVESTIMENTO, TipoGasto.INVESTIMENTO, categoria_investimento
-            else:  # Entrada de investimento (resgate)
-                return TipoTransacao.ENTRADA, None, categoria_investimento
+        A normalização é feita com operações vetorizadas sobre as descrições
+        distintas e cada par (descrição normalizada, sinal do valor) é
+        classificado uma única vez; o resultado é propagado para todas as
+        linhas que o compartilham.
 
-        # Verificar imprevistos
-        categoria_imprevisto = self._encontrar_categoria_imprevisto(descricao_normalizada)
-        if categoria_imprevisto:
-            return TipoTransacao.SAIDA, TipoGasto.VARIAVEL, f"imprevisto_{categoria_imprevisto}"
+        Args:
+            descricoes: Série com as descrições
+            valores: Série com os valores (apenas o sinal é usado)
+            paralelo: Distribui os pares distintos entre processos
+            max_workers: Número de processos (padrão do ProcessPoolExecutor)
+            tamanho_bloco: Quantidade de pares distintos enviada a cada tarefa
 
-        # Verificar gastos essenciais
-        categoria_essencial = self._encontrar_categoria_essencial(descricao_normalizada)
-        if categoria_essencial:
-            return TipoTransacao.SAIDA, TipoGasto.ESSENCIAL, categoria_essencial
+        Returns:
+            DataFrame com as colunas tipo_transacao, tipo_gasto e categoria,
+            alinhado ao índice de `descricoes`
+        """
+        regras = self._regras
+        descricoes_normalizadas = _normalizar_serie(descricoes)
+        sinais = np.sign(pd.to_numeric(valores, errors='coerce').to_numpy(dtype=float))
+        sinais = np.nan_to_num(sinais, nan=0.0).astype(np.int8)
 
-        # Verificar gastos variáveis
-        categoria_variavel = self._encontrar_categoria_variavel(descricao_normalizada)
-        if categoria_variavel:
-            return TipoTransacao.SAIDA, TipoGasto.VARIAVEL, categoria_variavel
+        codigos, unicos = pd.MultiIndex.from_arrays([descricoes_normalizadas, sinais]).factorize()
+        pares = [(descricao, int(sinal)) for descricao, sinal in unicos]
+        if paralelo and len(pares) > tamanho_bloco:
+            resultados = _classificar_em_paralelo(regras, pares, max_workers, tamanho_bloco)
+        else:
+            resultados = [regras.classificar(descricao, sinal) for descricao, sinal in pares]
 
-        # Se não encontrou categoria específica, classificar como variável por padrão
-        return TipoTransacao.SAIDA, TipoGasto.VARIAVEL, 'outros'
+        tipos_transacao = np.empty(len(resultados), dtype=object)
+        tipos_gasto = np.empty(len(resultados), dtype=object)
+        categorias = np.empty(len(resultados), dtype=object)
+        for posicao, (tipo_transacao, tipo_gasto, categoria) in enumerate(resultados):
+            tipos_transacao[posicao] = tipo_transacao
+            tipos_gasto[posicao] = tipo_gasto
+            categorias[posicao] = categoria
+
+        return pd.DataFrame({
+            'tipo_transacao': tipos_transacao[codigos],
+            'tipo_gasto': tipos_gasto[codigos],
+            'categoria': categorias[codigos]
+        }, index=descricoes.index)
+
+    def estatisticas_cache(self) -> Dict[str, float]:
+        """Retorna acertos, falhas, ocupação e taxa de acerto do cache de classificação"""
+        return self._cache.estatisticas()
+
+    def limpar_cache(self):
+        """Esvazia o cache de classificação e zera as estatísticas"""
+        self._cache.limpar()
+
+    def _hash_fonte_regras(self) -> str:
+        """Hash das tabelas de palavras-chave que originam as regras compiladas"""
+        fonte = json.dumps([
+            VERSAO_FORMATO_SNAPSHOT,
+            self.palavras_entrada,
+            self.categorias_receitas,
+            self.categorias_investimentos,
+            self.categorias_imprevistos,
+            self.categorias_essenciais,
+            self.categorias_variaveis
+        ], ensure_ascii=False)
+        return hashlib.sha256(fonte.encode('utf-8')).hexdigest()
+
+    def _carregar_ou_compilar_regras(self, caminho_snapshot: Optional[str]) -> 'RegrasCompiladas':
+        """
+        Monta as regras a partir das palavras já normalizadas do snapshot em
+        disco quando ele corresponde às tabelas atuais; caso contrário
+        normaliza tudo de novo e regrava o snapshot
+
+        O autômato em si não é gravado: com as saídas propagadas pelos links
+        de falha, ler e validar as tabelas dele em JSON custa mais que
+        montá-lo de novo a partir das palavras.
+        """
+        if caminho_snapshot is None:
+            return self._compilar_regras(versao=1)
+
+        hash_fonte = self._hash_fonte_regras()
+        try:
+            with open(caminho_snapshot, encoding='utf-8') as arquivo:
+                snapshot = json.load(arquivo)
+            if (snapshot.get('formato') == VERSAO_FORMATO_SNAPSHOT and
+                    snapshot.get('hash_fonte') == hash_fonte):
+                rotulos = {grupo: tuple(map(str, nomes)) for grupo, nomes in snapshot['rotulos'].items()}
+                palavras = [(str(grupo), int(ordem), str(palavra)) for grupo, ordem, palavra in snapshot['palavras']]
+                return _montar_regras(1, rotulos, palavras)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            warnings.warn(f"Snapshot de regras inválido, recompilando: {e}", RuntimeWarning)
+
+        rotulos, palavras = self._tabelas_normalizadas()
+        self._salvar_snapshot_regras(caminho_snapshot, hash_fonte, rotulos, palavras)
+        return _montar_regras(1, rotulos, palavras)
+
+    def _salvar_snapshot_regras(self, caminho_snapshot: str, hash_fonte: str,
+                                rotulos: Dict[str, Tuple[str, ...]], palavras: List[Tuple[str, int, str]]):
+        """Grava o snapshot de forma atômica (arquivo temporário + rename)"""
+        try:
+            diretorio = os.path.dirname(caminho_snapshot)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            temporario = f"{caminho_snapshot}.{os.getpid()}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump({
+                    'formato': VERSAO_FORMATO_SNAPSHOT,
+                    'hash_fonte': hash_fonte,
+                    'rotulos': rotulos,
+                    'palavras': palavras
+                }, arquivo, ensure_ascii=False)
+            os.replace(temporario, caminho_snapshot)
+        except Exception as e:
+            warnings.warn(f"Erro ao salvar snapshot de regras: {e}", RuntimeWarning)
+
+    def _compilar_regras(self, versao: int) -> 'RegrasCompiladas':
+        """Normaliza as tabelas atuais e compila o autômato de palavras-chave"""
+        rotulos, palavras = self._tabelas_normalizadas()
+        return _montar_regras(versao, rotulos, palavras)
+
+    def _tabelas_normalizadas(self) -> Tuple[Dict[str, Tuple[str, ...]], List[Tuple[str, int, str]]]:
+        """
+        Rótulos de cada grupo e as palavras-chave normalizadas, cada uma
+        associada ao par (grupo, ordem da categoria dentro do grupo)
+
+        Cada palavra-chave é normalizada uma única vez; a ordem de
+        declaração dos dicionários é o critério de desempate.
+        """
+        grupos = [
+            (GRUPO_ENTRADA, [('entrada', self.palavras_entrada)]),
+            (GRUPO_RECEITAS, list(self.categorias_receitas.items())),
+            (GRUPO_INVESTIMENTOS, list(self.categorias_investimentos.items())),
+            (GRUPO_IMPREVISTOS, [
+                (f"imprevisto_{categoria}", palavras)
+                for categoria, palavras in self.categorias_imprevistos.items()
+            ]),
+            (GRUPO_ESSENCIAIS, [
+                (f"{categoria_principal}_{subcategoria}", palavras)
+                for categoria_principal, subcategorias in self.categorias_essenciais.items()
+                for subcategoria, palavras in subcategorias.items()
+            ]),
+            (GRUPO_VARIAVEIS, [
+                (f"{categoria_principal}_{subcategoria}", palavras)
+                for categoria_principal, subcategorias in self.categorias_variaveis.items()
+                for subcategoria, palavras in subcategorias.items()
+            ])
+        ]
+
+        rotulos = {}
+        palavras_normalizadas = []
+        for grupo, categorias in grupos:
+            rotulos[grupo] = tuple(rotulo for rotulo, _ in categorias)
+            for ordem, (_, palavras) in enumerate(categorias):
+                for palavra in palavras:
+                    palavras_normalizadas.append((grupo, ordem, self._normalizar_texto(palavra)))
+        return rotulos, palavras_normalizadas
     
     def obter_limite_categoria(self, tipo_gasto: TipoGasto, renda_mensal: float) -> float:
         """Retorna o limite recomendado para cada tipo de gasto"""
@@ -203,43 +611,6 @@ class CategorizadorAutomatico:
             return renda_mensal * 0.20
         return 0.0
     
-    def _encontrar_categoria_receita(self, descricao_normalizada: str) -> str:
-        """Encontra categoria específica de receita"""
-        for categoria, palavras in self.categorias_receitas.items():
-            if any(self._normalizar_texto(palavra) in descricao_normalizada for palavra in palavras):
-                return categoria
-        return 'renda_geral'
-
-    def _encontrar_categoria_investimento(self, descricao_normalizada: str) -> str:
-        """Encontra categoria específica de investimento"""
-        for categoria, palavras in self.categorias_investimentos.items():
-            if any(self._normalizar_texto(palavra) in descricao_normalizada for palavra in palavras):
-                return categoria
-        return None
-
-    def _encontrar_categoria_imprevisto(self, descricao_normalizada: str) -> str:
-        """Encontra categoria específica de imprevisto"""
-        for categoria, palavras in self.categorias_imprevistos.items():
-            if any(self._normalizar_texto(palavra) in descricao_normalizada for palavra in palavras):
-                return categoria
-        return None
-
-    def _encontrar_categoria_essencial(self, descricao_normalizada: str) -> str:
-        """Encontra categoria específica essencial"""
-        for categoria_principal, subcategorias in self.categorias_essenciais.items():
-            for subcategoria, palavras in subcategorias.items():
-                if any(self._normalizar_texto(palavra) in descricao_normalizada for palavra in palavras):
-                    return f"{categoria_principal}_{subcategoria}"
-        return None
-
-    def _encontrar_categoria_variavel(self, descricao_normalizada: str) -> str:
-        """Encontra categoria específica variável"""
-        for categoria_principal, subcategorias in self.categorias_variaveis.items():
-            for subcategoria, palavras in subcategorias.items():
-                if any(self._normalizar_texto(palavra) in descricao_normalizada for palavra in palavras):
-                    return f"{categoria_principal}_{subcategoria}"
-        return None
-
     def obter_todas_categorias(self) -> Dict[str, List[str]]:
         """Retorna todas as categorias organizadas por tipo"""
         categorias = {
@@ -271,17 +642,106 @@ class CategorizadorAutomatico:
 
         return categorias
 
-    def adicionar_categoria_personalizada(self, tipo_gasto: TipoGasto, categoria: str, palavras_chave: List[str]):
-        """Permite adicionar categorias personalizadas"""
+    def registrar_gerenciador(self, gerenciador: Any):
+        """Registra um gerenciador de transações para ser reclassificado quando as regras mudarem"""
+        with self._lock_regras:
+            self._gerenciadores.add(gerenciador)
+
+    def adicionar_categoria_personalizada(self, tipo_gasto: TipoGasto, categoria: str,
+                                          palavras_chave: List[str]) -> Dict[Any, int]:
+        """
+        Permite adicionar categorias personalizadas
+
+        A regra vale para o processo inteiro: cada gerenciador registrado
+        reclassifica as transações que podem conter as palavras-chave novas ou
+        as substituídas e notifica seus ouvintes (ex.: o diário).
+
+        Returns:
+            Gerenciador -> quantidade de transações dele cuja classificação mudou
+        """
+        with self._lock_regras:
+            palavras_afetadas = list(palavras_chave) + self._palavras_categoria_personalizada(tipo_gasto, categoria)
+            if tipo_gasto == TipoGasto.ESSENCIAL:
+                # Para essenciais, adicionar como nova subcategoria em 'outros'
+                if 'outros' not in self.categorias_essenciais:
+                    self.categorias_essenciais['outros'] = {}
+                self.categorias_essenciais['outros'][categoria] = palavras_chave
+            elif tipo_gasto == TipoGasto.VARIAVEL:
+                # Para variáveis, adicionar como nova subcategoria em 'outros'
+                if 'outros' not in self.categorias_variaveis:
+                    self.categorias_variaveis['outros'] = {}
+                self.categorias_variaveis['outros'][categoria] = palavras_chave
+            elif tipo_gasto == TipoGasto.INVESTIMENTO:
+                self.categorias_investimentos[categoria] = palavras_chave
+
+            # Troca atômica: quem já leu a versão anterior continua com ela
+            self._regras = self._compilar_regras(versao=self._regras.versao + 1)
+            self._cache.invalidar()
+            gerenciadores = list(self._gerenciadores)
+
+        # Fora do lock das regras: cada gerenciador só toma o próprio lock de escrita
+        return {
+            gerenciador: gerenciador.reclassificar_palavras_chave(palavras_afetadas)
+            for gerenciador in gerenciadores
+        }
+
+    def _palavras_categoria_personalizada(self, tipo_gasto: TipoGasto, categoria: str) -> List[str]:
+        """Retorna as palavras-chave atuais de uma categoria personalizada, se existir"""
         if tipo_gasto == TipoGasto.ESSENCIAL:
-            # Para essenciais, adicionar como nova subcategoria em 'outros'
-            if 'outros' not in self.categorias_essenciais:
-                self.categorias_essenciais['outros'] = {}
-            self.categorias_essenciais['outros'][categoria] = palavras_chave
-        elif tipo_gasto == TipoGasto.VARIAVEL:
-            # Para variáveis, adicionar como nova subcategoria em 'outros'
-            if 'outros' not in self.categorias_variaveis:
-                self.categorias_variaveis['outros'] = {}
-            self.categorias_variaveis['outros'][categoria] = palavras_chave
-        elif tipo_gasto == TipoGasto.INVESTIMENTO:
-            self.categorias_investimentos[categoria] = palavras_chave
+            return list(self.categorias_essenciais.get('outros', {}).get(categoria, []))
+        if tipo_gasto == TipoGasto.VARIAVEL:
+            return list(self.categorias_variaveis.get('outros', {}).get(categoria, []))
+        if tipo_gasto == TipoGasto.INVESTIMENTO:
+            return list(self.categorias_investimentos.get(categoria, []))
+        return []
+
+
+# Regras recebidas por cada processo da classificação paralela
+_regras_worker: Optional[RegrasCompiladas] = None
+
+def _inicializar_worker(regras: RegrasCompiladas):
+    """Recebe as regras compiladas uma única vez por processo"""
+    global _regras_worker
+    _regras_worker = regras
+
+def _classificar_bloco(pares: List[Tuple[str, int]]) -> List[tuple]:
+    """Classifica um bloco de pares (descrição normalizada, sinal) no processo worker"""
+    return [_regras_worker.classificar(descricao, sinal) for descricao, sinal in pares]
+
+def _classificar_em_paralelo(regras: RegrasCompiladas, pares: List[Tuple[str, int]],
+                             max_workers: Optional[int], tamanho_bloco: int) -> List[tuple]:
+    """
+    Distribui os pares entre processos e junta os resultados na ordem original
+
+    Executor.map preserva a ordem dos blocos, então o resultado é idêntico
+    ao da classificação serial independentemente de qual processo termina
+    primeiro.
+    """
+    blocos = [pares[inicio:inicio + tamanho_bloco] for inicio in range(0, len(pares), tamanho_bloco)]
+    resultados = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_worker,
+                             initargs=(regras,)) as executor:
+        for resultado_bloco in executor.map(_classificar_bloco, blocos):
+            resultados.extend(resultado_bloco)
+    return resultados
+
+
+# Registro do categorizador compartilhado pelo processo
+_categorizador_compartilhado: Optional[CategorizadorAutomatico] = None
+_lock_registro = threading.Lock()
+
+def obter_categorizador_compartilhado() -> CategorizadorAutomatico:
+    """
+    Retorna a instância única de CategorizadorAutomatico do processo
+
+    As transações classificam contra esta instância em vez de construir
+    a árvore de regras a cada objeto criado. As palavras-chave já
+    normalizadas são lidas do snapshot em CAMINHO_SNAPSHOT_REGRAS quando ele
+    está atualizado.
+    """
+    global _categorizador_compartilhado
+    if _categorizador_compartilhado is None:
+        with _lock_registro:
+            if _categorizador_compartilhado is None:
+                _categorizador_compartilhado = CategorizadorAutomatico(caminho_snapshot=CAMINHO_SNAPSHOT_REGRAS)
+    return _categorizador_compartilhado
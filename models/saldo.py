@@ -0,0 +1,102 @@
+"""
+Somas de fluxo por data para FinTrack360
+
+Árvore de Fenwick (Binary Indexed Tree) indexada pelo dia: registrar um
+movimento e consultar o saldo até uma data ou o fluxo entre duas datas
+custam O(log d), em que d é a quantidade de dias cobertos pelo livro.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+# Dias de folga deixados em cada ponta ao (re)dimensionar a árvore,
+# para que lançamentos próximos das pontas não forcem nova reconstrução
+FOLGA_DIAS = 366
+
+
+class ArvoreFenwick:
+    """Árvore de Fenwick sobre posições 0..tamanho-1 com somas de prefixo"""
+
+    def __init__(self, valores: List[float]):
+        # Construção em O(n): cada nó repassa seu total ao nó pai
+        self._arvore = [0.0] + list(valores)
+        tamanho = len(self._arvore)
+        for indice in range(1, tamanho):
+            pai = indice + (indice & -indice)
+            if pai < tamanho:
+                self._arvore[pai] += self._arvore[indice]
+
+    def __len__(self) -> int:
+        return len(self._arvore) - 1
+
+    def somar(self, posicao: int, valor: float):
+        """Soma `valor` à posição informada"""
+        indice = posicao + 1
+        tamanho = len(self._arvore)
+        while indice < tamanho:
+            self._arvore[indice] += valor
+            indice += indice & -indice
+
+    def prefixo(self, posicao: int) -> float:
+        """Soma das posições 0..posicao (inclusive); 0.0 se posicao < 0"""
+        indice = min(posicao + 1, len(self._arvore) - 1)
+        total = 0.0
+        while indice > 0:
+            total += self._arvore[indice]
+            indice -= indice & -indice
+        return total
+
+
+class FluxoPorData:
+    """
+    Movimentos líquidos agregados por dia, com saldo até uma data e fluxo
+    de um período em O(log d)
+
+    A árvore cobre um intervalo de dias que cresce sob demanda: uma data
+    fora dele reconstrói a árvore a partir dos totais diários.
+    """
+
+    def __init__(self):
+        self._por_dia: Dict[int, float] = {}
+        self._primeiro_dia = 0
+        self._arvore = ArvoreFenwick([])
+
+    def registrar(self, data: date, valor: float):
+        """Soma um movimento (positivo ou negativo) ao dia informado"""
+        dia = data.toordinal()
+        self._por_dia[dia] = self._por_dia.get(dia, 0.0) + valor
+        posicao = dia - self._primeiro_dia
+        if 0 <= posicao < len(self._arvore):
+            self._arvore.somar(posicao, valor)
+        else:
+            self._reconstruir()
+
+    def reconstruir(self, movimentos: Iterable[Tuple[date, float]]):
+        """Substitui todos os movimentos de uma vez (O(n + d))"""
+        self._por_dia = {}
+        for data, valor in movimentos:
+            dia = data.toordinal()
+            self._por_dia[dia] = self._por_dia.get(dia, 0.0) + valor
+        self._reconstruir()
+
+    def _reconstruir(self):
+        if not self._por_dia:
+            self._primeiro_dia = 0
+            self._arvore = ArvoreFenwick([])
+            return
+        self._primeiro_dia = min(self._por_dia) - FOLGA_DIAS
+        valores = [0.0] * (max(self._por_dia) + FOLGA_DIAS - self._primeiro_dia + 1)
+        for dia, valor in self._por_dia.items():
+            valores[dia - self._primeiro_dia] = valor
+        self._arvore = ArvoreFenwick(valores)
+
+    def saldo_em(self, data: date) -> float:
+        """Soma de todos os movimentos até a data (inclusive)"""
+        return self._arvore.prefixo(data.toordinal() - self._primeiro_dia)
+
+    def fluxo_periodo(self, inicio: date, fim: date) -> float:
+        """Soma dos movimentos entre as datas (ambas inclusive)"""
+        if fim < inicio:
+            return 0.0
+        return self._arvore.prefixo(fim.toordinal() - self._primeiro_dia) - \
+            self._arvore.prefixo(inicio.toordinal() - self._primeiro_dia - 1)
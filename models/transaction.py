@@ -2,49 +2,103 @@
 Modelo de transações financeiras para FinTrack360
 """
 
-from datetime import datetime, date
-from dataclasses import dataclass, field
-from typing import Optional, List
+import sys
+import threading
+from collections import Counter
+from collections.abc import Sequence
+from datetime import datetime, date, timedelta
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, Optional, List, Set, Tuple, Union
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate
+from operator import attrgetter
+import numpy as np
 import pandas as pd
-from .categories import CategorizadorAutomatico, TipoTransacao, TipoGasto
+from .categories import TipoTransacao, TipoGasto, normalizar_texto, obter_categorizador_compartilhado
+from .saldo import FluxoPorData
+from utils.concorrencia import LockLeituraEscrita, escrita, leitura
+
+# Tamanho dos pedaços do índice que leva das palavras-chave aos tokens que as contêm
+TAMANHO_GRAMA = 3
+
+def _internar(texto):
+    """Interna strings (repetidas aos milhares num livro) para que compartilhem memória"""
+    return sys.intern(texto) if type(texto) is str else texto
 
-@dataclass
 class Transacao:
-    """Classe que representa uma transação financeira"""
-    data: date
-    descricao: str
-    valor: float
-    tipo_transacao: TipoTransacao = field(init=False)
-    tipo_gasto: Optional[TipoGasto] = field(init=False)
-    categoria: str = field(init=False)
-    recorrente: bool = False
-    mes: int = field(init=False)
-    semana: int = field(init=False)
-    saldo_acumulado: float = field(init=False, default=0.0)
-    percentual_salario: float = field(init=False, default=0.0)
-    status_meta: str = field(init=False, default="")
-    
-    def __post_init__(self):
-        """Inicialização automática após criação do objeto"""
-        self.mes = self.data.month
-        self.semana = self._calcular_semana()
-        
-        # Classificação automática
-        categorizador = CategorizadorAutomatico()
-        self.tipo_transacao, self.tipo_gasto, self.categoria = categorizador.classificar_transacao(
-            self.descricao, self.valor
-        )
+    """
+    Classe que representa uma transação financeira
+    
+    Compacta para livros grandes: os atributos ficam em __slots__ (sem __dict__
+    por instância), descrição e categoria são internadas (descrições repetidas
+    compartilham a mesma string) e mês/semana são derivados da data quando
+    consultados. Construção, comparação e repr são os do antigo dataclass.
+    """
+    __slots__ = ('id', 'data', 'descricao', 'valor', 'tipo_transacao', 'tipo_gasto', '_categoria',
+                 'recorrente', 'saldo_acumulado', 'percentual_salario', 'status_meta')
+    
+    # Campos exibidos no repr e usados na comparação, na ordem original
+    _CAMPOS = ('data', 'descricao', 'valor', 'tipo_transacao', 'tipo_gasto', 'categoria', 'recorrente',
+               'mes', 'semana', 'saldo_acumulado', 'percentual_salario', 'status_meta')
+    
+    def __init__(self, data: date, descricao: str, valor: float, recorrente: bool = False,
+                 classificacao: Optional[tuple] = None):
+        self.id: Optional[int] = None  # atribuído pelo GerenciadorTransacoes
+        self.data = data
+        self.descricao = _internar(descricao)
+        self.valor = valor
+        self.recorrente = recorrente
+        self.saldo_acumulado = 0.0
+        self.percentual_salario = 0.0
+        self.status_meta = ""
+        
+        # Classificação automática contra o categorizador compartilhado,
+        # a menos que já tenha sido calculada em lote (classificar_lote)
+        if classificacao is None:
+            categorizador = obter_categorizador_compartilhado()
+            classificacao = categorizador.classificar_transacao(self.descricao, self.valor)
+        self.tipo_transacao, self.tipo_gasto, self.categoria = classificacao
+    
+    @property
+    def categoria(self) -> str:
+        return self._categoria
+    
+    @categoria.setter
+    def categoria(self, categoria: str):
+        self._categoria = _internar(categoria)
+    
+    @property
+    def mes(self) -> int:
+        return self.data.month
+    
+    @property
+    def semana(self) -> int:
+        return self._calcular_semana()
     
     def _calcular_semana(self) -> int:
         """Calcula a semana do mês baseada na data"""
-        primeiro_dia = self.data.replace(day=1)
-        dias_diferenca = (self.data - primeiro_dia).days
-        return (dias_diferenca // 7) + 1
+        return (self.data.day - 1) // 7 + 1
+    
+    def _valores(self) -> tuple:
+        return tuple(getattr(self, campo) for campo in self._CAMPOS)
+    
+    def __repr__(self) -> str:
+        campos = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self._CAMPOS)
+        return f"{type(self).__name__}({campos})"
+    
+    def __eq__(self, outra) -> bool:
+        if outra.__class__ is not self.__class__:
+            return NotImplemented
+        return self._valores() == outra._valores()
+    
+    __hash__ = None
     
     def atualizar_percentual_salario(self, salario_mensal: float):
-        """Atualiza o percentual em relação ao salário mensal"""
+        """Atualiza o percentual em relação ao salário mensal (zero se o mês ficou sem renda)"""
         if salario_mensal > 0:
             self.percentual_salario = (abs(self.valor) / salario_mensal) * 100
+        else:
+            self.percentual_salario = 0.0
     
     def atualizar_status_meta(self, gasto_atual_categoria: float, limite_categoria: float):
         """Atualiza o status em relação à meta 50-30-20"""
@@ -57,116 +111,847 @@ class Transacao:
         else:
             self.status_meta = "Acima do limite"
 
+def _gramas(texto: str) -> Set[str]:
+    """Pedaços de TAMANHO_GRAMA caracteres do texto (o próprio texto, se for mais curto)"""
+    if len(texto) <= TAMANHO_GRAMA:
+        return {texto}
+    return {texto[inicio:inicio + TAMANHO_GRAMA] for inicio in range(len(texto) - TAMANHO_GRAMA + 1)}
+
+def _pedacos_indexados(token: str) -> Set[str]:
+    """Todos os pedaços de 1 a TAMANHO_GRAMA caracteres do token: cobrem _gramas de qualquer trecho dele"""
+    return {
+        token[inicio:inicio + tamanho]
+        for tamanho in range(1, TAMANHO_GRAMA + 1)
+        for inicio in range(len(token) - tamanho + 1)
+    }
+
+def _movimento(transacao: Transacao) -> float:
+    """Efeito da transação no saldo: entradas somam, as demais subtraem o valor absoluto"""
+    return transacao.valor if transacao.tipo_transacao == TipoTransacao.ENTRADA else -abs(transacao.valor)
+
+@dataclass
+class ResumoMensal:
+    """Agregados de um mês, mantidos incrementalmente pelo GerenciadorTransacoes"""
+    renda: float = 0.0
+    gastos_por_tipo: Dict[TipoGasto, float] = field(default_factory=lambda: {
+        TipoGasto.ESSENCIAL: 0.0,
+        TipoGasto.VARIAVEL: 0.0,
+        TipoGasto.INVESTIMENTO: 0.0
+    })
+    gastos_por_categoria: Dict[str, float] = field(default_factory=dict)
+    saldo_final: float = 0.0
+    quantidade: int = 0
+    _quantidade_por_categoria: Dict[str, int] = field(default_factory=dict, repr=False)
+    
+    def copia(self, saldo_final: float) -> 'ResumoMensal':
+        """Cópia independente (dicionários inclusive) com o saldo final informado"""
+        return replace(
+            self,
+            gastos_por_tipo=dict(self.gastos_por_tipo),
+            gastos_por_categoria=dict(self.gastos_por_categoria),
+            saldo_final=saldo_final,
+            _quantidade_por_categoria=dict(self._quantidade_por_categoria)
+        )
+    
+    def registrar(self, transacao: Transacao):
+        """Soma a transação aos agregados do mês"""
+        self._aplicar(transacao, 1)
+    
+    def remover(self, transacao: Transacao):
+        """Retira a transação dos agregados do mês"""
+        self._aplicar(transacao, -1)
+    
+    def _aplicar(self, transacao: Transacao, sinal: int):
+        self.quantidade += sinal
+        if transacao.tipo_transacao == TipoTransacao.ENTRADA:
+            self.renda += sinal * abs(transacao.valor)
+            return
+        
+        valor = sinal * abs(transacao.valor)
+        if transacao.tipo_gasto:
+            self.gastos_por_tipo[transacao.tipo_gasto] += valor
+        
+        # Categorias sem transações saem do resumo, como num cálculo do zero
+        categoria = transacao.categoria
+        quantidade = self._quantidade_por_categoria.get(categoria, 0) + sinal
+        if quantidade > 0:
+            self._quantidade_por_categoria[categoria] = quantidade
+            self.gastos_por_categoria[categoria] = self.gastos_por_categoria.get(categoria, 0.0) + valor
+        else:
+            self._quantidade_por_categoria.pop(categoria, None)
+            self.gastos_por_categoria.pop(categoria, None)
+
+@dataclass(frozen=True)
+class SnapshotLivro:
+    """
+    Livro congelado numa versão, para leitura concorrente
+    
+    O DataFrame (no formato de exportar_para_dataframe) é só de leitura:
+    quem precisar alterá-lo deve trabalhar numa cópia.
+    """
+    versao: int
+    dados: pd.DataFrame
+    
+    @property
+    def quantidade(self) -> int:
+        return len(self.dados)
+
+class FatiaTransacoes(Sequence):
+    """
+    Visão somente leitura, sem cópia, de um trecho contíguo do livro ordenado
+    
+    Vale até a próxima alteração do gerenciador que a criou.
+    """
+    __slots__ = ('_transacoes', '_posicoes')
+    
+    def __init__(self, transacoes: List[Transacao], posicoes: range):
+        self._transacoes = transacoes
+        self._posicoes = posicoes
+    
+    def __len__(self) -> int:
+        return len(self._posicoes)
+    
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return FatiaTransacoes(self._transacoes, self._posicoes[indice])
+        return self._transacoes[self._posicoes[indice]]
+    
+    def __iter__(self):
+        return map(self._transacoes.__getitem__, self._posicoes)
+    
+    def __repr__(self) -> str:
+        return f"FatiaTransacoes({list(self)!r})"
+
 class GerenciadorTransacoes:
     """Classe para gerenciar todas as transações"""
     
     def __init__(self):
-        self.transacoes: List[Transacao] = []
-        self.categorizador = CategorizadorAutomatico()
+        # Transações mantidas sempre ordenadas por data (empates na ordem de inserção)
+        self._transacoes: List[Transacao] = []
+        self._datas: List[date] = []
+        
+        # Movimentos por dia numa árvore de Fenwick: saldo até uma data em O(log d).
+        # O saldo_acumulado de cada transação só é calculado quando ela é lida;
+        # as posições a partir de _saldos_validos_ate estão pendentes
+        self._fluxo = FluxoPorData()
+        self._saldos_validos_ate = 0
+        self.categorizador = obter_categorizador_compartilhado()
+        
+        # Índice de meses: (ano, mes) -> [inicio, fim) do trecho contíguo em self._transacoes
+        self._indice_meses: Dict[Tuple[int, int], List[int]] = {}
+        self._meses_ordenados: List[Tuple[int, int]] = []
+        
+        # Agregados por (ano, mes), atualizados a cada inserção
+        self._resumos: Dict[Tuple[int, int], ResumoMensal] = {}
+        
+        # IDs estáveis: não mudam com inserções, edições ou remoções de outras transações
+        self._por_id: Dict[int, Transacao] = {}
+        self._proximo_id = 1
+        
+        # Índice invertido: token normalizado da descrição -> transações (por ID),
+        # e cada pedaço de até TAMANHO_GRAMA caracteres -> tokens do vocabulário que o contêm
+        self._indice_tokens: Dict[str, Dict[int, Transacao]] = {}
+        self._indice_gramas: Dict[str, Set[str]] = {}
+        
+        # Leituras em paralelo, escritas serializadas; cada escrita avança a
+        # versão do livro. Leitores que precisam de uma visão estável entre
+        # várias chamadas usam snapshot(), reconstruído só quando a versão muda.
+        # Os saldos pendentes são materializados por leitores: _lock_saldos
+        # impede que dois deles calculem o mesmo trecho ao mesmo tempo
+        self._lock = LockLeituraEscrita()
+        self._lock_saldos = threading.Lock()
+        self._lock_snapshot = threading.Lock()
+        self._versao = 0
+        self._snapshot = SnapshotLivro(0, self.exportar_para_dataframe())
+        
+        # Ouvintes de inserções, edições e remoções (ex.: o diário do DataManager)
+        self._ouvintes: List[Callable[[str, List[Transacao], int], None]] = []
+        
+        # Categorias personalizadas valem para o processo: o categorizador avisa este livro
+        self.categorizador.registrar_gerenciador(self)
     
-    def adicionar_transacao(self, data: date, descricao: str, valor: float, recorrente: bool = False) -> Transacao:
-        """Adiciona uma nova transação"""
+    @escrita
+    def adicionar_transacao(self, data: date, descricao: str, valor: float, recorrente: bool = False,
+                            classificacao: Optional[tuple] = None, id_transacao: Optional[int] = None) -> Transacao:
+        """Adiciona uma nova transação (id_transacao preserva o ID de uma transação já salva e não pode estar em uso)"""
         transacao = Transacao(
             data=data,
             descricao=descricao,
             valor=valor,
-            recorrente=recorrente
+            recorrente=recorrente,
+            classificacao=classificacao
         )
+        self._registrar_id(transacao, id_transacao)
+        
+        # Inserção ordenada: só os saldos a partir da posição e o mês da transação mudam
+        posicao = bisect_right(self._datas, transacao.data)
+        self._anexar(transacao, posicao)
+        self._atualizar_metas({(transacao.data.year, transacao.data.month)})
+        self._calcular_saldo_devolvido(posicao)
+        self._notificar('inserir', [transacao])
+        
+        return transacao
+    
+    @escrita
+    def editar_transacao(self, id_transacao: int, data: Optional[date] = None, descricao: Optional[str] = None,
+                         valor: Optional[float] = None, recorrente: Optional[bool] = None,
+                         classificacao: Optional[tuple] = None) -> Optional[Transacao]:
+        """
+        Altera os campos informados de uma transação, mantendo o ID
         
-        self.transacoes.append(transacao)
-        self._recalcular_saldos()
-        self._atualizar_metas()
+        Equivale a remover e adicionar de novo (a transação é reclassificada se
+        a descrição ou o valor mudarem, a menos que a classificacao seja
+        informada), mas só os meses envolvidos têm as metas recalculadas e só
+        os saldos a partir da primeira posição afetada ficam pendentes. Se a
+        data não muda, a transação mantém sua posição no dia.
+        
+        Returns:
+            A transação alterada, ou None se o ID não existir
+        """
+        transacao = self._por_id.get(id_transacao)
+        if transacao is None:
+            return None
+        
+        if data is None and descricao is None and valor is None and classificacao is None:
+            # Só a marcação de recorrente: nada derivado muda
+            if recorrente is not None:
+                transacao.recorrente = recorrente
+                self._registrar_alteracao()
+                self._notificar('editar', [transacao])
+            self._calcular_saldo_devolvido(self._posicao(transacao))
+            return transacao
+        
+        data_anterior = transacao.data
+        posicao_anterior = self._desanexar(transacao)
+        
+        reclassificar = (descricao is not None and descricao != transacao.descricao) or \
+            (valor is not None and valor != transacao.valor)
+        if data is not None:
+            transacao.data = data
+        if descricao is not None:
+            transacao.descricao = _internar(descricao)
+        if valor is not None:
+            transacao.valor = valor
+        if recorrente is not None:
+            transacao.recorrente = recorrente
+        if classificacao is not None:
+            transacao.tipo_transacao, transacao.tipo_gasto, transacao.categoria = classificacao
+        elif reclassificar:
+            transacao.tipo_transacao, transacao.tipo_gasto, transacao.categoria = \
+                self.categorizador.classificar_transacao(transacao.descricao, transacao.valor)
+        transacao.percentual_salario = 0.0
+        transacao.status_meta = ""
+        
+        # Mesma data: volta para a mesma posição; senão, fim do novo dia
+        if transacao.data == data_anterior:
+            posicao = posicao_anterior
+        else:
+            posicao = bisect_right(self._datas, transacao.data)
+        self._anexar(transacao, posicao)
+        self._invalidar_saldos(min(posicao, posicao_anterior))
+        self._atualizar_metas({(data_anterior.year, data_anterior.month), (transacao.data.year, transacao.data.month)})
+        self._calcular_saldo_devolvido(posicao)
+        self._notificar('editar', [transacao])
         
         return transacao
     
+    @escrita
+    def remover_transacao(self, id_transacao: int) -> Optional[Transacao]:
+        """
+        Remove uma transação pelo ID, atualizando apenas o mês dela e os
+        saldos a partir da sua posição
+        
+        Returns:
+            A transação removida, ou None se o ID não existir
+        """
+        transacao = self._por_id.pop(id_transacao, None)
+        if transacao is None:
+            return None
+        
+        self._desanexar(transacao)
+        self._atualizar_metas({(transacao.data.year, transacao.data.month)})
+        self._notificar('remover', [transacao])
+        return transacao
+    
+    @leitura
+    def obter_transacao(self, id_transacao: int) -> Optional[Transacao]:
+        """Retorna a transação com o ID informado (None se não existir)"""
+        transacao = self._por_id.get(id_transacao)
+        if transacao is not None:
+            self._calcular_saldo_devolvido(self._posicao(transacao))
+        return transacao
+    
+    def _registrar_id(self, transacao: Transacao, id_transacao: Optional[int] = None):
+        """
+        Atribui o ID pedido ou, sem pedido, o próximo disponível
+        
+        Raises:
+            ValueError: o ID pedido já pertence a outra transação. Dar outro ID
+                em silêncio mudaria a identidade de uma linha reaplicada ou importada.
+        """
+        if id_transacao is None:
+            id_transacao = self._proximo_id
+        elif id_transacao in self._por_id:
+            raise ValueError(f"ID de transação já em uso: {id_transacao}")
+        transacao.id = id_transacao
+        self._por_id[id_transacao] = transacao
+        self._proximo_id = max(self._proximo_id, id_transacao + 1)
+    
+    def _posicao(self, transacao: Transacao) -> int:
+        """Posição atual da transação: busca binária pela data e varredura só entre as do mesmo dia"""
+        posicao = bisect_left(self._datas, transacao.data)
+        while self._transacoes[posicao] is not transacao:
+            posicao += 1
+        return posicao
+    
+    def _anexar(self, transacao: Transacao, posicao: int):
+        """Insere a transação na posição e atualiza índices, agregados e saldos (exceto metas)"""
+        self._transacoes.insert(posicao, transacao)
+        self._datas.insert(posicao, transacao.data)
+        self._registrar_no_indice_meses(transacao, posicao)
+        self._resumo_da_transacao(transacao).registrar(transacao)
+        self._indexar_tokens(transacao)
+        self._fluxo.registrar(transacao.data, _movimento(transacao))
+        self._invalidar_saldos(posicao)
+        self._registrar_alteracao()
+    
+    def _desanexar(self, transacao: Transacao) -> int:
+        """Retira a transação da lista e de índices, agregados e saldos; devolve a posição que ocupava"""
+        posicao = self._posicao(transacao)
+        del self._transacoes[posicao]
+        del self._datas[posicao]
+        self._remover_do_indice_meses(transacao, posicao)
+        
+        chave = (transacao.data.year, transacao.data.month)
+        resumo = self._resumos[chave]
+        resumo.remover(transacao)
+        if not resumo.quantidade:
+            del self._resumos[chave]
+        
+        self._desindexar_tokens(transacao)
+        self._fluxo.registrar(transacao.data, -_movimento(transacao))
+        self._invalidar_saldos(posicao)
+        self._registrar_alteracao()
+        return posicao
+    
+    def _registrar_alteracao(self):
+        """Avança a versão do livro (o snapshot publicado passa a estar desatualizado)"""
+        self._versao += 1
+    
+    def adicionar_ouvinte(self, ouvinte: Callable[[str, List[Transacao], int], None]):
+        """
+        Registra uma função chamada a cada inserção, edição ou remoção com
+        (operacao, transacoes, versao), operacao sendo 'inserir', 'editar'
+        ou 'remover'
+        
+        A chamada acontece dentro do lock de escrita, logo na ordem exata
+        das alterações; reclassificações não são notificadas (a categoria é
+        derivada da descrição e do valor).
+        """
+        with self._lock.escrita():
+            self._ouvintes.append(ouvinte)
+    
+    def _notificar(self, operacao: str, transacoes: List[Transacao]):
+        """Repassa a alteração aos ouvintes registrados"""
+        for ouvinte in self._ouvintes:
+            ouvinte(operacao, transacoes, self._versao)
+    
+    @property
+    def versao(self) -> int:
+        """Versão atual do livro; cresce a cada escrita"""
+        return self._versao
+    
+    def snapshot(self) -> SnapshotLivro:
+        """
+        Retorna o livro como um snapshot imutável e versionado
+        
+        Sem lock no caminho comum: se o snapshot publicado já é da versão
+        atual, basta ler o atributo. A primeira leitura depois de uma escrita
+        espera a escrita terminar, reconstrói o snapshot e o publica com uma
+        única atribuição; quem já tinha o anterior continua com ele intacto,
+        e nenhum leitor vê uma inserção pela metade.
+        """
+        snapshot = self._snapshot
+        if snapshot.versao == self._versao:
+            return snapshot
+        with self._lock.leitura(), self._lock_snapshot:
+            if self._snapshot.versao != self._versao:
+                self._snapshot = SnapshotLivro(self._versao, self.exportar_para_dataframe())
+            return self._snapshot
+    
+    def _calcular_saldo_devolvido(self, posicao: int):
+        """Garante o saldo_acumulado da transação devolvida ao chamador"""
+        # Lançamento no fim do livro já calculado: basta uma soma. Retroativo: saldo
+        # da própria linha pela árvore; as posteriores ficam para quando forem lidas
+        if self._saldos_validos_ate == posicao:
+            self._materializar_saldos(posicao + 1)
+        else:
+            self._transacoes[posicao].saldo_acumulado = self._saldo_na_posicao(posicao)
+    
+    @escrita
+    def adicionar_transacoes(self, linhas: Union[pd.DataFrame, Iterable[Dict[str, Any]]]) -> List[Transacao]:
+        """
+        Adiciona várias transações de uma vez
+        
+        Aceita um DataFrame com as colunas data, descricao, valor e, opcionalmente,
+        recorrente e id, ou um iterável de dicts com essas chaves (e, opcionalmente,
+        classificacao). As transações são ordenadas uma única vez, os saldos
+        recalculados com uma única soma acumulada e as metas com uma passada
+        agrupada por mês. Se alguma linha falhar, nada é adicionado.
+        
+        O saldo_acumulado das transações devolvidas é calculado quando o livro
+        é lido (transacoes, obter_transacoes_mes, exportar_para_dataframe).
+        """
+        if isinstance(linhas, pd.DataFrame):
+            linhas = self._linhas_de_dataframe(linhas)
+        
+        # Primeiro todas as transações e os IDs pedidos: uma linha inválida
+        # (ou um ID repetido) interrompe antes de qualquer alteração no livro
+        novas = []
+        ids_pedidos = []
+        for linha in linhas:
+            novas.append(Transacao(
+                data=linha['data'],
+                descricao=linha['descricao'],
+                valor=linha['valor'],
+                recorrente=linha.get('recorrente', False),
+                classificacao=linha.get('classificacao')
+            ))
+            ids_pedidos.append(linha.get('id'))
+        if not novas:
+            return []
+        
+        pedidos = [id_transacao for id_transacao in ids_pedidos if id_transacao is not None]
+        repetidos = {id_transacao for id_transacao in pedidos if id_transacao in self._por_id}
+        repetidos.update(id_transacao for id_transacao, quantidade in Counter(pedidos).items() if quantidade > 1)
+        if repetidos:
+            raise ValueError(f"IDs de transação já em uso ou repetidos no lote: {sorted(repetidos)[:10]}")
+        for transacao, id_transacao in zip(novas, ids_pedidos):
+            self._registrar_id(transacao, id_transacao)
+        
+        havia_transacoes = bool(self._transacoes)
+        inicio = bisect_left(self._datas, min(t.data for t in novas))
+        
+        # Ordenação estável: empates mantêm as existentes antes das novas, como na inserção individual
+        self._transacoes.extend(novas)
+        self._transacoes.sort(key=attrgetter('data'))
+        self._datas = [t.data for t in self._transacoes]
+        self._reconstruir_indice_meses()
+        self._registrar_alteracao()
+        
+        for transacao in novas:
+            self._indexar_tokens(transacao)
+        
+        self._invalidar_saldos(inicio)
+        if havia_transacoes:
+            for transacao in novas:
+                self._resumo_da_transacao(transacao).registrar(transacao)
+                self._fluxo.registrar(transacao.data, _movimento(transacao))
+            self._atualizar_metas({(t.data.year, t.data.month) for t in novas})
+        else:
+            # Livro novo: árvore de saldos e agregados de todos os meses numa passada cada
+            self._fluxo.reconstruir((t.data, _movimento(t)) for t in self._transacoes)
+            self._atualizar_metas()
+        
+        self._notificar('inserir', novas)
+        return novas
+    
+    def _linhas_de_dataframe(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Converte um DataFrame em linhas, classificando todas as descrições em lote"""
+        datas = df['data']
+        if pd.api.types.is_datetime64_any_dtype(datas):
+            datas = datas.dt.date
+        recorrentes = df['recorrente'].tolist() if 'recorrente' in df.columns else [False] * len(df)
+        ids = df['id'].tolist() if 'id' in df.columns else [None] * len(df)
+        classificacoes = self.categorizador.classificar_lote(df['descricao'], df['valor'])
+        
+        return [
+            {
+                'data': data,
+                'descricao': str(descricao),
+                'valor': float(valor),
+                'recorrente': bool(recorrente),
+                'classificacao': classificacao,
+                'id': int(id_transacao) if pd.notna(id_transacao) else None
+            }
+            for data, descricao, valor, recorrente, classificacao, id_transacao in zip(
+                datas.tolist(), df['descricao'].tolist(), df['valor'].tolist(), recorrentes,
+                classificacoes.itertuples(index=False, name=None), ids
+            )
+        ]
+    
+    @property
+    @leitura
+    def transacoes(self) -> List[Transacao]:
+        """
+        Todas as transações, em ordem de data, com os saldos acumulados calculados
+        
+        Devolve uma cópia da lista, tirada sob o lock: inserções e remoções
+        posteriores não a alteram enquanto o chamador a percorre. Os objetos
+        são os do livro; para uma visão congelada inteira, use snapshot().
+        """
+        self._materializar_saldos()
+        return list(self._transacoes)
+    
+    @leitura
     def obter_transacoes_mes(self, mes: int, ano: int) -> List[Transacao]:
         """Retorna transações de um mês específico"""
-        return [t for t in self.transacoes 
-                if t.data.month == mes and t.data.year == ano]
+        faixa = self._indice_meses.get((ano, mes))
+        if faixa is None:
+            return []
+        self._materializar_saldos(faixa[1])
+        return self._transacoes[faixa[0]:faixa[1]]
+    
+    @leitura
+    def obter_transacoes_periodo(self, inicio: date, fim: date) -> FatiaTransacoes:
+        """
+        Retorna as transações entre as datas (ambas inclusive) como uma visão
+        sem cópia; os limites saem de busca binária nas datas, O(log n)
+        """
+        posicao_inicio = bisect_left(self._datas, inicio)
+        posicao_fim = max(posicao_inicio, bisect_right(self._datas, fim))
+        self._materializar_saldos(posicao_fim)
+        return FatiaTransacoes(self._transacoes, range(posicao_inicio, posicao_fim))
+    
+    @leitura
+    def contar_transacoes_periodo(self, inicio: date, fim: date) -> int:
+        """Quantidade de transações entre as datas (ambas inclusive), O(log n)"""
+        return max(0, bisect_right(self._datas, fim) - bisect_left(self._datas, inicio))
+    
+    @leitura
+    def obter_resumo_periodo(self, inicio: date, fim: date) -> ResumoMensal:
+        """
+        Agregados de um período qualquer (últimos 90 dias, trimestre...) no
+        formato do resumo mensal, em O(log n + k) para k transações no período;
+        saldo_final é o saldo ao fim da data final
+        """
+        resumo = ResumoMensal()
+        posicao_inicio = bisect_left(self._datas, inicio)
+        for transacao in self._transacoes[posicao_inicio:bisect_right(self._datas, fim)]:
+            resumo.registrar(transacao)
+        resumo.saldo_final = self._fluxo.saldo_em(fim)
+        return resumo
+    
+    @leitura
+    def obter_meses(self) -> List[Tuple[int, int]]:
+        """Retorna os meses com transações, em ordem, como pares (ano, mes)"""
+        return list(self._meses_ordenados)
+    
+    def _registrar_no_indice_meses(self, transacao: Transacao, posicao: int):
+        """Atualiza o índice de meses após inserir uma transação na posição informada"""
+        chave = (transacao.data.year, transacao.data.month)
+        faixa = self._indice_meses.get(chave)
+        if faixa is None:
+            insort(self._meses_ordenados, chave)
+            faixa = self._indice_meses[chave] = [posicao, posicao]
+        faixa[1] += 1
+        
+        # Meses posteriores deslocam uma posição
+        for chave_posterior in self._meses_ordenados[bisect_right(self._meses_ordenados, chave):]:
+            faixa_posterior = self._indice_meses[chave_posterior]
+            faixa_posterior[0] += 1
+            faixa_posterior[1] += 1
+    
+    def _remover_do_indice_meses(self, transacao: Transacao, posicao: int):
+        """Atualiza o índice de meses após retirar a transação que estava na posição informada"""
+        chave = (transacao.data.year, transacao.data.month)
+        faixa = self._indice_meses[chave]
+        faixa[1] -= 1
+        indice_chave = bisect_left(self._meses_ordenados, chave)
+        if faixa[0] == faixa[1]:
+            del self._indice_meses[chave]
+            del self._meses_ordenados[indice_chave]
+        else:
+            indice_chave += 1
+        
+        # Meses posteriores recuam uma posição
+        for chave_posterior in self._meses_ordenados[indice_chave:]:
+            faixa_posterior = self._indice_meses[chave_posterior]
+            faixa_posterior[0] -= 1
+            faixa_posterior[1] -= 1
+    
+    def _reconstruir_indice_meses(self):
+        """Reconstrói o índice de meses numa única passada pela lista ordenada"""
+        self._indice_meses = {}
+        for posicao, data_transacao in enumerate(self._datas):
+            chave = (data_transacao.year, data_transacao.month)
+            faixa = self._indice_meses.get(chave)
+            if faixa is None:
+                self._indice_meses[chave] = [posicao, posicao + 1]
+            else:
+                faixa[1] = posicao + 1
+        self._meses_ordenados = list(self._indice_meses)
+    
+    @leitura
+    def obter_resumo_mes(self, mes: int, ano: int) -> ResumoMensal:
+        """
+        Retorna uma cópia dos agregados do mês (vazia se não houver transações)
+        
+        O resumo mantido pelo livro não sai daqui: alterações posteriores não
+        mudam a cópia devolvida, nem quem a recebe muda o livro.
+        """
+        resumo = self._resumos.get((ano, mes))
+        if resumo is None:
+            return ResumoMensal()
+        return resumo.copia(saldo_final=self.obter_saldo_atual(mes, ano))
     
+    @leitura
     def obter_renda_mensal(self, mes: int, ano: int) -> float:
         """Calcula a renda total do mês"""
-        transacoes_mes = self.obter_transacoes_mes(mes, ano)
-        renda = sum(abs(t.valor) for t in transacoes_mes
-                   if t.tipo_transacao == TipoTransacao.ENTRADA)
-        return float(renda)
+        return float(self.obter_resumo_mes(mes, ano).renda)
     
+    @leitura
     def obter_gastos_por_tipo(self, mes: int, ano: int) -> dict:
         """Retorna gastos agrupados por tipo (essencial, variável, investimento)"""
-        transacoes_mes = self.obter_transacoes_mes(mes, ano)
-        gastos = {
-            TipoGasto.ESSENCIAL: 0.0,
-            TipoGasto.VARIAVEL: 0.0,
-            TipoGasto.INVESTIMENTO: 0.0
-        }
-        
-        for transacao in transacoes_mes:
-            if transacao.tipo_gasto and transacao.tipo_transacao != TipoTransacao.ENTRADA:
-                gastos[transacao.tipo_gasto] += abs(transacao.valor)
-        
-        return gastos
+        return dict(self.obter_resumo_mes(mes, ano).gastos_por_tipo)
     
+    @leitura
+    def obter_gastos_por_categoria(self, mes: int, ano: int) -> Dict[str, float]:
+        """Retorna gastos (saídas e investimentos) agrupados por categoria específica"""
+        return dict(self.obter_resumo_mes(mes, ano).gastos_por_categoria)
+    
+    @leitura
     def obter_saldo_atual(self, mes: int, ano: int) -> float:
-        """Calcula o saldo atual do mês"""
-        transacoes_mes = self.obter_transacoes_mes(mes, ano)
-        if not transacoes_mes:
+        """Calcula o saldo atual do mês (saldo ao fim do último dia com transações)"""
+        faixa = self._indice_meses.get((ano, mes))
+        if faixa is None:
             return 0.0
+        return self._fluxo.saldo_em(self._datas[faixa[1] - 1])
+    
+    @leitura
+    def obter_saldo_em(self, data: date) -> float:
+        """Saldo acumulado ao fim do dia informado, em O(log d)"""
+        return self._fluxo.saldo_em(data)
+    
+    @leitura
+    def obter_fluxo_periodo(self, inicio: date, fim: date) -> float:
+        """Fluxo líquido (entradas menos saídas) entre as datas, ambas inclusive, em O(log d)"""
+        return self._fluxo.fluxo_periodo(inicio, fim)
+    
+    def _resumo_da_transacao(self, transacao: Transacao) -> ResumoMensal:
+        """Retorna (criando se preciso) o resumo do mês da transação"""
+        chave = (transacao.data.year, transacao.data.month)
+        resumo = self._resumos.get(chave)
+        if resumo is None:
+            resumo = self._resumos[chave] = ResumoMensal()
+        return resumo
+    
+    def adicionar_categoria_personalizada(self, tipo_gasto: TipoGasto, categoria: str,
+                                          palavras_chave: List[str]) -> int:
+        """
+        Adiciona (ou altera) uma categoria personalizada no categorizador compartilhado
+        
+        A regra vale para o processo inteiro: este e os demais gerenciadores
+        que usam o categorizador são reclassificados (ver
+        reclassificar_palavras_chave).
         
-        # Ordenar por data para pegar o último saldo
-        transacoes_ordenadas = sorted(transacoes_mes, key=lambda t: t.data)
-        return transacoes_ordenadas[-1].saldo_acumulado
+        Returns:
+            Quantidade de transações deste gerenciador cuja classificação mudou
+        """
+        reclassificadas = self.categorizador.adicionar_categoria_personalizada(tipo_gasto, categoria, palavras_chave)
+        return reclassificadas.get(self, 0)
     
-    def _recalcular_saldos(self):
-        """Recalcula os saldos acumulados de todas as transações"""
-        # Ordenar transações por data
-        self.transacoes.sort(key=lambda t: t.data)
+    @escrita
+    def reclassificar_palavras_chave(self, palavras_chave: Iterable[str]) -> int:
+        """
+        Reclassifica apenas as transações cujas descrições podem conter as
+        palavras-chave (de uma regra nova ou substituída) e notifica os
+        ouvintes com uma edição das que mudaram
         
-        saldo = 0.0
-        for transacao in self.transacoes:
-            if transacao.tipo_transacao == TipoTransacao.ENTRADA:
-                saldo += transacao.valor
-            else:
-                saldo -= abs(transacao.valor)
-            transacao.saldo_acumulado = saldo
-    
-    def _atualizar_metas(self):
-        """Atualiza o status das metas para todas as transações"""
-        # Agrupar por mês/ano
-        meses = {}
-        for transacao in self.transacoes:
-            chave_mes = (transacao.data.year, transacao.data.month)
-            if chave_mes not in meses:
-                meses[chave_mes] = []
-            meses[chave_mes].append(transacao)
-        
-        # Atualizar cada mês
-        for (ano, mes), transacoes_mes in meses.items():
-            renda_mensal = self.obter_renda_mensal(mes, ano)
-            gastos_por_tipo = self.obter_gastos_por_tipo(mes, ano)
+        Returns:
+            Quantidade de transações cuja classificação mudou
+        """
+        meses_afetados: Set[Tuple[int, int]] = set()
+        data_saldo_afetado: Optional[date] = None
+        reclassificadas: List[Transacao] = []
+        
+        for transacao in self._candidatas_reclassificacao(palavras_chave):
+            classificacao = self.categorizador.classificar_transacao(transacao.descricao, transacao.valor)
+            if classificacao == (transacao.tipo_transacao, transacao.tipo_gasto, transacao.categoria):
+                continue
+            
+            movimento_antes = _movimento(transacao)
+            resumo = self._resumo_da_transacao(transacao)
+            resumo.remover(transacao)
+            transacao.tipo_transacao, transacao.tipo_gasto, transacao.categoria = classificacao
+            resumo.registrar(transacao)
+            if transacao.tipo_gasto is None:
+                # Sem tipo de gasto o status não é recalculado; volta ao valor inicial
+                transacao.status_meta = ""
+            reclassificadas.append(transacao)
+            meses_afetados.add((transacao.data.year, transacao.data.month))
+            self._registrar_alteracao()
+            
+            # O saldo só muda se a transação passou a contar (ou deixou de contar) como entrada
+            movimento = _movimento(transacao)
+            if movimento != movimento_antes:
+                self._fluxo.registrar(transacao.data, movimento - movimento_antes)
+                if data_saldo_afetado is None or transacao.data < data_saldo_afetado:
+                    data_saldo_afetado = transacao.data
+        
+        if data_saldo_afetado is not None:
+            self._invalidar_saldos(bisect_left(self._datas, data_saldo_afetado))
+        if meses_afetados:
+            self._atualizar_metas(meses_afetados)
+        if reclassificadas:
+            self._notificar('editar', reclassificadas)
+        
+        return len(reclassificadas)
+    
+    def _indexar_tokens(self, transacao: Transacao):
+        """Registra a transação no índice invertido de tokens (e os tokens novos no de pedaços)"""
+        for token in set(normalizar_texto(transacao.descricao).split()):
+            transacoes = self._indice_tokens.get(token)
+            if transacoes is None:
+                transacoes = self._indice_tokens[token] = {}
+                for grama in _pedacos_indexados(token):
+                    self._indice_gramas.setdefault(grama, set()).add(token)
+            transacoes[transacao.id] = transacao
+    
+    def _desindexar_tokens(self, transacao: Transacao):
+        """Retira a transação do índice invertido de tokens"""
+        for token in set(normalizar_texto(transacao.descricao).split()):
+            transacoes = self._indice_tokens.get(token)
+            if transacoes is not None:
+                transacoes.pop(transacao.id, None)
+                if not transacoes:
+                    del self._indice_tokens[token]
+                    for grama in _pedacos_indexados(token):
+                        tokens = self._indice_gramas[grama]
+                        tokens.discard(token)
+                        if not tokens:
+                            del self._indice_gramas[grama]
+    
+    def _candidatas_reclassificacao(self, palavras_chave: Iterable[str]) -> List[Transacao]:
+        """
+        Usa o índice invertido para encontrar as transações que podem conter
+        alguma das palavras-chave
+        
+        Como a comparação das regras é por substring, uma descrição que contém
+        a palavra-chave contém também o maior pedaço dela sem espaços dentro
+        de um único token. Os tokens que podem contê-lo saem do índice de
+        pedaços (o menor conjunto entre os pedaços dele), sem percorrer o
+        vocabulário; cada um é conferido antes de suas transações entrarem.
+        """
+        candidatas: Dict[int, Transacao] = {}
+        for palavra in palavras_chave:
+            pedacos = normalizar_texto(palavra).split()
+            if not pedacos:
+                return list(self._transacoes)
+            pedaco = max(pedacos, key=len)
+            tokens = min(
+                (self._indice_gramas.get(grama, set()) for grama in _gramas(pedaco)),
+                key=len
+            )
+            for token in tokens:
+                if pedaco in token:
+                    candidatas.update(self._indice_tokens[token])
+        return list(candidatas.values())
+    
+    def _invalidar_saldos(self, inicio: int):
+        """Marca como pendentes os saldos a partir da posição informada"""
+        self._saldos_validos_ate = min(self._saldos_validos_ate, inicio)
+    
+    def _materializar_saldos(self, ate: Optional[int] = None):
+        """Calcula os saldos pendentes até a posição `ate` (exclusive; todas se omitida)"""
+        ate = len(self._transacoes) if ate is None else ate
+        if ate <= self._saldos_validos_ate:
+            return
+        
+        with self._lock_saldos:
+            inicio = self._saldos_validos_ate
+            if ate <= inicio:
+                return
+            saldo_inicial = self._transacoes[inicio - 1].saldo_acumulado if inicio > 0 else 0.0
+            trecho = self._transacoes[inicio:ate]
+            saldos = accumulate(map(_movimento, trecho), initial=saldo_inicial)
+            next(saldos)
+            for transacao, saldo in zip(trecho, saldos):
+                transacao.saldo_acumulado = saldo
+            self._saldos_validos_ate = ate
+    
+    def _saldo_na_posicao(self, posicao: int) -> float:
+        """Saldo após a transação da posição: árvore até a véspera mais as do mesmo dia até ela"""
+        data_transacao = self._datas[posicao]
+        saldo = self._fluxo.saldo_em(data_transacao - timedelta(days=1))
+        for transacao in self._transacoes[bisect_left(self._datas, data_transacao):posicao + 1]:
+            saldo += _movimento(transacao)
+        return saldo
+    
+    def _atualizar_metas(self, meses_afetados: Optional[Iterable[Tuple[int, int]]] = None):
+        """
+        Atualiza o status das metas das transações (de todos os meses ou apenas dos informados)
+        
+        Na atualização completa, renda e gastos por tipo de todos os meses são
+        recalculados juntos numa única passada pelo livro; em seguida cada mês
+        (um trecho contíguo da lista ordenada) recebe percentual e status.
+        """
+        if meses_afetados is None:
+            self._resumos = self._calcular_resumos()
+            meses_afetados = self._meses_ordenados
+        
+        for chave in meses_afetados:
+            faixa = self._indice_meses.get(chave)
+            if faixa is None:
+                continue
+            resumo = self._resumos[chave]
+            renda_mensal = resumo.renda
+            gastos_por_tipo = resumo.gastos_por_tipo
+            limites = {
+                tipo: self.categorizador.obter_limite_categoria(tipo, renda_mensal)
+                for tipo in gastos_por_tipo
+            }
             
-            for transacao in transacoes_mes:
+            for transacao in self._transacoes[faixa[0]:faixa[1]]:
                 transacao.atualizar_percentual_salario(renda_mensal)
                 
                 if transacao.tipo_gasto:
-                    limite = self.categorizador.obter_limite_categoria(transacao.tipo_gasto, renda_mensal)
-                    gasto_atual = gastos_por_tipo[transacao.tipo_gasto]
-                    transacao.atualizar_status_meta(gasto_atual, limite)
+                    transacao.atualizar_status_meta(gastos_por_tipo[transacao.tipo_gasto], limites[transacao.tipo_gasto])
     
+    def _calcular_resumos(self) -> Dict[Tuple[int, int], ResumoMensal]:
+        """Calcula do zero os agregados de todos os meses numa única passada"""
+        resumos: Dict[Tuple[int, int], ResumoMensal] = {}
+        chave_atual = None
+        resumo = None
+        for transacao in self._transacoes:
+            chave = (transacao.data.year, transacao.data.month)
+            if chave != chave_atual:
+                # A lista está ordenada: cada mês aparece uma única vez, em sequência
+                chave_atual = chave
+                resumo = resumos[chave] = ResumoMensal()
+            resumo.registrar(transacao)
+        return resumos
+    
+    @leitura
     def exportar_para_dataframe(self) -> pd.DataFrame:
-        """Exporta transações para DataFrame do pandas"""
-        dados = []
-        for t in self.transacoes:
-            dados.append({
-                'Data': t.data,
-                'Tipo': t.tipo_transacao.value if t.tipo_transacao else '',
-                'Categoria': t.categoria,
-                'Descrição': t.descricao,
-                'Valor (R$)': t.valor,
-                'Recorrente': 'Sim' if t.recorrente else 'Não',
-                'Semana': t.semana,
-                'Saldo Acumulado': t.saldo_acumulado,
-                '% do Salário': f"{t.percentual_salario:.1f}%",
-                'Meta 50-30-20': t.status_meta
-            })
-        
-        return pd.DataFrame(dados)
+        """
+        Exporta transações para DataFrame do pandas
+        
+        O DataFrame é montado direto das colunas (uma lista por campo, sem um
+        dict por linha); Tipo, Tipo Gasto, Categoria e Meta 50-30-20 saem como
+        categóricas. Tipo Gasto fica vazio nas entradas. Recorrente, Semana e
+        % do Salário são derivadas com operações do NumPy sobre a coluna toda.
+        """
+        self._materializar_saldos()
+        transacoes = self._transacoes
+        
+        def coluna(nome: str) -> list:
+            return list(map(attrgetter(nome), transacoes))
+        
+        datas = coluna('data')
+        dias = np.array(datas, dtype='datetime64[D]')
+        dias_no_mes = (dias - dias.astype('datetime64[M]')).astype(np.int64)
+        return pd.DataFrame({
+            'ID': coluna('id'),
+            'Data': datas,
+            'Tipo': pd.Categorical([tipo.value if tipo else '' for tipo in coluna('tipo_transacao')]),
+            'Tipo Gasto': pd.Categorical([tipo.value if tipo else '' for tipo in coluna('tipo_gasto')]),
+            'Categoria': pd.Categorical(coluna('categoria')),
+            'Descrição': coluna('descricao'),
+            'Valor (R$)': coluna('valor'),
+            'Recorrente': np.where(np.array(coluna('recorrente'), dtype=bool), 'Sim', 'Não'),
+            'Semana': dias_no_mes // 7 + 1,
+            'Saldo Acumulado': coluna('saldo_acumulado'),
+            '% do Salário': np.char.mod('%.1f%%', np.array(coluna('percentual_salario'), dtype=float)),
+            'Meta 50-30-20': pd.Categorical(coluna('status_meta'))
+        })
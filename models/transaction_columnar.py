@@ -0,0 +1,807 @@
+"""
+Armazenamento colunar de transações para FinTrack360
+
+Alternativa ao GerenciadorTransacoes para livros muito grandes: em vez de uma
+lista de objetos Transacao, cada campo fica numa coluna NumPy (datas em
+datetime64, valores em centavos int64, códigos pequenos para categoria,
+tipo e status e o saldo em float). Somas, máscaras e somas acumuladas são
+vetorizadas; para quem ainda trabalha com objetos, `obter_transacoes_mes`
+devolve visões que montam uma Transacao por linha sob demanda, e
+`transacoes` uma lista delas montada sob o lock.
+"""
+
+import threading
+from datetime import date, timedelta
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from .categories import TipoTransacao, TipoGasto, obter_categorizador_compartilhado
+from .transaction import Transacao, ResumoMensal, SnapshotLivro
+from utils.concorrencia import LockLeituraEscrita, escrita, leitura
+
+# Códigos das colunas de enums: posição do membro na enumeração
+TIPOS_TRANSACAO: List[TipoTransacao] = list(TipoTransacao)
+TIPOS_GASTO: List[TipoGasto] = list(TipoGasto)
+SEM_TIPO_GASTO = -1
+CODIGO_ENTRADA = TIPOS_TRANSACAO.index(TipoTransacao.ENTRADA)
+
+# Valores possíveis de status_meta, na ordem dos códigos da coluna
+STATUS_META = ["", "Entrada", "OK", "Abaixo da meta", "Acima do limite"]
+
+# Linhas alocadas na primeira inserção (a capacidade dobra quando enche)
+CAPACIDADE_INICIAL = 1024
+
+# Tipo de cada coluna do livro
+_TIPOS_COLUNAS = {
+    'ids': np.int64,
+    'datas': 'datetime64[D]',
+    'centavos': np.int64,
+    'descricoes': object,
+    'categorias': np.int32,
+    'tipos_transacao': np.int8,
+    'tipos_gasto': np.int8,
+    'recorrentes': np.bool_,
+    'saldos': np.float64,
+    'percentuais': np.float64,
+    'status': np.int8,
+}
+
+
+class VisaoTransacoes(Sequence):
+    """
+    Sequência somente leitura de linhas do livro colunar
+
+    Cada acesso monta uma Transacao com os valores atuais da linha; a visão
+    vale até a próxima alteração do gerenciador.
+    """
+
+    def __init__(self, gerenciador: 'GerenciadorTransacoesColunar', posicoes: Union[range, np.ndarray]):
+        self._gerenciador = gerenciador
+        self._posicoes = posicoes
+
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return VisaoTransacoes(self._gerenciador, self._posicoes[indice])
+        return self._gerenciador._linha(int(self._posicoes[indice]))
+
+    def __iter__(self):
+        linha = self._gerenciador._linha
+        for posicao in self._posicoes:
+            yield linha(int(posicao))
+
+
+class _IndiceIds:
+    """
+    ID -> data da transação, em dois arrays ordenados por ID
+
+    A data basta para achar a linha: ela está no trecho do dia, localizado
+    por busca binária na coluna de datas. Ao contrário da posição, a data
+    não muda quando outras linhas são inseridas ou removidas. IDs novos são
+    sempre maiores que os existentes, então registrar é um append
+    amortizado; remover deixa uma marca (NaT) no lugar, em O(log n).
+    """
+
+    def __init__(self):
+        self._ids = np.empty(0, dtype=np.int64)
+        self._datas = np.empty(0, dtype='datetime64[D]')
+        self._tamanho = 0
+
+    def _posicao(self, id_transacao: int) -> int:
+        return int(np.searchsorted(self._ids[:self._tamanho], id_transacao))
+
+    def data(self, id_transacao: int) -> Optional[np.datetime64]:
+        posicao = self._posicao(id_transacao)
+        if posicao < self._tamanho and self._ids[posicao] == id_transacao:
+            data = self._datas[posicao]
+            return None if np.isnat(data) else data
+        return None
+
+    def registrar(self, id_transacao: int, data: np.datetime64):
+        """Registra o ID ou atualiza a data dele"""
+        tamanho = self._tamanho
+        if tamanho and id_transacao <= self._ids[tamanho - 1]:
+            posicao = self._posicao(id_transacao)
+            if self._ids[posicao] == id_transacao:
+                self._datas[posicao] = data
+                return
+        else:
+            posicao = tamanho
+
+        if tamanho == len(self._ids):
+            capacidade = max(CAPACIDADE_INICIAL, 2 * tamanho)
+            self._ids = np.resize(self._ids, capacidade)
+            self._datas = np.resize(self._datas, capacidade)
+        # ID antigo fora de ordem (ex.: reaplicação do diário): desloca os maiores
+        self._ids[posicao + 1:tamanho + 1] = self._ids[posicao:tamanho]
+        self._datas[posicao + 1:tamanho + 1] = self._datas[posicao:tamanho]
+        self._ids[posicao] = id_transacao
+        self._datas[posicao] = data
+        self._tamanho += 1
+
+    def remover(self, id_transacao: int):
+        posicao = self._posicao(id_transacao)
+        if posicao < self._tamanho and self._ids[posicao] == id_transacao:
+            self._datas[posicao] = np.datetime64('NaT')
+
+    def reconstruir(self, ids: np.ndarray, datas: np.ndarray):
+        """Refaz o índice a partir das colunas inteiras (cargas em lote)"""
+        ordem = np.argsort(ids, kind='stable')
+        self._ids = ids[ordem].astype(np.int64)
+        self._datas = datas[ordem]
+        self._tamanho = len(ordem)
+
+
+class GerenciadorTransacoesColunar:
+    """
+    Gerenciador de transações com armazenamento colunar em NumPy
+
+    Feito para cargas em lote e uso de leitura intensa. Buscar por ID custa
+    O(log n) e lançar no fim do livro (data mais recente) custa, amortizado,
+    só o mês da transação. Inserir, remover ou mudar a data de uma linha no
+    meio do livro desloca as linhas posteriores e recalcula os saldos delas
+    com operações vetorizadas, em O(n - posição); para muitas correções
+    retroativas avulsas, o GerenciadorTransacoes é mais adequado.
+    """
+
+    def __init__(self):
+        self.categorizador = obter_categorizador_compartilhado()
+
+        # Colunas com capacidade de sobra; apenas as primeiras _quantidade linhas valem.
+        # As linhas ficam sempre ordenadas por data (empates na ordem de inserção)
+        self._quantidade = 0
+        self._colunas: Dict[str, np.ndarray] = {
+            nome: np.empty(0, dtype=tipo) for nome, tipo in _TIPOS_COLUNAS.items()
+        }
+
+        # Dicionário de categorias: código -> nome e nome -> código
+        self._categorias: List[str] = []
+        self._codigos_categoria: Dict[str, int] = {}
+
+        # IDs estáveis, como no GerenciadorTransacoes, localizados pela data da linha
+        self._proximo_id = 1
+        self._indice_ids = _IndiceIds()
+
+        # Leituras em paralelo, escritas serializadas e snapshots versionados,
+        # como no GerenciadorTransacoes (aqui nenhuma leitura altera estado)
+        self._lock = LockLeituraEscrita()
+        self._lock_snapshot = threading.Lock()
+        self._versao = 0
+        self._snapshot = SnapshotLivro(0, self.exportar_para_dataframe())
+
+        # Ouvintes de inserções, edições e remoções, como no GerenciadorTransacoes
+        self._ouvintes: List[Callable[[str, List[Transacao], int], None]] = []
+
+        # Reclassificado quando uma categoria personalizada muda em qualquer gerenciador
+        self.categorizador.registrar_gerenciador(self)
+
+    # ------------------------------------------------------------------
+    # Inserção
+    # ------------------------------------------------------------------
+
+    @escrita
+    def adicionar_transacao(self, data: date, descricao: str, valor: float, recorrente: bool = False,
+                            classificacao: Optional[tuple] = None, id_transacao: Optional[int] = None) -> Transacao:
+        """Adiciona uma nova transação (id_transacao preserva o ID de uma transação já salva e não pode estar em uso)"""
+        if id_transacao is None:
+            id_transacao = self._proximo_id
+        elif self._indice_ids.data(id_transacao) is not None:
+            raise ValueError(f"ID de transação já em uso: {id_transacao}")
+        if classificacao is None:
+            classificacao = self.categorizador.classificar_transacao(descricao, valor)
+        self._proximo_id = max(self._proximo_id, id_transacao + 1)
+
+        posicao = int(np.searchsorted(self._coluna('datas'), np.datetime64(data, 'D'), side='right'))
+        self._inserir_linha(posicao, id_transacao, data, descricao, valor, recorrente, classificacao)
+        transacao = self._linha(posicao)
+        self._notificar('inserir', [transacao])
+        return transacao
+
+    @escrita
+    def editar_transacao(self, id_transacao: int, data: Optional[date] = None, descricao: Optional[str] = None,
+                         valor: Optional[float] = None, recorrente: Optional[bool] = None,
+                         classificacao: Optional[tuple] = None) -> Optional[Transacao]:
+        """
+        Altera os campos informados de uma transação, mantendo o ID
+
+        Mesma semântica de GerenciadorTransacoes.editar_transacao.
+
+        Returns:
+            A transação alterada, ou None se o ID não existir
+        """
+        posicao = self._posicao_id(id_transacao)
+        if posicao is None:
+            return None
+
+        anterior = self._linha(posicao)
+        if data is None and descricao is None and valor is None and classificacao is None:
+            if recorrente is not None:
+                self._colunas['recorrentes'][posicao] = recorrente
+                self._versao += 1
+                self._notificar('editar', [self._linha(posicao)])
+            return self._linha(posicao)
+
+        novo_valor = anterior.valor if valor is None else valor
+        nova_descricao = anterior.descricao if descricao is None else descricao
+        if classificacao is None:
+            classificacao = (anterior.tipo_transacao, anterior.tipo_gasto, anterior.categoria)
+            if nova_descricao != anterior.descricao or novo_valor != anterior.valor:
+                classificacao = self.categorizador.classificar_transacao(nova_descricao, novo_valor)
+
+        self._remover_linha(posicao)
+        nova_data = anterior.data if data is None else data
+        if nova_data != anterior.data:
+            posicao = int(np.searchsorted(self._coluna('datas'), np.datetime64(nova_data, 'D'), side='right'))
+        self._inserir_linha(
+            posicao, id_transacao, nova_data, nova_descricao, novo_valor,
+            anterior.recorrente if recorrente is None else recorrente, classificacao
+        )
+        transacao = self._linha(posicao)
+        self._notificar('editar', [transacao])
+        return transacao
+
+    @escrita
+    def remover_transacao(self, id_transacao: int) -> Optional[Transacao]:
+        """
+        Remove uma transação pelo ID
+
+        Returns:
+            A transação removida, ou None se o ID não existir
+        """
+        posicao = self._posicao_id(id_transacao)
+        if posicao is None:
+            return None
+        transacao = self._linha(posicao)
+        self._remover_linha(posicao)
+        self._notificar('remover', [transacao])
+        return transacao
+
+    @leitura
+    def obter_transacao(self, id_transacao: int) -> Optional[Transacao]:
+        """Retorna a transação com o ID informado (None se não existir)"""
+        posicao = self._posicao_id(id_transacao)
+        return self._linha(posicao) if posicao is not None else None
+
+    def _posicao_id(self, id_transacao: int) -> Optional[int]:
+        """Posição da linha com o ID: busca binária da data e varredura só das linhas daquele dia"""
+        data = self._indice_ids.data(id_transacao)
+        if data is None:
+            return None
+        datas = self._coluna('datas')
+        inicio = int(np.searchsorted(datas, data, side='left'))
+        fim = int(np.searchsorted(datas, data, side='right'))
+        posicoes = np.flatnonzero(self._colunas['ids'][inicio:fim] == id_transacao)
+        return inicio + int(posicoes[0]) if len(posicoes) else None
+
+    def _inserir_linha(self, posicao: int, id_transacao: int, data: date, descricao: str, valor: float,
+                       recorrente: bool, classificacao: tuple):
+        """Insere uma linha na posição e recalcula saldos a partir dela e as metas do mês"""
+        # Desloca as linhas posteriores dentro da capacidade já alocada
+        self._garantir_capacidade(self._quantidade + 1)
+        for coluna in self._colunas.values():
+            coluna[posicao + 1:self._quantidade + 1] = coluna[posicao:self._quantidade]
+        self._quantidade += 1
+
+        self._colunas['ids'][posicao] = id_transacao
+        self._gravar_linha(posicao, data, descricao, valor, recorrente, classificacao)
+        self._indice_ids.registrar(id_transacao, self._colunas['datas'][posicao])
+        self._colunas['saldos'][posicao] = 0.0
+        self._colunas['percentuais'][posicao] = 0.0
+        self._colunas['status'][posicao] = 0
+
+        self._recalcular_saldos(posicao)
+        self._atualizar_metas(self._faixa_mes(data.year, data.month))
+        self._versao += 1
+
+    def _remover_linha(self, posicao: int):
+        """Remove a linha da posição e recalcula saldos a partir dela e as metas do mês"""
+        data = self._colunas['datas'][posicao].item()
+        self._indice_ids.remover(int(self._colunas['ids'][posicao]))
+        for coluna in self._colunas.values():
+            coluna[posicao:self._quantidade - 1] = coluna[posicao + 1:self._quantidade]
+        self._quantidade -= 1
+
+        self._recalcular_saldos(posicao)
+        self._atualizar_metas(self._faixa_mes(data.year, data.month))
+        self._versao += 1
+
+    def adicionar_ouvinte(self, ouvinte: Callable[[str, List[Transacao], int], None]):
+        """Registra um ouvinte de alterações (ver GerenciadorTransacoes.adicionar_ouvinte)"""
+        with self._lock.escrita():
+            self._ouvintes.append(ouvinte)
+
+    def _notificar(self, operacao: str, transacoes: List[Transacao]):
+        """Repassa a alteração aos ouvintes registrados"""
+        for ouvinte in self._ouvintes:
+            ouvinte(operacao, transacoes, self._versao)
+
+    @property
+    def versao(self) -> int:
+        """Versão atual do livro; cresce a cada escrita"""
+        return self._versao
+
+    def snapshot(self) -> SnapshotLivro:
+        """Retorna o livro como um snapshot imutável e versionado (ver GerenciadorTransacoes.snapshot)"""
+        snapshot = self._snapshot
+        if snapshot.versao == self._versao:
+            return snapshot
+        with self._lock.leitura(), self._lock_snapshot:
+            if self._snapshot.versao != self._versao:
+                self._snapshot = SnapshotLivro(self._versao, self.exportar_para_dataframe())
+            return self._snapshot
+
+    @escrita
+    def adicionar_transacoes(self, linhas: Union[pd.DataFrame, Iterable[Dict[str, Any]]]) -> VisaoTransacoes:
+        """
+        Adiciona várias transações de uma vez
+
+        Aceita as mesmas entradas que GerenciadorTransacoes.adicionar_transacoes.
+        Um DataFrame vai direto para as colunas, sem criar objetos por linha.
+        Se alguma linha falhar (ou pedir um ID em uso), nada é adicionado.
+        """
+        if isinstance(linhas, pd.DataFrame):
+            novas = self._colunas_de_dataframe(linhas)
+        else:
+            novas = self._colunas_de_linhas(list(linhas))
+
+        tamanho_novas = len(novas['datas'])
+        if not tamanho_novas:
+            return VisaoTransacoes(self, range(0))
+        novas['ids'] = self._atribuir_ids(novas['ids'])
+
+        # Ordenação estável: empates mantêm as existentes antes das novas
+        anteriores = self._quantidade
+        colunas = {
+            nome: np.concatenate([self._coluna(nome), novas[nome]]) for nome in _TIPOS_COLUNAS
+        }
+        ordem = np.argsort(colunas['datas'], kind='stable')
+        self._colunas = {nome: coluna[ordem] for nome, coluna in colunas.items()}
+        self._quantidade = len(ordem)
+        self._indice_ids.reconstruir(self._coluna('ids'), self._coluna('datas'))
+
+        posicoes_novas = np.flatnonzero(ordem >= anteriores)
+        self._recalcular_saldos(int(posicoes_novas[0]))
+        self._atualizar_metas()
+        self._versao += 1
+
+        novas = VisaoTransacoes(self, posicoes_novas)
+        if self._ouvintes:
+            self._notificar('inserir', list(novas))
+        return novas
+
+    def _colunas_de_dataframe(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Converte um DataFrame (data, descricao, valor, recorrente) em colunas, classificando em lote"""
+        classificacoes = self.categorizador.classificar_lote(df['descricao'], df['valor'])
+        recorrentes = df['recorrente'].to_numpy(dtype=bool) if 'recorrente' in df.columns else np.zeros(len(df), dtype=bool)
+        ids = pd.to_numeric(df['id']).to_numpy(dtype=float) if 'id' in df.columns else np.full(len(df), np.nan)
+        return self._montar_colunas(
+            ids=ids,
+            datas=pd.to_datetime(df['data']).to_numpy().astype('datetime64[D]'),
+            descricoes=df['descricao'].astype(str).to_numpy(dtype=object),
+            valores=pd.to_numeric(df['valor']).to_numpy(dtype=float),
+            recorrentes=recorrentes,
+            tipos_transacao=classificacoes['tipo_transacao'].tolist(),
+            tipos_gasto=classificacoes['tipo_gasto'].tolist(),
+            categorias=classificacoes['categoria'].tolist()
+        )
+
+    def _colunas_de_linhas(self, linhas: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Converte dicts de linhas em colunas, classificando as que vierem sem classificação"""
+        classificacoes = [
+            linha.get('classificacao') or self.categorizador.classificar_transacao(linha['descricao'], linha['valor'])
+            for linha in linhas
+        ]
+        return self._montar_colunas(
+            ids=np.array([linha.get('id') for linha in linhas], dtype=float),
+            datas=np.array([linha['data'] for linha in linhas], dtype='datetime64[D]'),
+            descricoes=np.array([linha['descricao'] for linha in linhas], dtype=object),
+            valores=np.array([linha['valor'] for linha in linhas], dtype=float),
+            recorrentes=np.array([linha.get('recorrente', False) for linha in linhas], dtype=bool),
+            tipos_transacao=[c[0] for c in classificacoes],
+            tipos_gasto=[c[1] for c in classificacoes],
+            categorias=[c[2] for c in classificacoes]
+        )
+
+    def _montar_colunas(self, ids: np.ndarray, datas: np.ndarray, descricoes: np.ndarray, valores: np.ndarray,
+                        recorrentes: np.ndarray, tipos_transacao: List[TipoTransacao],
+                        tipos_gasto: List[Optional[TipoGasto]], categorias: List[str]) -> Dict[str, np.ndarray]:
+        """Codifica enums e categorias e monta as colunas das linhas novas (IDs pedidos, NaN se não houver)"""
+        quantidade = len(datas)
+        return {
+            'ids': ids,
+            'datas': datas,
+            'centavos': np.rint(valores * 100).astype(np.int64),
+            'descricoes': descricoes,
+            'categorias': np.array([self._codigo_categoria(c) for c in categorias], dtype=np.int32),
+            'tipos_transacao': np.array([TIPOS_TRANSACAO.index(t) for t in tipos_transacao], dtype=np.int8),
+            'tipos_gasto': np.array(
+                [TIPOS_GASTO.index(t) if t else SEM_TIPO_GASTO for t in tipos_gasto], dtype=np.int8
+            ),
+            'recorrentes': recorrentes,
+            'saldos': np.zeros(quantidade),
+            'percentuais': np.zeros(quantidade),
+            'status': np.zeros(quantidade, dtype=np.int8),
+        }
+
+    def _atribuir_ids(self, pedidos: np.ndarray) -> np.ndarray:
+        """
+        Resolve os IDs das linhas novas: o ID pedido é mantido; as linhas sem
+        pedido (NaN) recebem IDs novos em sequência
+
+        Raises:
+            ValueError: algum ID pedido já está em uso ou se repete no lote
+        """
+        ids = np.zeros(len(pedidos), dtype=np.int64)
+        validos = ~np.isnan(pedidos)
+        valores, quantidades = np.unique(pedidos[validos], return_counts=True)
+        repetidos = np.union1d(valores[quantidades > 1], valores[np.isin(valores, self._coluna('ids'))])
+        if len(repetidos):
+            raise ValueError(f"IDs de transação já em uso ou repetidos no lote: {repetidos[:10].astype(np.int64).tolist()}")
+
+        ids[validos] = pedidos[validos]
+        if validos.any():
+            self._proximo_id = max(self._proximo_id, int(ids[validos].max()) + 1)
+        faltantes = int((~validos).sum())
+        ids[~validos] = np.arange(self._proximo_id, self._proximo_id + faltantes)
+        self._proximo_id += faltantes
+        return ids
+
+    def _gravar_linha(self, posicao: int, data: date, descricao: str, valor: float, recorrente: bool,
+                      classificacao: tuple):
+        """Grava os campos de entrada de uma linha"""
+        tipo_transacao, tipo_gasto, categoria = classificacao
+        colunas = self._colunas
+        colunas['datas'][posicao] = np.datetime64(data, 'D')
+        colunas['centavos'][posicao] = round(valor * 100)
+        colunas['descricoes'][posicao] = descricao
+        colunas['categorias'][posicao] = self._codigo_categoria(categoria)
+        colunas['tipos_transacao'][posicao] = TIPOS_TRANSACAO.index(tipo_transacao)
+        colunas['tipos_gasto'][posicao] = TIPOS_GASTO.index(tipo_gasto) if tipo_gasto else SEM_TIPO_GASTO
+        colunas['recorrentes'][posicao] = recorrente
+
+    def _garantir_capacidade(self, quantidade: int):
+        """Realoca as colunas (dobrando a capacidade) se não couberem `quantidade` linhas"""
+        capacidade = len(self._colunas['datas'])
+        if quantidade <= capacidade:
+            return
+        nova_capacidade = max(CAPACIDADE_INICIAL, capacidade * 2, quantidade)
+        for nome, coluna in self._colunas.items():
+            nova = np.empty(nova_capacidade, dtype=coluna.dtype)
+            nova[:self._quantidade] = coluna[:self._quantidade]
+            self._colunas[nome] = nova
+
+    def _codigo_categoria(self, categoria: str) -> int:
+        """Retorna (registrando se preciso) o código da categoria"""
+        codigo = self._codigos_categoria.get(categoria)
+        if codigo is None:
+            codigo = self._codigos_categoria[categoria] = len(self._categorias)
+            self._categorias.append(categoria)
+        return codigo
+
+    def _coluna(self, nome: str) -> np.ndarray:
+        """Retorna a parte válida de uma coluna (visão, sem cópia)"""
+        return self._colunas[nome][:self._quantidade]
+
+    # ------------------------------------------------------------------
+    # Visões por linha
+    # ------------------------------------------------------------------
+
+    @property
+    @leitura
+    def transacoes(self) -> List[Transacao]:
+        """
+        Todas as transações, em ordem de data, montadas sob o lock
+
+        Ao contrário das visões de obter_transacoes_mes/periodo, a lista não
+        muda com alterações posteriores. Para percorrer o livro inteiro sem
+        criar um objeto por linha, use snapshot() ou exportar_para_dataframe().
+        """
+        return list(VisaoTransacoes(self, range(self._quantidade)))
+
+    def _linha(self, posicao: int) -> Transacao:
+        """Monta uma Transacao com os valores atuais da linha"""
+        colunas = self._colunas
+        codigo_gasto = int(colunas['tipos_gasto'][posicao])
+        transacao = Transacao(
+            data=colunas['datas'][posicao].item(),
+            descricao=colunas['descricoes'][posicao],
+            valor=int(colunas['centavos'][posicao]) / 100,
+            recorrente=bool(colunas['recorrentes'][posicao]),
+            classificacao=(
+                TIPOS_TRANSACAO[colunas['tipos_transacao'][posicao]],
+                TIPOS_GASTO[codigo_gasto] if codigo_gasto != SEM_TIPO_GASTO else None,
+                self._categorias[colunas['categorias'][posicao]]
+            )
+        )
+        transacao.id = int(colunas['ids'][posicao])
+        transacao.saldo_acumulado = float(colunas['saldos'][posicao])
+        transacao.percentual_salario = float(colunas['percentuais'][posicao])
+        transacao.status_meta = STATUS_META[colunas['status'][posicao]]
+        return transacao
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _faixa_mes(self, ano: int, mes: int) -> Tuple[int, int]:
+        """Retorna o trecho [inicio, fim) das linhas do mês"""
+        inicio_mes = np.datetime64(f"{ano:04d}-{mes:02d}", 'M')
+        limites = np.array([inicio_mes, inicio_mes + 1]).astype('datetime64[D]')
+        inicio, fim = np.searchsorted(self._coluna('datas'), limites, side='left')
+        return int(inicio), int(fim)
+
+    @leitura
+    def obter_transacoes_mes(self, mes: int, ano: int) -> VisaoTransacoes:
+        """Retorna transações de um mês específico"""
+        inicio, fim = self._faixa_mes(ano, mes)
+        return VisaoTransacoes(self, range(inicio, fim))
+
+    @leitura
+    def obter_meses(self) -> List[Tuple[int, int]]:
+        """Retorna os meses com transações, em ordem, como pares (ano, mes)"""
+        meses = np.unique(self._coluna('datas').astype('datetime64[M]')).astype(np.int64)
+        return [(int(m // 12) + 1970, int(m % 12) + 1) for m in meses]
+
+    def _faixa_periodo(self, inicio: date, fim: date) -> Tuple[int, int]:
+        """Retorna o trecho [inicio, fim) das linhas entre as datas (ambas inclusive)"""
+        datas = self._coluna('datas')
+        posicao_inicio = int(np.searchsorted(datas, np.datetime64(inicio, 'D'), side='left'))
+        posicao_fim = int(np.searchsorted(datas, np.datetime64(fim, 'D'), side='right'))
+        return posicao_inicio, max(posicao_inicio, posicao_fim)
+
+    @leitura
+    def obter_transacoes_periodo(self, inicio: date, fim: date) -> VisaoTransacoes:
+        """Retorna as transações entre as datas (ambas inclusive) como visão, O(log n)"""
+        return VisaoTransacoes(self, range(*self._faixa_periodo(inicio, fim)))
+
+    @leitura
+    def contar_transacoes_periodo(self, inicio: date, fim: date) -> int:
+        """Quantidade de transações entre as datas (ambas inclusive), O(log n)"""
+        posicao_inicio, posicao_fim = self._faixa_periodo(inicio, fim)
+        return posicao_fim - posicao_inicio
+
+    @leitura
+    def obter_resumo_periodo(self, inicio: date, fim: date) -> ResumoMensal:
+        """Agregados de um período qualquer; saldo_final é o saldo ao fim da data final"""
+        resumo = self._resumo_faixa(*self._faixa_periodo(inicio, fim))
+        resumo.saldo_final = self.obter_saldo_em(fim)
+        return resumo
+
+    @leitura
+    def obter_resumo_mes(self, mes: int, ano: int) -> ResumoMensal:
+        """Calcula os agregados do mês com operações vetorizadas sobre o trecho do mês"""
+        return self._resumo_faixa(*self._faixa_mes(ano, mes))
+
+    def _resumo_faixa(self, inicio: int, fim: int) -> ResumoMensal:
+        """Agregados das linhas [inicio, fim) com bincount sobre os códigos"""
+        resumo = ResumoMensal()
+        if inicio == fim:
+            return resumo
+
+        trecho = slice(inicio, fim)
+        centavos = np.abs(self._colunas['centavos'][trecho])
+        entrada = self._colunas['tipos_transacao'][trecho] == CODIGO_ENTRADA
+        tipos_gasto = self._colunas['tipos_gasto'][trecho]
+        categorias = self._colunas['categorias'][trecho]
+
+        resumo.quantidade = fim - inicio
+        resumo.renda = int(centavos[entrada].sum()) / 100
+        resumo.saldo_final = float(self._colunas['saldos'][fim - 1])
+
+        saidas = ~entrada
+        com_tipo = saidas & (tipos_gasto != SEM_TIPO_GASTO)
+        gastos_por_tipo = np.bincount(tipos_gasto[com_tipo], weights=centavos[com_tipo], minlength=len(TIPOS_GASTO))
+        for codigo, tipo in enumerate(TIPOS_GASTO):
+            resumo.gastos_por_tipo[tipo] = int(gastos_por_tipo[codigo]) / 100
+
+        codigos, posicoes = np.unique(categorias[saidas], return_inverse=True)
+        somas = np.bincount(posicoes, weights=centavos[saidas], minlength=len(codigos))
+        contagens = np.bincount(posicoes, minlength=len(codigos))
+        for codigo, soma, contagem in zip(codigos.tolist(), somas.tolist(), contagens.tolist()):
+            categoria = self._categorias[codigo]
+            resumo.gastos_por_categoria[categoria] = int(soma) / 100
+            resumo._quantidade_por_categoria[categoria] = contagem
+        return resumo
+
+    @leitura
+    def obter_renda_mensal(self, mes: int, ano: int) -> float:
+        """Calcula a renda total do mês"""
+        inicio, fim = self._faixa_mes(ano, mes)
+        trecho = slice(inicio, fim)
+        entrada = self._colunas['tipos_transacao'][trecho] == CODIGO_ENTRADA
+        return int(np.abs(self._colunas['centavos'][trecho][entrada]).sum()) / 100
+
+    @leitura
+    def obter_gastos_por_tipo(self, mes: int, ano: int) -> dict:
+        """Retorna gastos agrupados por tipo (essencial, variável, investimento)"""
+        return dict(self.obter_resumo_mes(mes, ano).gastos_por_tipo)
+
+    @leitura
+    def obter_gastos_por_categoria(self, mes: int, ano: int) -> Dict[str, float]:
+        """Retorna gastos (saídas e investimentos) agrupados por categoria específica"""
+        return dict(self.obter_resumo_mes(mes, ano).gastos_por_categoria)
+
+    @leitura
+    def obter_saldo_atual(self, mes: int, ano: int) -> float:
+        """Calcula o saldo atual do mês"""
+        inicio, fim = self._faixa_mes(ano, mes)
+        return float(self._colunas['saldos'][fim - 1]) if fim > inicio else 0.0
+
+    @leitura
+    def obter_saldo_em(self, data: date) -> float:
+        """Saldo acumulado ao fim do dia informado (busca binária na coluna de datas)"""
+        posicao = int(np.searchsorted(self._coluna('datas'), np.datetime64(data, 'D'), side='right'))
+        return float(self._colunas['saldos'][posicao - 1]) if posicao > 0 else 0.0
+
+    @leitura
+    def obter_fluxo_periodo(self, inicio: date, fim: date) -> float:
+        """Fluxo líquido (entradas menos saídas) entre as datas, ambas inclusive"""
+        if fim < inicio:
+            return 0.0
+        return self.obter_saldo_em(fim) - self.obter_saldo_em(inicio - timedelta(days=1))
+
+    # ------------------------------------------------------------------
+    # Recalculo vetorizado
+    # ------------------------------------------------------------------
+
+    def _recalcular_saldos(self, inicio: int = 0):
+        """Recalcula os saldos acumulados a partir da posição informada com uma soma acumulada"""
+        centavos = self._colunas['centavos'][inicio:self._quantidade]
+        entrada = self._colunas['tipos_transacao'][inicio:self._quantidade] == CODIGO_ENTRADA
+        movimentos = np.where(entrada, centavos, -np.abs(centavos))
+
+        # Soma em centavos inteiros: exata, sem acúmulo de erro de arredondamento
+        saldo_inicial = int(np.rint(self._colunas['saldos'][inicio - 1] * 100)) if inicio > 0 else 0
+        self._colunas['saldos'][inicio:self._quantidade] = (saldo_inicial + np.cumsum(movimentos)) / 100
+
+    def _atualizar_metas(self, faixa: Optional[Tuple[int, int]] = None):
+        """
+        Atualiza percentual do salário e status das metas de um trecho de
+        meses inteiros (todo o livro, se não for informado)
+
+        Renda e gastos por tipo de cada mês saem de um bincount por mês
+        e são espalhados de volta para as linhas.
+        """
+        inicio, fim = faixa if faixa is not None else (0, self._quantidade)
+        if inicio == fim:
+            return
+
+        trecho = slice(inicio, fim)
+        colunas = self._colunas
+        centavos = np.abs(colunas['centavos'][trecho])
+        entrada = colunas['tipos_transacao'][trecho] == CODIGO_ENTRADA
+        tipos_gasto = colunas['tipos_gasto'][trecho]
+
+        # Índice do mês de cada linha dentro do trecho (as linhas estão ordenadas)
+        meses = colunas['datas'][trecho].astype('datetime64[M]')
+        _, indice_mes = np.unique(meses, return_inverse=True)
+        indice_mes = indice_mes.ravel()
+        quantidade_meses = int(indice_mes[-1]) + 1
+
+        renda = np.bincount(indice_mes, weights=np.where(entrada, centavos, 0), minlength=quantidade_meses) / 100
+        com_tipo = ~entrada & (tipos_gasto != SEM_TIPO_GASTO)
+        tipos_validos = np.where(com_tipo, tipos_gasto, 0)
+        gastos = np.bincount(
+            indice_mes * len(TIPOS_GASTO) + tipos_validos,
+            weights=np.where(com_tipo, centavos, 0),
+            minlength=quantidade_meses * len(TIPOS_GASTO)
+        ).reshape(quantidade_meses, len(TIPOS_GASTO)) / 100
+        limites = np.column_stack([
+            [self.categorizador.obter_limite_categoria(tipo, r) for r in renda.tolist()]
+            for tipo in TIPOS_GASTO
+        ]).reshape(quantidade_meses, len(TIPOS_GASTO))
+
+        # Mês sem renda zera o percentual, como em Transacao.atualizar_percentual_salario
+        renda_linha = renda[indice_mes]
+        com_renda = renda_linha > 0
+        percentuais = np.zeros(fim - inicio)
+        percentuais[com_renda] = centavos[com_renda] / 100 / renda_linha[com_renda] * 100
+        colunas['percentuais'][trecho] = percentuais
+
+        gasto_linha = gastos[indice_mes, tipos_validos]
+        limite_linha = limites[indice_mes, tipos_validos]
+        status = np.select(
+            [tipos_gasto == SEM_TIPO_GASTO, entrada, gasto_linha <= limite_linha, gasto_linha <= limite_linha * 0.9],
+            [STATUS_META.index(""), STATUS_META.index("Entrada"), STATUS_META.index("OK"),
+             STATUS_META.index("Abaixo da meta")],
+            default=STATUS_META.index("Acima do limite")
+        )
+        colunas['status'][trecho] = status
+
+    # ------------------------------------------------------------------
+    # Categorias personalizadas
+    # ------------------------------------------------------------------
+
+    def adicionar_categoria_personalizada(self, tipo_gasto: TipoGasto, categoria: str,
+                                          palavras_chave: List[str]) -> int:
+        """
+        Adiciona (ou altera) uma categoria personalizada no categorizador
+        compartilhado (ver GerenciadorTransacoes.adicionar_categoria_personalizada)
+
+        Returns:
+            Quantidade de transações deste gerenciador cuja classificação mudou
+        """
+        reclassificadas = self.categorizador.adicionar_categoria_personalizada(tipo_gasto, categoria, palavras_chave)
+        return reclassificadas.get(self, 0)
+
+    @escrita
+    def reclassificar_palavras_chave(self, palavras_chave: Iterable[str]) -> int:
+        """
+        Reclassifica o livro em lote depois de uma mudança de regras (cada
+        descrição distinta é classificada uma vez) e notifica os ouvintes com
+        uma edição das linhas que mudaram
+
+        As palavras-chave não filtram nada aqui: o lote inteiro custa pouco
+        mais que localizar as linhas candidatas.
+
+        Returns:
+            Quantidade de transações cuja classificação mudou
+        """
+        if not self._quantidade:
+            return 0
+
+        classificacoes = self.categorizador.classificar_lote(
+            pd.Series(self._coluna('descricoes')), pd.Series(self._coluna('centavos'))
+        )
+        novas = self._montar_colunas(
+            ids=self._coluna('ids'),
+            datas=self._coluna('datas'),
+            descricoes=self._coluna('descricoes'),
+            valores=np.zeros(self._quantidade),
+            recorrentes=self._coluna('recorrentes'),
+            tipos_transacao=classificacoes['tipo_transacao'].tolist(),
+            tipos_gasto=classificacoes['tipo_gasto'].tolist(),
+            categorias=classificacoes['categoria'].tolist()
+        )
+
+        mudou = np.zeros(self._quantidade, dtype=bool)
+        for nome in ('categorias', 'tipos_transacao', 'tipos_gasto'):
+            mudou |= self._coluna(nome) != novas[nome]
+            self._coluna(nome)[:] = novas[nome]
+
+        reclassificadas = int(mudou.sum())
+        if reclassificadas:
+            self._recalcular_saldos(int(np.argmax(mudou)))
+            self._atualizar_metas()
+            self._versao += 1
+            if self._ouvintes:
+                self._notificar('editar', list(VisaoTransacoes(self, np.flatnonzero(mudou))))
+        return reclassificadas
+
+    # ------------------------------------------------------------------
+    # Exportação
+    # ------------------------------------------------------------------
+
+    @leitura
+    def exportar_para_dataframe(self) -> pd.DataFrame:
+        """
+        Exporta transações para DataFrame do pandas, coluna a coluna
+
+        Tipo, Tipo Gasto, Categoria e Meta 50-30-20 saem como categóricas
+        montadas direto dos códigos das colunas (Tipo Gasto vazio nas entradas);
+        Recorrente, Semana e % do Salário também saem de operações vetorizadas.
+        """
+        datas = self._coluna('datas')
+        dias = (datas - datas.astype('datetime64[M]')).astype(np.int64)
+
+        def categorica(codigos: np.ndarray, valores: List[str]) -> pd.Categorical:
+            return pd.Categorical.from_codes(codigos, categories=valores).remove_unused_categories()
+
+        return pd.DataFrame({
+            'ID': self._coluna('ids'),
+            'Data': datas.astype(object),
+            'Tipo': categorica(self._coluna('tipos_transacao'), [tipo.value for tipo in TIPOS_TRANSACAO]),
+            # SEM_TIPO_GASTO (-1) vira o código 0, a categoria vazia
+            'Tipo Gasto': categorica(self._coluna('tipos_gasto') + 1, [''] + [tipo.value for tipo in TIPOS_GASTO]),
+            'Categoria': categorica(self._coluna('categorias'), self._categorias),
+            'Descrição': self._coluna('descricoes'),
+            'Valor (R$)': self._coluna('centavos') / 100,
+            'Recorrente': np.where(self._coluna('recorrentes'), 'Sim', 'Não'),
+            'Semana': dias // 7 + 1,
+            'Saldo Acumulado': self._coluna('saldos'),
+            '% do Salário': np.char.mod('%.1f%%', self._coluna('percentuais')),
+            'Meta 50-30-20': categorica(self._coluna('status'), STATUS_META)
+        })
@@ -3,6 +3,8 @@ from datetime import datetime, date
 from typing import List, Dict, Optional
 from enum import Enum
 
+from utils.concorrencia import LockLeituraEscrita, escrita, leitura
+
 class StatusCartao(Enum):
     ATIVO = "ativo"
     BLOQUEADO = "bloqueado"
@@ -65,6 +67,8 @@ class GerenciadorCartoes:
     """Gerenciador de cartões de crédito"""
     
     def __init__(self):
+        # Compartilhado pelos callbacks: leituras em paralelo, escritas serializadas
+        self._lock = LockLeituraEscrita()
         self.cartoes: List[Cartao] = []
         self.transacoes: List[TransacaoCartao] = []
         self._carregar_cartoes_demo()
@@ -72,6 +76,7 @@ class GerenciadorCartoes:
     def _carregar_cartoes_demo(self):
         self.cartoes = []
     
+    @escrita
     def adicionar_cartao(self, cartao: Cartao) -> bool:
         """Adiciona um novo cartão"""
         try:
@@ -81,6 +86,7 @@ class GerenciadorCartoes:
             print(f"Erro ao adicionar cartão: {e}")
             return False
     
+    @leitura
     def obter_cartao(self, cartao_id: str) -> Optional[Cartao]:
         """Obtém um cartão pelo ID"""
         for cartao in self.cartoes:
@@ -88,18 +94,22 @@ class GerenciadorCartoes:
                 return cartao
         return None
     
+    @leitura
     def calcular_limite_total_usado(self) -> float:
         """Calcula o total usado em todos os cartões"""
         return sum(cartao.limite_usado for cartao in self.cartoes if cartao.status == StatusCartao.ATIVO)
     
+    @leitura
     def calcular_limite_total_disponivel(self) -> float:
         """Calcula o limite total disponível"""
         return sum(cartao.limite_disponivel for cartao in self.cartoes if cartao.status == StatusCartao.ATIVO)
     
+    @leitura
     def obter_cartoes_ativos(self) -> List[Cartao]:
         """Retorna apenas cartões ativos"""
         return [cartao for cartao in self.cartoes if cartao.status == StatusCartao.ATIVO]
     
+    @leitura
     def obter_faturas_proximas(self, dias: int = 7) -> List[Dict]:
         """Obtém faturas que vencem nos próximos X dias"""
         faturas_proximas = []
@@ -119,6 +129,7 @@ class GerenciadorCartoes:
         
         return sorted(faturas_proximas, key=lambda x: x['dias_restantes'])
     
+    @escrita
     def adicionar_transacao_cartao(self, transacao: TransacaoCartao) -> bool:
         """Adiciona uma transação ao cartão"""
         try:
@@ -137,10 +148,12 @@ class GerenciadorCartoes:
             print(f"Erro ao adicionar transação: {e}")
             return False
     
+    @leitura
     def obter_transacoes_cartao(self, cartao_id: str) -> List[TransacaoCartao]:
         """Obtém transações de um cartão específico"""
         return [t for t in self.transacoes if t.cartao_id == cartao_id]
     
+    @leitura
     def calcular_gastos_por_categoria_cartao(self, cartao_id: str) -> Dict[str, float]:
         """Calcula gastos por categoria para um cartão"""
         transacoes = self.obter_transacoes_cartao(cartao_id)
@@ -155,6 +168,7 @@ class GerenciadorCartoes:
         
         return gastos
     
+    @leitura
     def exportar_para_dict(self) -> Dict:
         """Exporta dados dos cartões para dicionário"""
         return {
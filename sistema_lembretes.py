@@ -3,6 +3,8 @@ from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional
 from enum import Enum
 
+from utils.concorrencia import LockLeituraEscrita, escrita, leitura
+
 class TipoLembrete(Enum):
     CONTA_FIXA = "conta_fixa"
     FATURA_CARTAO = "fatura_cartao"
@@ -68,10 +70,13 @@ class GerenciadorLembretes:
     """Gerenciador de lembretes financeiros"""
     
     def __init__(self):
+        # Compartilhado pelos callbacks: leituras em paralelo, escritas serializadas
+        self._lock = LockLeituraEscrita()
         self.lembretes: List[Lembrete] = []
     
 
     
+    @escrita
     def adicionar_lembrete(self, lembrete: Lembrete) -> bool:
         """Adiciona um novo lembrete"""
         try:
@@ -81,6 +86,7 @@ class GerenciadorLembretes:
             print(f"Erro ao adicionar lembrete: {e}")
             return False
     
+    @escrita
     def marcar_como_concluido(self, lembrete_id: str) -> bool:
         """Marca um lembrete como concluído"""
         try:
@@ -93,6 +99,7 @@ class GerenciadorLembretes:
             print(f"Erro ao marcar lembrete: {e}")
             return False
     
+    @leitura
     def obter_lembrete(self, lembrete_id: str) -> Optional[Lembrete]:
         """Obtém um lembrete pelo ID"""
         for lembrete in self.lembretes:
@@ -100,38 +107,46 @@ class GerenciadorLembretes:
                 return lembrete
         return None
     
+    @leitura
     def obter_lembretes_pendentes(self) -> List[Lembrete]:
         """Retorna lembretes pendentes"""
         return [l for l in self.lembretes if l.status == StatusLembrete.PENDENTE]
     
+    @leitura
     def obter_lembretes_vencidos(self) -> List[Lembrete]:
         """Retorna lembretes vencidos"""
         pendentes = self.obter_lembretes_pendentes()
         return [l for l in pendentes if l.esta_vencido]
     
+    @leitura
     def obter_lembretes_hoje(self) -> List[Lembrete]:
         """Retorna lembretes que vencem hoje"""
         pendentes = self.obter_lembretes_pendentes()
         return [l for l in pendentes if l.vence_hoje]
     
+    @leitura
     def obter_lembretes_proximos(self, dias: int = 7) -> List[Lembrete]:
         """Retorna lembretes dos próximos X dias"""
         pendentes = self.obter_lembretes_pendentes()
         return [l for l in pendentes if 0 <= l.dias_restantes <= dias]
     
+    @leitura
     def obter_lembretes_por_tipo(self, tipo: TipoLembrete) -> List[Lembrete]:
         """Obtém lembretes por tipo"""
         return [l for l in self.lembretes if l.tipo == tipo]
     
+    @leitura
     def obter_lembretes_por_prioridade(self, prioridade: PrioridadeLembrete) -> List[Lembrete]:
         """Obtém lembretes por prioridade"""
         return [l for l in self.lembretes if l.prioridade == prioridade]
     
+    @leitura
     def calcular_valor_total_pendente(self) -> float:
         """Calcula valor total dos lembretes pendentes"""
         pendentes = self.obter_lembretes_pendentes()
         return sum(l.valor for l in pendentes if l.tipo in [TipoLembrete.CONTA_FIXA, TipoLembrete.FATURA_CARTAO, TipoLembrete.PAGAMENTO])
     
+    @leitura
     def gerar_alertas(self) -> List[Dict]:
         """Gera alertas baseados nos lembretes"""
         alertas = []
@@ -165,6 +180,7 @@ class GerenciadorLembretes:
         
         return alertas
     
+    @leitura
     def exportar_para_dict(self) -> Dict:
         """Exporta lembretes para dicionário"""
         return {
@@ -4,6 +4,8 @@ from typing import List, Dict, Optional
 from enum import Enum
 import json
 
+from utils.concorrencia import LockLeituraEscrita, escrita, leitura
+
 class TipoMeta(Enum):
     ECONOMIA = "economia"
     GASTO_CATEGORIA = "gasto_categoria"
@@ -89,11 +91,14 @@ class GerenciadorMetas:
     """Gerenciador de metas e orçamentos"""
     
     def __init__(self):
+        # Compartilhado pelos callbacks: leituras em paralelo, escritas serializadas
+        self._lock = LockLeituraEscrita()
         self.metas: List[Meta] = []
         self.orcamentos: List[OrcamentoCategoria] = []
     
 
     
+    @escrita
     def adicionar_meta(self, meta: Meta) -> bool:
         """Adiciona uma nova meta"""
         try:
@@ -103,6 +108,7 @@ class GerenciadorMetas:
             print(f"Erro ao adicionar meta: {e}")
             return False
     
+    @escrita
     def atualizar_progresso_meta(self, meta_id: str, novo_valor: float) -> bool:
         """Atualiza o progresso de uma meta"""
         try:
@@ -117,6 +123,7 @@ class GerenciadorMetas:
             print(f"Erro ao atualizar meta: {e}")
             return False
     
+    @leitura
     def obter_meta(self, meta_id: str) -> Optional[Meta]:
         """Obtém uma meta pelo ID"""
         for meta in self.metas:
@@ -124,19 +131,23 @@ class GerenciadorMetas:
                 return meta
         return None
     
+    @leitura
     def obter_metas_ativas(self) -> List[Meta]:
         """Retorna apenas metas ativas"""
         return [meta for meta in self.metas if meta.status == StatusMeta.ATIVA]
     
+    @leitura
     def obter_metas_por_tipo(self, tipo: TipoMeta) -> List[Meta]:
         """Obtém metas por tipo"""
         return [meta for meta in self.metas if meta.tipo == tipo]
     
+    @leitura
     def calcular_economia_total_metas(self) -> float:
         """Calcula o total economizado em todas as metas de economia"""
         metas_economia = self.obter_metas_por_tipo(TipoMeta.ECONOMIA)
         return sum(meta.valor_atual for meta in metas_economia)
     
+    @leitura
     def obter_metas_vencendo(self, dias: int = 30) -> List[Meta]:
         """Obtém metas que vencem nos próximos X dias"""
         metas_vencendo = []
@@ -145,6 +156,7 @@ class GerenciadorMetas:
                 metas_vencendo.append(meta)
         return sorted(metas_vencendo, key=lambda x: x.dias_restantes)
     
+    @escrita
     def adicionar_orcamento(self, orcamento: OrcamentoCategoria) -> bool:
         """Adiciona um orçamento para categoria"""
         try:
@@ -158,6 +170,7 @@ class GerenciadorMetas:
             print(f"Erro ao adicionar orçamento: {e}")
             return False
     
+    @leitura
     def obter_orcamento_categoria(self, categoria: str, mes: int, ano: int) -> Optional[OrcamentoCategoria]:
         """Obtém orçamento de uma categoria específica"""
         for orcamento in self.orcamentos:
@@ -167,25 +180,30 @@ class GerenciadorMetas:
                 return orcamento
         return None
     
+    @leitura
     def obter_orcamentos_mes(self, mes: int, ano: int) -> List[OrcamentoCategoria]:
         """Obtém todos os orçamentos de um mês"""
         return [o for o in self.orcamentos if o.mes == mes and o.ano == ano]
     
+    @leitura
     def calcular_total_orcado(self, mes: int, ano: int) -> float:
         """Calcula o total orçado para um mês"""
         orcamentos = self.obter_orcamentos_mes(mes, ano)
         return sum(o.valor_orcado for o in orcamentos)
     
+    @leitura
     def calcular_total_gasto_orcamento(self, mes: int, ano: int) -> float:
         """Calcula o total gasto no orçamento de um mês"""
         orcamentos = self.obter_orcamentos_mes(mes, ano)
         return sum(o.valor_gasto for o in orcamentos)
     
+    @leitura
     def obter_categorias_excedidas(self, mes: int, ano: int) -> List[OrcamentoCategoria]:
         """Obtém categorias que excederam o orçamento"""
         orcamentos = self.obter_orcamentos_mes(mes, ano)
         return [o for o in orcamentos if o.status == "excedido"]
     
+    @leitura
     def gerar_relatorio_metas(self) -> Dict:
         """Gera relatório completo das metas"""
         metas_ativas = self.obter_metas_ativas()
@@ -199,6 +217,7 @@ class GerenciadorMetas:
             'percentual_medio': sum(m.percentual_concluido for m in metas_ativas) / len(metas_ativas) if metas_ativas else 0
         }
     
+    @leitura
     def exportar_para_dict(self) -> Dict:
         """Exporta dados para dicionário"""
         return {
@@ -0,0 +1,42 @@
+"""
+Fixtures compartilhadas dos testes do Nathfinance
+"""
+
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+# Os módulos do projeto são importados a partir da raiz (models, utils), como no app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DESCRICOES = [
+    'Salario empresa', 'Aluguel', 'Supermercado extra', 'Uber trip', 'Netflix',
+    'Tesouro direto', 'Freelance site', 'Farmacia', 'Resgate CDB', 'Multa atraso',
+]
+
+
+@pytest.fixture
+def lancamentos():
+    """Lançamentos (data, descrição, valor, recorrente) fora de ordem, com vários no mesmo dia"""
+    aleatorio = random.Random(42)
+    return [
+        (
+            date(2024, 1, 1) + timedelta(days=aleatorio.randrange(150)),
+            aleatorio.choice(DESCRICOES),
+            round(aleatorio.uniform(-900, 900), 2),
+            aleatorio.random() < 0.2,
+        )
+        for _ in range(300)
+    ]
+
+
+@pytest.fixture
+def categorizador_isolado(monkeypatch):
+    """Categorizador compartilhado novo, para que categorias personalizadas não vazem para outros testes"""
+    from models import categories
+    categorizador = categories.CategorizadorAutomatico()
+    monkeypatch.setattr(categories, '_categorizador_compartilhado', categorizador)
+    return categorizador
@@ -0,0 +1,112 @@
+"""
+Ida e volta do livro pelos formatos de armazenamento (CSV, Parquet e SQLite)
+"""
+
+from datetime import date
+
+import pytest
+
+from models.categories import TipoGasto, TipoTransacao
+from utils.data_manager import DataManager
+
+# Classificação diferente da que as regras dariam para as descrições usadas
+MORADIA = (TipoTransacao.SAIDA, TipoGasto.ESSENCIAL, 'moradia_contas_domesticas')
+
+FORMATOS = ['csv', 'parquet', 'sqlite']
+
+
+@pytest.fixture(params=FORMATOS)
+def formato(request):
+    if request.param == 'parquet':
+        pytest.importorskip('pyarrow')
+    return request.param
+
+
+def _campos(gerenciador):
+    return [
+        (t.id, t.data, t.descricao, t.valor, t.recorrente, t.tipo_transacao, t.tipo_gasto, t.categoria)
+        for t in gerenciador.transacoes
+    ]
+
+
+def _livro_salvo(pasta, formato, motor, lancamentos):
+    data_manager = DataManager(str(pasta), motor=motor, armazenamento=formato)
+    gerenciador = data_manager.carregar_transacoes()
+    for lancamento in lancamentos:
+        gerenciador.adicionar_transacao(*lancamento)
+    gerenciador.remover_transacao(gerenciador.transacoes[5].id)
+    assert data_manager.salvar_transacoes(gerenciador)
+    return gerenciador
+
+
+@pytest.mark.parametrize('motor', ['lista', 'colunar'])
+def test_ida_e_volta_preserva_o_livro(tmp_path, formato, motor, lancamentos):
+    gerenciador = _livro_salvo(tmp_path, formato, motor, lancamentos)
+
+    recarregado = DataManager(str(tmp_path), motor=motor, armazenamento=formato).carregar_transacoes()
+    assert _campos(recarregado) == _campos(gerenciador)
+    for original, lida in zip(gerenciador.transacoes, recarregado.transacoes):
+        assert lida.saldo_acumulado == pytest.approx(original.saldo_acumulado, abs=0.005)
+        assert lida.percentual_salario == pytest.approx(original.percentual_salario)
+        assert lida.status_meta == original.status_meta
+
+
+def test_carregar_periodo_le_so_as_datas_pedidas(tmp_path, formato, lancamentos):
+    gerenciador = _livro_salvo(tmp_path, formato, 'lista', lancamentos)
+    inicio, fim = date(2024, 2, 10), date(2024, 3, 20)
+
+    periodo = DataManager(str(tmp_path), armazenamento=formato).carregar_periodo(inicio, fim)
+    esperadas = [t for t in gerenciador.transacoes if inicio <= t.data <= fim]
+    assert [(t.id, t.data, t.valor) for t in periodo.transacoes] == [(t.id, t.data, t.valor) for t in esperadas]
+
+
+def test_migracao_entre_formatos(tmp_path, formato, lancamentos):
+    origem = 'csv' if formato != 'csv' else 'parquet'
+    if origem == 'parquet':
+        pytest.importorskip('pyarrow')
+    gerenciador = _livro_salvo(tmp_path, origem, 'lista', lancamentos)
+
+    assert DataManager(str(tmp_path), armazenamento=origem).migrar_armazenamento(formato)
+    migrado = DataManager(str(tmp_path), armazenamento=formato).carregar_transacoes()
+    assert _campos(migrado) == _campos(gerenciador)
+
+
+def test_tipo_gasto_gravado_e_o_da_transacao(tmp_path, formato):
+    data_manager = DataManager(str(tmp_path), armazenamento=formato)
+    gerenciador = data_manager.carregar_transacoes()
+    gerenciador.adicionar_transacao(date(2024, 3, 4), 'Netflix', -55.9, classificacao=MORADIA)
+    gerenciador.adicionar_transacao(date(2024, 3, 5), 'Salario empresa', 3000.0)
+    assert data_manager.salvar_transacoes(gerenciador)
+
+    # O CSV devolve campos vazios como NaN
+    df = DataManager(str(tmp_path), armazenamento=formato).load_data()
+    assert list(df['Tipo Gasto'].astype(object).fillna('').astype(str)) == ['essencial', '']
+
+
+def test_agregados_sql_usam_a_classificacao_do_diario(tmp_path, lancamentos):
+    data_manager = DataManager(str(tmp_path), armazenamento='sqlite', limite_diario=10_000)
+    gerenciador = data_manager.carregar_transacoes()
+    for lancamento in lancamentos[:100]:
+        gerenciador.adicionar_transacao(*lancamento)
+    assert data_manager.salvar_transacoes(gerenciador)
+
+    # Alterações ainda só no diário, com classificação informada
+    gerenciador.adicionar_transacao(date(2024, 3, 4), 'Netflix', -55.9, classificacao=MORADIA)
+    gerenciador.editar_transacao(gerenciador.transacoes[0].id, valor=-80.0, classificacao=MORADIA)
+    gerenciador.remover_transacao(gerenciador.transacoes[1].id)
+
+    esperado = {}
+    for transacao in gerenciador.transacoes:
+        if transacao.categoria == 'moradia_contas_domesticas':
+            chave = (transacao.data.year, transacao.data.month)
+            esperado[chave] = esperado.get(chave, 0.0) + abs(transacao.valor)
+    gastos = data_manager.obter_gastos_categoria('moradia_contas_domesticas')
+    assert gastos.keys() == esperado.keys()
+    for chave, total in esperado.items():
+        assert gastos[chave] == pytest.approx(total)
+
+    for (ano, mes), resumo in data_manager.obter_resumos_mensais().items():
+        carregado = gerenciador.obter_resumo_mes(mes, ano)
+        assert resumo.quantidade == carregado.quantidade
+        assert resumo.gastos_por_tipo[TipoGasto.ESSENCIAL] == pytest.approx(
+            carregado.gastos_por_tipo.get(TipoGasto.ESSENCIAL, 0.0))
@@ -0,0 +1,83 @@
+"""
+Carga do arquivo principal e importação de extratos pelo DataManager, com
+as linhas inválidas separadas em linhas_rejeitadas
+"""
+
+from datetime import date
+
+import pytest
+
+from utils.data_manager import DataManager
+
+
+@pytest.fixture(params=['lista', 'colunar'])
+def motor(request):
+    return request.param
+
+
+def test_carga_separa_linhas_com_data_ou_valor_invalidos(tmp_path, motor):
+    (tmp_path / 'transactions.csv').write_text(
+        'ID,Data,Descrição,Valor (R$),Recorrente\n'
+        '1,2024-01-05,Salario empresa,3000.0,Sim\n'
+        '2,31/02/2024,Aluguel,-1200.0,Sim\n'
+        '3,10/01/2024,Supermercado extra,-250.5,Não\n'
+        '4,2024-01-12,Netflix,abc,Não\n'
+        '5,ontem,Uber trip,,Não\n'
+        '6,2024-01-20,Farmacia,-35.9,Não\n',
+        encoding='utf-8'
+    )
+    data_manager = DataManager(str(tmp_path), motor=motor)
+    gerenciador = data_manager.carregar_transacoes()
+
+    assert [(t.id, t.data, t.valor, t.recorrente) for t in gerenciador.transacoes] == [
+        (1, date(2024, 1, 5), 3000.0, True),
+        (3, date(2024, 1, 10), -250.5, False),
+        (6, date(2024, 1, 20), -35.9, False),
+    ]
+
+    rejeitadas = data_manager.linhas_rejeitadas
+    assert rejeitadas['Linha'].tolist() == [3, 5, 6]
+    assert rejeitadas['Motivo'].tolist() == ['data inválida', 'valor inválido', 'data e valor inválidos']
+    assert rejeitadas['Descrição'].tolist() == ['Aluguel', 'Netflix', 'Uber trip']
+
+
+def test_carga_sem_rejeitadas_limpa_o_relatorio(tmp_path, motor):
+    arquivo = tmp_path / 'transactions.csv'
+    arquivo.write_text('Data,Descrição,Valor (R$)\n2024-01-05,Salario empresa,x\n', encoding='utf-8')
+    data_manager = DataManager(str(tmp_path), motor=motor)
+    data_manager.carregar_transacoes()
+    assert len(data_manager.linhas_rejeitadas) == 1
+
+    arquivo.write_text('Data,Descrição,Valor (R$)\n2024-01-05,Salario empresa,10\n', encoding='utf-8')
+    assert len(data_manager.carregar_transacoes().transacoes) == 1
+    assert data_manager.linhas_rejeitadas.empty
+
+
+def test_importacao_externa_com_datas_flexiveis(tmp_path, motor):
+    extrato = tmp_path / 'extrato.csv'
+    extrato.write_text(
+        'Quando,Histórico,Quantia\n'
+        '2024-01-15,Salario empresa,"3000,00"\n'
+        '16/01/2024,Aluguel,-1200\n'
+        '2024-01-17 10:30:00,Uber trip,"-23,40"\n'
+        '18/01/24,Farmacia,-35.9\n'
+        'Jan 19 2024,Netflix,-39.9\n'
+        'sem data,Multa atraso,-10\n'
+        '2024-01-20,Resgate CDB,dez reais\n',
+        encoding='utf-8'
+    )
+    data_manager = DataManager(str(tmp_path), motor=motor)
+    gerenciador = data_manager.importar_csv_externo(
+        str(extrato), {'data': 'Quando', 'descricao': 'Histórico', 'valor': 'Quantia'}
+    )
+
+    assert [(t.data, t.descricao, t.valor) for t in gerenciador.transacoes] == [
+        (date(2024, 1, 15), 'Salario empresa', 3000.0),
+        (date(2024, 1, 16), 'Aluguel', -1200.0),
+        (date(2024, 1, 17), 'Uber trip', -23.4),
+        (date(2024, 1, 18), 'Farmacia', -35.9),
+        (date(2024, 1, 19), 'Netflix', -39.9),
+    ]
+    rejeitadas = data_manager.linhas_rejeitadas
+    assert rejeitadas['Linha'].tolist() == [7, 8]
+    assert rejeitadas['Motivo'].tolist() == ['data inválida', 'valor inválido']
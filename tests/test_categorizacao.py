@@ -0,0 +1,171 @@
+"""
+Paridade do categorizador (autômato Aho-Corasick, cache e lote) com as
+regras originais, varredura das palavras-chave em ordem de declaração, e
+reclassificação dos livros quando uma categoria personalizada muda
+"""
+
+import unicodedata
+
+import pandas as pd
+import pytest
+
+from models.categories import CategorizadorAutomatico, TipoGasto, TipoTransacao
+from models.transaction import GerenciadorTransacoes
+from models.transaction_columnar import GerenciadorTransacoesColunar
+
+
+def _normalizar(texto):
+    texto_normalizado = unicodedata.normalize('NFD', texto.lower())
+    return ''.join(c for c in texto_normalizado if unicodedata.category(c) != 'Mn')
+
+
+def _primeira(categorias, descricao):
+    """Primeira categoria (na ordem dos dicionários) com alguma palavra-chave contida na descrição"""
+    for rotulo, palavras in categorias:
+        if any(_normalizar(palavra) in descricao for palavra in palavras):
+            return rotulo
+    return None
+
+
+def _classificar_referencia(categorizador, descricao, valor):
+    """Regras de classificação originais, palavra por palavra, sobre as tabelas do categorizador"""
+    descricao = _normalizar(descricao)
+    receitas = list(categorizador.categorias_receitas.items())
+
+    if valor > 0 or _primeira([('entrada', categorizador.palavras_entrada)], descricao):
+        return TipoTransacao.ENTRADA, None, _primeira(receitas, descricao) or 'renda_geral'
+
+    investimento = _primeira(categorizador.categorias_investimentos.items(), descricao)
+    if investimento:
+        if valor < 0:
+            return TipoTransacao.INVESTIMENTO, TipoGasto.INVESTIMENTO, investimento
+        return TipoTransacao.ENTRADA, None, investimento
+
+    imprevisto = _primeira(categorizador.categorias_imprevistos.items(), descricao)
+    if imprevisto:
+        return TipoTransacao.SAIDA, TipoGasto.VARIAVEL, f"imprevisto_{imprevisto}"
+
+    for tabela, tipo_gasto in ((categorizador.categorias_essenciais, TipoGasto.ESSENCIAL),
+                               (categorizador.categorias_variaveis, TipoGasto.VARIAVEL)):
+        categoria = _primeira(
+            [(f"{principal}_{sub}", palavras) for principal, subs in tabela.items() for sub, palavras in subs.items()],
+            descricao
+        )
+        if categoria:
+            return TipoTransacao.SAIDA, tipo_gasto, categoria
+
+    return TipoTransacao.SAIDA, TipoGasto.VARIAVEL, 'outros'
+
+
+def _descricoes(categorizador):
+    """Cada palavra-chave sozinha, combinada com outras (disputa de prioridade) e com acentos e maiúsculas"""
+    palavras = list(categorizador.palavras_entrada)
+    for tabela in (categorizador.categorias_receitas, categorizador.categorias_investimentos,
+                   categorizador.categorias_imprevistos):
+        for lista in tabela.values():
+            palavras.extend(lista)
+    for tabela in (categorizador.categorias_essenciais, categorizador.categorias_variaveis):
+        for subs in tabela.values():
+            for lista in subs.values():
+                palavras.extend(lista)
+
+    descricoes = ['', 'PAGAMENTO DIVERSO', 'Salário empresa', 'Farmácia São João', 'Açougue', 'Resgate CDB']
+    descricoes += [f"Pgto {palavra.upper()} ref 03" for palavra in palavras]
+    descricoes += [f"{a} {b}" for a, b in zip(palavras, reversed(palavras))]
+    descricoes += [f"{a}{b}" for a, b in zip(palavras, palavras[1:])]
+    return descricoes
+
+
+@pytest.fixture(scope='module')
+def categorizador():
+    return CategorizadorAutomatico()
+
+
+@pytest.mark.parametrize('valor', [-100.0, 0.0, 100.0])
+def test_classificacao_igual_as_regras_originais(categorizador, valor):
+    for descricao in _descricoes(categorizador):
+        esperado = _classificar_referencia(categorizador, descricao, valor)
+        assert categorizador.classificar_transacao(descricao, valor) == esperado, descricao
+        # Segunda chamada vem do cache
+        assert categorizador.classificar_transacao(descricao, valor) == esperado, descricao
+
+
+def _lote(descricoes):
+    """Descrições repetidas, com valores de sinais alternados e índice não sequencial"""
+    descricoes = descricoes * 2
+    valores = [(-1) ** i * (10.0 + i) for i in range(len(descricoes))]
+    indice = [3 * i + 1 for i in range(len(descricoes))]
+    return pd.Series(descricoes, index=indice), pd.Series(valores, index=indice)
+
+
+def _tuplas(resultado):
+    return list(resultado[['tipo_transacao', 'tipo_gasto', 'categoria']].itertuples(index=False, name=None))
+
+
+def test_classificacao_em_lote_igual_a_individual(categorizador):
+    descricoes, valores = _lote(_descricoes(categorizador))
+    lote = categorizador.classificar_lote(descricoes, valores)
+    assert list(lote.index) == list(descricoes.index)
+    assert _tuplas(lote) == [
+        _classificar_referencia(categorizador, descricao, valor) for descricao, valor in zip(descricoes, valores)
+    ]
+
+
+def test_classificacao_paralela_igual_a_serial():
+    categorizador = CategorizadorAutomatico()
+    # Regra nova: os processos precisam receber as regras atuais, não as de fábrica
+    categorizador.adicionar_categoria_personalizada(TipoGasto.VARIAVEL, 'vinhos', ['clube do vinho'])
+    descricoes, valores = _lote(_descricoes(categorizador) + ['Clube do vinho'])
+
+    serial = categorizador.classificar_lote(descricoes, valores)
+    paralelo = categorizador.classificar_lote(descricoes, valores, paralelo=True, max_workers=2, tamanho_bloco=64)
+    assert list(paralelo.index) == list(serial.index)
+    assert _tuplas(paralelo) == _tuplas(serial)
+    assert 'outros_vinhos' in set(paralelo['categoria'])
+
+
+def _classificacoes(gerenciador):
+    return [
+        (t.id, t.tipo_transacao, t.tipo_gasto, t.categoria, round(t.saldo_acumulado, 2),
+         round(t.percentual_salario, 6), t.status_meta)
+        for t in gerenciador.transacoes
+    ]
+
+
+@pytest.mark.parametrize('motor', [GerenciadorTransacoes, GerenciadorTransacoesColunar])
+def test_reclassificacao_incremental_igual_a_reconstruir(categorizador_isolado, motor, lancamentos):
+    descricoes = ['Clube do vinho', 'Netflix', 'Loja Zeta', 'Academia Zetafit', 'Salario empresa', 'Padaria', 'Kappa coin']
+    linhas = [(data, descricoes[i % len(descricoes)], valor, recorrente)
+              for i, (data, _, valor, recorrente) in enumerate(lancamentos)]
+    gerenciador = motor()
+    outro = GerenciadorTransacoesColunar if motor is GerenciadorTransacoes else GerenciadorTransacoes
+    vizinho = outro()
+    for linha in linhas:
+        gerenciador.adicionar_transacao(*linha)
+        vizinho.adicionar_transacao(*linha)
+    editadas = []
+    gerenciador.adicionar_ouvinte(lambda operacao, transacoes, versao: editadas.append((operacao, transacoes)))
+
+    # 'flix' só aparece dentro de um token; a categoria 'zeta' é trocada depois
+    assert gerenciador.adicionar_categoria_personalizada(TipoGasto.ESSENCIAL, 'streaming', ['flix']) > 0
+    assert gerenciador.adicionar_categoria_personalizada(TipoGasto.ESSENCIAL, 'zeta', ['zeta']) > 0
+    assert gerenciador.adicionar_categoria_personalizada(TipoGasto.INVESTIMENTO, 'kappa', ['kappa co']) > 0
+    assert gerenciador.adicionar_categoria_personalizada(TipoGasto.ESSENCIAL, 'zeta', ['loja z']) > 0
+
+    reconstruido = motor()
+    for linha in linhas:
+        reconstruido.adicionar_transacao(*linha)
+    assert _classificacoes(gerenciador) == _classificacoes(reconstruido)
+
+    # O outro gerenciador do processo também recebeu as regras
+    assert [t.categoria for t in vizinho.transacoes] == [t.categoria for t in reconstruido.transacoes]
+
+    # Cada mudança foi notificada como edição das transações reclassificadas
+    assert editadas and all(operacao == 'editar' for operacao, _ in editadas)
+    finais = {}
+    for _, transacoes in editadas:
+        finais.update((t.id, t.categoria) for t in transacoes)
+    atuais = {t.id: t.categoria for t in gerenciador.transacoes}
+    assert finais == {id_transacao: atuais[id_transacao] for id_transacao in finais}
+    assert {id_transacao for id_transacao, categoria in finais.items() if categoria == 'outros_streaming'} == \
+        {t.id for t in gerenciador.transacoes if t.descricao == 'Netflix' and t.valor <= 0}
@@ -0,0 +1,126 @@
+"""
+Reaplicação do diário (write-ahead log) do DataManager depois de uma queda
+"""
+
+import json
+from datetime import date
+
+import pytest
+
+from models.categories import TipoGasto, TipoTransacao
+from utils.data_manager import DataManager
+
+# Classificação diferente da que as regras dariam para as descrições usadas
+MORADIA = (TipoTransacao.SAIDA, TipoGasto.ESSENCIAL, 'moradia_contas_domesticas')
+
+
+def _campos(gerenciador):
+    return [(t.id, t.data, t.descricao, t.valor, t.recorrente) for t in gerenciador.transacoes]
+
+
+@pytest.fixture(params=['lista', 'colunar'])
+def motor(request):
+    return request.param
+
+
+def test_alteracoes_sem_compactacao_sao_reaplicadas(tmp_path, motor, lancamentos):
+    data_manager = DataManager(str(tmp_path), motor=motor, limite_diario=10_000)
+    gerenciador = data_manager.carregar_transacoes()
+    for lancamento in lancamentos[:50]:
+        gerenciador.adicionar_transacao(*lancamento)
+    removida = gerenciador.transacoes[10].id
+    editada = gerenciador.transacoes[20].id
+    gerenciador.remover_transacao(removida)
+    gerenciador.editar_transacao(editada, descricao='Mercado da esquina', valor=-42.0)
+    esperado = _campos(gerenciador)
+
+    # Queda: o processo termina sem nunca gravar o arquivo principal
+    assert not data_manager.armazenamento.existe()
+
+    recarregado = DataManager(str(tmp_path), motor=motor).carregar_transacoes()
+    assert _campos(recarregado) == esperado
+    assert recarregado.obter_transacao(removida) is None
+    assert recarregado.obter_transacao(editada).descricao == 'Mercado da esquina'
+
+
+def test_ultima_linha_truncada_e_ignorada(tmp_path, motor, lancamentos):
+    data_manager = DataManager(str(tmp_path), motor=motor, limite_diario=10_000)
+    gerenciador = data_manager.carregar_transacoes()
+    for lancamento in lancamentos[:20]:
+        gerenciador.adicionar_transacao(*lancamento)
+    esperado = _campos(gerenciador)
+
+    # Queda no meio do append do próximo registro
+    with open(data_manager.journal_file, 'a', encoding='utf-8') as arquivo:
+        arquivo.write('{"operacao": "inserir", "id": 999, "data": "2024-0')
+
+    recarregado = DataManager(str(tmp_path), motor=motor).carregar_transacoes()
+    assert _campos(recarregado) == esperado
+
+
+def test_queda_entre_gravar_arquivo_e_esvaziar_diario_nao_duplica(tmp_path, motor, lancamentos):
+    data_manager = DataManager(str(tmp_path), motor=motor, limite_diario=10_000)
+    gerenciador = data_manager.carregar_transacoes()
+    for lancamento in lancamentos[:30]:
+        gerenciador.adicionar_transacao(*lancamento)
+    gerenciador.remover_transacao(gerenciador.transacoes[0].id)
+    esperado = _campos(gerenciador)
+
+    # O arquivo principal foi gravado, mas o diário não chegou a ser esvaziado
+    data_manager.armazenamento.gravar(gerenciador.snapshot().dados)
+    with open(data_manager.journal_file, encoding='utf-8') as arquivo:
+        assert len(arquivo.readlines()) == 31
+
+    segundo = DataManager(str(tmp_path), motor=motor)
+    recarregado = segundo.carregar_transacoes()
+    assert _campos(recarregado) == esperado
+
+    # A carga compacta o diário, e o gerenciador devolvido continua registrando nele
+    with open(segundo.journal_file, encoding='utf-8') as arquivo:
+        assert arquivo.read() == ''
+    nova = recarregado.adicionar_transacao(date(2024, 7, 1), 'Farmacia', -30.0)
+    with open(segundo.journal_file, encoding='utf-8') as arquivo:
+        assert json.loads(arquivo.readline())['id'] == nova.id
+
+
+def test_livro_ilegivel_impede_a_carga(tmp_path, motor):
+    data_manager = DataManager(str(tmp_path), motor=motor)
+    with open(data_manager.armazenamento.caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write('isto não é um livro\x00\x01')
+
+    with pytest.raises(RuntimeError):
+        data_manager.carregar_transacoes()
+
+
+def test_reaplicacao_mantem_a_classificacao_gravada(tmp_path, motor):
+    data_manager = DataManager(str(tmp_path), motor=motor, limite_diario=10_000)
+    gerenciador = data_manager.carregar_transacoes()
+    gerenciador.adicionar_transacao(date(2024, 3, 5), 'Salario empresa', 3000.0)
+    inserida = gerenciador.adicionar_transacao(date(2024, 3, 4), 'Netflix', -55.9, classificacao=MORADIA)
+    editada = gerenciador.adicionar_transacao(date(2024, 3, 6), 'Uber trip', -20.0)
+    gerenciador.editar_transacao(editada.id, valor=-25.0, classificacao=MORADIA)
+    esperado = [(t.id, t.tipo_transacao, t.tipo_gasto, t.categoria, t.status_meta) for t in gerenciador.transacoes]
+
+    with open(data_manager.journal_file, encoding='utf-8') as arquivo:
+        registros = [json.loads(linha) for linha in arquivo]
+    assert registros[1]['tipo_gasto'] == 'essencial'
+    assert registros[1]['categoria'] == 'moradia_contas_domesticas'
+    assert registros[0]['tipo_gasto'] is None
+
+    recarregado = DataManager(str(tmp_path), motor=motor).carregar_transacoes()
+    assert [(t.id, t.tipo_transacao, t.tipo_gasto, t.categoria, t.status_meta)
+            for t in recarregado.transacoes] == esperado
+    assert recarregado.obter_transacao(inserida.id).categoria == 'moradia_contas_domesticas'
+
+
+def test_registro_antigo_sem_classificacao_e_reclassificado(tmp_path, motor):
+    data_manager = DataManager(str(tmp_path), motor=motor)
+    with open(data_manager.journal_file, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(json.dumps({'operacao': 'inserir', 'id': 1, 'data': '2024-03-04', 'descricao': 'Netflix',
+                                  'valor': -55.9, 'recorrente': True}) + '\n')
+
+    recarregado = data_manager.carregar_transacoes()
+    referencia = type(recarregado)().adicionar_transacao(date(2024, 3, 4), 'Netflix', -55.9)
+    transacao = recarregado.obter_transacao(1)
+    assert (transacao.tipo_transacao, transacao.tipo_gasto, transacao.categoria) == \
+        (referencia.tipo_transacao, referencia.tipo_gasto, referencia.categoria)
@@ -0,0 +1,80 @@
+"""
+Saldos dos dois motores contra o saldo corrido calculado em sequência
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from models.categories import TipoTransacao
+from models.transaction import GerenciadorTransacoes
+from models.transaction_columnar import GerenciadorTransacoesColunar
+
+MOTORES = [GerenciadorTransacoes, GerenciadorTransacoesColunar]
+
+
+def _movimento(transacao):
+    return transacao.valor if transacao.tipo_transacao == TipoTransacao.ENTRADA else -abs(transacao.valor)
+
+
+def _saldos_sequenciais(transacoes):
+    """Saldo ao fim de cada dia somando as transações uma a uma, na ordem do livro"""
+    saldos = {}
+    saldo = 0.0
+    for transacao in transacoes:
+        saldo += _movimento(transacao)
+        saldos[transacao.data] = saldo
+    return saldos
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_saldo_acumulado_igual_ao_saldo_corrido(motor, lancamentos):
+    gerenciador = motor()
+    for posicao, lancamento in enumerate(lancamentos):
+        gerenciador.adicionar_transacao(*lancamento)
+        if posicao % 50 == 0:
+            # Leituras no meio das inserções fora de ordem
+            assert len(gerenciador.transacoes) == posicao + 1
+
+    transacoes = gerenciador.transacoes
+    assert [t.data for t in transacoes] == sorted(t.data for t in transacoes)
+    saldo = 0.0
+    for transacao in transacoes:
+        saldo += _movimento(transacao)
+        assert transacao.saldo_acumulado == pytest.approx(saldo, abs=0.005)
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_saldo_em_confere_com_saldo_corrido(motor, lancamentos):
+    gerenciador = motor()
+    for lancamento in lancamentos:
+        gerenciador.adicionar_transacao(*lancamento)
+    saldos = _saldos_sequenciais(gerenciador.transacoes)
+
+    saldo = 0.0
+    dia = date(2023, 12, 25)
+    while dia <= date(2024, 6, 10):
+        saldo = saldos.get(dia, saldo)
+        assert gerenciador.obter_saldo_em(dia) == pytest.approx(saldo, abs=0.005)
+        dia += timedelta(days=1)
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_saldo_e_fluxo_apos_edicoes_e_remocoes(motor, lancamentos):
+    gerenciador = motor()
+    ids = [gerenciador.adicionar_transacao(*lancamento).id for lancamento in lancamentos]
+
+    for id_transacao in ids[::7]:
+        gerenciador.remover_transacao(id_transacao)
+    for deslocamento, id_transacao in enumerate(ids[3::11]):
+        gerenciador.editar_transacao(id_transacao, data=date(2024, 2, 1) + timedelta(days=deslocamento),
+                                     valor=-12.5)
+
+    transacoes = gerenciador.transacoes
+    for dia, saldo in _saldos_sequenciais(transacoes).items():
+        assert gerenciador.obter_saldo_em(dia) == pytest.approx(saldo, abs=0.005)
+
+    inicio, fim = date(2024, 2, 1), date(2024, 2, 29)
+    fluxo = sum(_movimento(t) for t in transacoes if inicio <= t.data <= fim)
+    assert gerenciador.obter_fluxo_periodo(inicio, fim) == pytest.approx(fluxo, abs=0.005)
+    assert gerenciador.obter_fluxo_periodo(fim, inicio) == 0.0
@@ -0,0 +1,304 @@
+"""
+Operações dos gerenciadores de transações (lista de objetos e colunar)
+"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from models.categories import TipoTransacao
+from models.transaction import GerenciadorTransacoes
+from models.transaction_columnar import GerenciadorTransacoesColunar
+
+MOTORES = [GerenciadorTransacoes, GerenciadorTransacoesColunar]
+
+
+def _campos(gerenciador):
+    return [(t.id, t.data, t.descricao, t.valor, t.recorrente) for t in gerenciador.transacoes]
+
+
+def _linhas(lancamentos):
+    return [
+        {'data': data, 'descricao': descricao, 'valor': valor, 'recorrente': recorrente}
+        for data, descricao, valor, recorrente in lancamentos
+    ]
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_lote_com_linha_invalida_nao_altera_o_livro(motor, lancamentos):
+    gerenciador = motor()
+    gerenciador.adicionar_transacoes(_linhas(lancamentos[:10]))
+    antes = _campos(gerenciador)
+
+    linhas = _linhas(lancamentos[10:20])
+    del linhas[5]['data']
+    with pytest.raises(KeyError):
+        gerenciador.adicionar_transacoes(linhas)
+    assert _campos(gerenciador) == antes
+
+    # Os IDs que as linhas anteriores à inválida teriam recebido continuam livres
+    assert gerenciador.remover_transacao(11) is None
+    assert gerenciador.editar_transacao(11, valor=-1.0) is None
+    assert gerenciador.adicionar_transacoes(_linhas(lancamentos[10:12]))[0].id == 11
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_id_pedido_em_uso_levanta_erro(motor, lancamentos):
+    gerenciador = motor()
+    existente = gerenciador.adicionar_transacao(*lancamentos[0])
+    antes = _campos(gerenciador)
+
+    with pytest.raises(ValueError):
+        gerenciador.adicionar_transacao(*lancamentos[1], id_transacao=existente.id)
+    with pytest.raises(ValueError):
+        gerenciador.adicionar_transacoes([dict(linha, id=existente.id) for linha in _linhas(lancamentos[1:2])])
+    with pytest.raises(ValueError):
+        gerenciador.adicionar_transacoes([dict(linha, id=50) for linha in _linhas(lancamentos[1:3])])
+    assert _campos(gerenciador) == antes
+
+    # IDs pedidos e livres são mantidos; os sem pedido continuam depois do maior
+    novas = gerenciador.adicionar_transacoes([dict(_linhas(lancamentos[1:2])[0], id=50)] + _linhas(lancamentos[2:3]))
+    assert sorted(t.id for t in novas) == [50, 51]
+    assert gerenciador.adicionar_transacao(date(2024, 1, 1), 'Padaria', -8.0).id == 52
+
+
+def _livro_alterado(motor, lancamentos):
+    """Livro com inserções fora de ordem, remoções e edições de data, descrição e valor"""
+    gerenciador = motor()
+    ids = [gerenciador.adicionar_transacao(*lancamento).id for lancamento in lancamentos]
+    for id_transacao in ids[::7]:
+        gerenciador.remover_transacao(id_transacao)
+    for deslocamento, id_transacao in enumerate(ids[3::11]):
+        gerenciador.editar_transacao(id_transacao, data=date(2024, 7, 1 + deslocamento % 28))
+    for id_transacao in ids[5::13]:
+        gerenciador.editar_transacao(id_transacao, descricao='Salario empresa', valor=2500.0)
+    for id_transacao in ids[6::17]:
+        gerenciador.editar_transacao(id_transacao, valor=-75.5)
+    return gerenciador
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_indice_de_meses_apos_insercoes_edicoes_e_remocoes(motor, lancamentos):
+    gerenciador = _livro_alterado(motor, lancamentos)
+    transacoes = gerenciador.transacoes
+
+    meses = sorted({(t.data.year, t.data.month) for t in transacoes})
+    assert gerenciador.obter_meses() == meses
+    for ano, mes in meses + [(2023, 12), (2025, 1)]:
+        esperadas = [t.id for t in transacoes if (t.data.year, t.data.month) == (ano, mes)]
+        assert [t.id for t in gerenciador.obter_transacoes_mes(mes, ano)] == esperadas
+
+    # Esvaziar um mês tira ele do índice
+    ano, mes = meses[0]
+    for transacao in list(gerenciador.obter_transacoes_mes(mes, ano)):
+        gerenciador.remover_transacao(transacao.id)
+    assert gerenciador.obter_meses() == meses[1:]
+    assert len(gerenciador.obter_transacoes_mes(mes, ano)) == 0
+
+
+def _resumo_do_zero(transacoes, ano, mes):
+    """Renda, gastos por tipo e por categoria e quantidade somados direto das transações do mês"""
+    return _agregados([t for t in transacoes if (t.data.year, t.data.month) == (ano, mes)])
+
+
+def _agregados(transacoes):
+    renda = 0.0
+    gastos_por_tipo = {}
+    gastos_por_categoria = {}
+    for transacao in transacoes:
+        if transacao.tipo_transacao == TipoTransacao.ENTRADA:
+            renda += abs(transacao.valor)
+            continue
+        if transacao.tipo_gasto:
+            gastos_por_tipo[transacao.tipo_gasto] = gastos_por_tipo.get(transacao.tipo_gasto, 0.0) + abs(transacao.valor)
+        gastos_por_categoria[transacao.categoria] = \
+            gastos_por_categoria.get(transacao.categoria, 0.0) + abs(transacao.valor)
+    return renda, gastos_por_tipo, gastos_por_categoria, len(transacoes)
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_resumos_mensais_iguais_ao_calculo_do_zero(motor, lancamentos):
+    gerenciador = _livro_alterado(motor, lancamentos)
+    transacoes = gerenciador.transacoes
+
+    for ano, mes in gerenciador.obter_meses():
+        renda, gastos_por_tipo, gastos_por_categoria, quantidade = _resumo_do_zero(transacoes, ano, mes)
+        resumo = gerenciador.obter_resumo_mes(mes, ano)
+        assert resumo.renda == pytest.approx(renda)
+        assert resumo.quantidade == quantidade
+        for tipo, valor in resumo.gastos_por_tipo.items():
+            assert valor == pytest.approx(gastos_por_tipo.get(tipo, 0.0), abs=1e-6)
+        assert resumo.gastos_por_categoria.keys() == gastos_por_categoria.keys()
+        for categoria, valor in gastos_por_categoria.items():
+            assert resumo.gastos_por_categoria[categoria] == pytest.approx(valor)
+        ultima_do_mes = [t for t in transacoes if (t.data.year, t.data.month) == (ano, mes)][-1]
+        assert resumo.saldo_final == pytest.approx(ultima_do_mes.saldo_acumulado)
+        assert gerenciador.obter_renda_mensal(mes, ano) == pytest.approx(renda)
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_resumo_devolvido_nao_acompanha_o_livro(motor, lancamentos):
+    gerenciador = motor()
+    for lancamento in lancamentos[:40]:
+        gerenciador.adicionar_transacao(*lancamento)
+    ano, mes = gerenciador.obter_meses()[0]
+    resumo = gerenciador.obter_resumo_mes(mes, ano)
+    renda, quantidade, gastos = resumo.renda, resumo.quantidade, dict(resumo.gastos_por_categoria)
+
+    gerenciador.adicionar_transacao(date(ano, mes, 15), 'Salario empresa', 1234.0)
+    gerenciador.adicionar_transacao(date(ano, mes, 15), 'Padaria', -12.0)
+    assert (resumo.renda, resumo.quantidade, resumo.gastos_por_categoria) == (renda, quantidade, gastos)
+
+    # Alterar a cópia também não muda o livro
+    resumo.gastos_por_categoria.clear()
+    resumo.renda = 0.0
+    atual = gerenciador.obter_resumo_mes(mes, ano)
+    assert atual.renda == pytest.approx(renda + 1234.0)
+    assert atual.gastos_por_categoria
+
+
+COLUNAS_EXPORTADAS = [
+    'ID', 'Data', 'Tipo', 'Tipo Gasto', 'Categoria', 'Descrição', 'Valor (R$)', 'Recorrente',
+    'Semana', 'Saldo Acumulado', '% do Salário', 'Meta 50-30-20',
+]
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_exportacao_colunas_tipos_e_valores(motor, lancamentos):
+    gerenciador = _livro_alterado(motor, lancamentos)
+    df = gerenciador.exportar_para_dataframe()
+
+    assert list(df.columns) == COLUNAS_EXPORTADAS
+    for nome in ('Tipo', 'Tipo Gasto', 'Categoria', 'Meta 50-30-20'):
+        assert isinstance(df[nome].dtype, pd.CategoricalDtype), nome
+    for nome in ('ID', 'Semana'):
+        assert pd.api.types.is_integer_dtype(df[nome]), nome
+    for nome in ('Valor (R$)', 'Saldo Acumulado'):
+        assert pd.api.types.is_float_dtype(df[nome]), nome
+
+    transacoes = gerenciador.transacoes
+    esperado = pd.DataFrame({
+        'ID': [t.id for t in transacoes],
+        'Data': [t.data for t in transacoes],
+        'Tipo Gasto': [t.tipo_gasto.value if t.tipo_gasto else '' for t in transacoes],
+        'Recorrente': ['Sim' if t.recorrente else 'Não' for t in transacoes],
+        'Semana': [(t.data.day - 1) // 7 + 1 for t in transacoes],
+        '% do Salário': [f"{t.percentual_salario:.1f}%" for t in transacoes],
+    })
+    for nome in esperado.columns:
+        assert df[nome].astype(object).tolist() == esperado[nome].tolist(), nome
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_exportacao_do_livro_vazio(motor):
+    df = motor().exportar_para_dataframe()
+    assert list(df.columns) == COLUNAS_EXPORTADAS
+    assert df.empty
+
+
+def _estado(gerenciador):
+    """Campos armazenados e derivados de cada transação, na ordem do livro"""
+    return [
+        (t.id, t.data, t.descricao, t.valor, t.recorrente, t.tipo_transacao, t.tipo_gasto, t.categoria,
+         round(t.saldo_acumulado, 2), round(t.percentual_salario, 6), t.status_meta)
+        for t in gerenciador.transacoes
+    ]
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_edicoes_e_remocoes_iguais_a_reconstruir(motor, lancamentos):
+    gerenciador = _livro_alterado(motor, lancamentos)
+
+    reconstruido = motor()
+    for t in gerenciador.transacoes:
+        reconstruido.adicionar_transacao(t.data, t.descricao, t.valor, t.recorrente, id_transacao=t.id)
+    assert _estado(gerenciador) == _estado(reconstruido)
+
+    # IDs já removidos não alteram o livro
+    removida = gerenciador.transacoes[0]
+    assert gerenciador.remover_transacao(removida.id).id == removida.id
+    antes = _estado(gerenciador)
+    assert gerenciador.remover_transacao(removida.id) is None
+    assert gerenciador.editar_transacao(removida.id, valor=-1.0) is None
+    assert _estado(gerenciador) == antes
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_remover_a_renda_zera_o_percentual_do_mes(motor):
+    gerenciador = motor()
+    salario = gerenciador.adicionar_transacao(date(2024, 3, 5), 'Salario empresa', 2000.0)
+    aluguel = gerenciador.adicionar_transacao(date(2024, 3, 10), 'Aluguel', -500.0)
+    outro_mes = gerenciador.adicionar_transacao(date(2024, 4, 10), 'Aluguel', -500.0)
+    gerenciador.adicionar_transacao(date(2024, 4, 5), 'Salario empresa', 1000.0)
+
+    def percentual(id_transacao):
+        return next(t.percentual_salario for t in gerenciador.transacoes if t.id == id_transacao)
+
+    assert percentual(aluguel.id) == pytest.approx(25.0)
+    assert percentual(outro_mes.id) == pytest.approx(50.0)
+
+    gerenciador.editar_transacao(salario.id, valor=1000.0)
+    assert percentual(aluguel.id) == pytest.approx(50.0)
+
+    gerenciador.remover_transacao(salario.id)
+    assert percentual(aluguel.id) == 0.0
+    assert percentual(outro_mes.id) == pytest.approx(50.0)
+
+
+PERIODOS = [
+    (date(2024, 1, 1), date(2024, 1, 31)),
+    (date(2024, 2, 10), date(2024, 4, 20)),
+    (date(2024, 3, 15), date(2024, 3, 15)),
+    (date(2023, 11, 1), date(2024, 1, 5)),
+    (date(2024, 5, 20), date(2024, 12, 31)),
+    (date(2025, 1, 1), date(2025, 2, 1)),
+    (date(2024, 3, 1), date(2024, 2, 1)),
+]
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+@pytest.mark.parametrize('inicio, fim', PERIODOS)
+def test_consultas_por_periodo(motor, lancamentos, inicio, fim):
+    gerenciador = _livro_alterado(motor, lancamentos)
+    transacoes = gerenciador.transacoes
+    no_periodo = [t for t in transacoes if inicio <= t.data <= fim]
+
+    visao = gerenciador.obter_transacoes_periodo(inicio, fim)
+    assert len(visao) == len(no_periodo)
+    assert [(t.id, t.saldo_acumulado) for t in visao] == [(t.id, t.saldo_acumulado) for t in no_periodo]
+    assert gerenciador.contar_transacoes_periodo(inicio, fim) == len(no_periodo)
+
+    renda, gastos_por_tipo, gastos_por_categoria, quantidade = _agregados(no_periodo)
+    resumo = gerenciador.obter_resumo_periodo(inicio, fim)
+    assert resumo.renda == pytest.approx(renda)
+    assert resumo.quantidade == quantidade
+    for tipo, valor in resumo.gastos_por_tipo.items():
+        assert valor == pytest.approx(gastos_por_tipo.get(tipo, 0.0), abs=1e-6)
+    assert resumo.gastos_por_categoria.keys() == gastos_por_categoria.keys()
+    for categoria, valor in gastos_por_categoria.items():
+        assert resumo.gastos_por_categoria[categoria] == pytest.approx(valor)
+    assert resumo.saldo_final == pytest.approx(gerenciador.obter_saldo_em(fim))
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_snapshot_nao_muda_com_escritas_posteriores(motor, lancamentos):
+    gerenciador = motor()
+    for lancamento in lancamentos[:100]:
+        gerenciador.adicionar_transacao(*lancamento)
+    snapshot = gerenciador.snapshot()
+    copia = snapshot.dados.copy(deep=True)
+    assert snapshot.versao == gerenciador.versao
+    assert gerenciador.snapshot() is snapshot
+
+    ids = [t.id for t in gerenciador.transacoes]
+    gerenciador.adicionar_transacao(date(2024, 1, 1), 'Salario empresa', 5000.0)
+    gerenciador.editar_transacao(ids[10], data=date(2024, 1, 2), valor=-999.0)
+    gerenciador.remover_transacao(ids[20])
+    gerenciador.adicionar_transacoes(_linhas(lancamentos[100:150]))
+
+    pd.testing.assert_frame_equal(snapshot.dados, copia)
+    novo = gerenciador.snapshot()
+    assert novo.versao > snapshot.versao
+    assert novo.quantidade == 150
+    pd.testing.assert_frame_equal(novo.dados, gerenciador.exportar_para_dataframe())
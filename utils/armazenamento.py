@@ -0,0 +1,510 @@
+"""
+Formatos de armazenamento do livro de transações para FinTrack360
+
+Cada formato grava o DataFrame exportado pelo gerenciador (um snapshot) e o
+lê de volta; o DataManager escolhe o formato e cuida da conversão para
+transações, do diário e dos backups.
+
+    csv      transactions.csv, texto (formato original)
+    parquet  transactions.parquet, colunas tipadas (requer pyarrow)
+    sqlite   fintrack360.db, banco local com o livro, cartões, metas,
+             orçamentos e lembretes; agregados mensais calculados em SQL
+"""
+
+import os
+import shutil
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.categories import TipoGasto, TipoTransacao
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dependência opcional: só o formato Parquet precisa dela
+    pa = None
+    pq = None
+
+
+class ArmazenamentoTransacoes(ABC):
+    """
+    Formato de armazenamento do livro
+
+    ler() devolve as colunas do DataFrame exportado (ao menos ID, Data,
+    Descrição, Valor (R$) e Recorrente); os tipos podem ser texto, como no
+    CSV, ou já convertidos. Com inicio/fim, formatos que sabem filtrar na
+    leitura devolvem só o período; os demais devolvem tudo e o DataManager
+    filtra.
+    """
+
+    extensao = ''
+
+    def __init__(self, data_dir: str):
+        self.caminho = os.path.join(data_dir, f"transactions{self.extensao}")
+
+    def existe(self) -> bool:
+        return os.path.exists(self.caminho)
+
+    @abstractmethod
+    def ler(self, inicio: Optional[date] = None, fim: Optional[date] = None) -> pd.DataFrame:
+        """Lê o livro gravado (só o período, se o formato souber filtrar)"""
+
+    @abstractmethod
+    def gravar(self, dados: pd.DataFrame):
+        """Substitui o livro gravado inteiro pelo DataFrame exportado, de forma atômica"""
+
+    def copiar(self, destino: str):
+        """Copia o arquivo atual (backups)"""
+        shutil.copy2(self.caminho, destino)
+
+
+class ArmazenamentoArquivo(ArmazenamentoTransacoes):
+    """Formato de arquivo único, regravado inteiro a cada gravação"""
+
+    def gravar(self, dados: pd.DataFrame):
+        """Substitui o conteúdo inteiro (arquivo temporário + troca atômica)"""
+        temporario = f"{self.caminho}.tmp"
+        self._gravar_arquivo(dados, temporario)
+        os.replace(temporario, self.caminho)
+
+    @abstractmethod
+    def _gravar_arquivo(self, dados: pd.DataFrame, caminho: str):
+        """Grava o DataFrame exportado no caminho informado"""
+
+
+class ArmazenamentoCSV(ArmazenamentoArquivo):
+    """CSV com cabeçalho; tudo é lido como texto e convertido pelo DataManager"""
+
+    extensao = '.csv'
+
+    def ler(self, inicio: Optional[date] = None, fim: Optional[date] = None) -> pd.DataFrame:
+        return pd.read_csv(self.caminho, encoding='utf-8')
+
+    def _gravar_arquivo(self, dados: pd.DataFrame, caminho: str):
+        dados.to_csv(caminho, index=False, encoding='utf-8')
+
+
+class ArmazenamentoParquet(ArmazenamentoArquivo):
+    """
+    Parquet com colunas tipadas: datas como date32, valores como float64,
+    Recorrente como booleano e Tipo, Tipo Gasto, Categoria e Meta 50-30-20
+    com codificação de dicionário
+
+    Cada mês vira um row group (o livro é gravado em ordem de data), e as
+    estatísticas de mínimo e máximo da coluna Data deixam a leitura de um
+    período pular os meses de fora sem descomprimi-los.
+    """
+
+    extensao = '.parquet'
+
+    def __init__(self, data_dir: str):
+        if pa is None:
+            raise ImportError("O armazenamento Parquet requer o pacote pyarrow (pip install pyarrow)")
+        super().__init__(data_dir)
+        categorica = pa.dictionary(pa.int32(), pa.string())
+        self.esquema = pa.schema([
+            ('ID', pa.int64()),
+            ('Data', pa.date32()),
+            ('Tipo', categorica),
+            ('Tipo Gasto', categorica),
+            ('Categoria', categorica),
+            ('Descrição', pa.string()),
+            ('Valor (R$)', pa.float64()),
+            ('Recorrente', pa.bool_()),
+            ('Semana', pa.int8()),
+            ('Saldo Acumulado', pa.float64()),
+            ('% do Salário', pa.float64()),
+            ('Meta 50-30-20', categorica),
+        ])
+
+    def ler(self, inicio: Optional[date] = None, fim: Optional[date] = None) -> pd.DataFrame:
+        filtros = []
+        if inicio is not None:
+            filtros.append(('Data', '>=', inicio))
+        if fim is not None:
+            filtros.append(('Data', '<=', fim))
+        tabela = pq.read_table(self.caminho, filters=filtros or None)
+        return tabela.to_pandas(date_as_object=False)
+
+    def _gravar_arquivo(self, dados: pd.DataFrame, caminho: str):
+        datas = pd.to_datetime(dados['Data'])
+        tipado = pd.DataFrame({
+            'ID': dados['ID'],
+            'Data': datas.dt.date,
+            'Tipo': dados['Tipo'],
+            'Tipo Gasto': dados['Tipo Gasto'],
+            'Categoria': dados['Categoria'],
+            'Descrição': dados['Descrição'].astype(str),
+            'Valor (R$)': dados['Valor (R$)'],
+            'Recorrente': dados['Recorrente'].eq('Sim'),
+            'Semana': dados['Semana'],
+            'Saldo Acumulado': dados['Saldo Acumulado'],
+            # '12.5%' -> 12.5 (vazio quando o mês não tem renda)
+            '% do Salário': pd.to_numeric(dados['% do Salário'].astype(str).str.rstrip('%'), errors='coerce'),
+            'Meta 50-30-20': dados['Meta 50-30-20'],
+        })
+        tabela = pa.Table.from_pandas(tipado, schema=self.esquema, preserve_index=False)
+
+        # Um row group por mês: o livro está ordenado, então cada mês é um trecho contíguo
+        meses = (datas.dt.year * 12 + datas.dt.month).to_numpy()
+        limites = np.concatenate([[0], np.flatnonzero(np.diff(meses)) + 1, [len(meses)]])
+        with pq.ParquetWriter(caminho, self.esquema) as escritor:
+            if not len(meses):
+                escritor.write_table(tabela)
+                return
+            for inicio, fim in zip(limites[:-1], limites[1:]):
+                escritor.write_table(tabela.slice(inicio, fim - inicio), row_group_size=fim - inicio)
+
+
+# Tabelas do banco SQLite. As de cartões, metas, orçamentos e lembretes têm
+# uma coluna por campo da dataclass correspondente, com o mesmo nome
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS transacoes (
+    id INTEGER PRIMARY KEY,
+    ordem INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    tipo_gasto TEXT,
+    categoria TEXT NOT NULL,
+    descricao TEXT NOT NULL,
+    valor REAL NOT NULL,
+    recorrente INTEGER NOT NULL,
+    semana INTEGER,
+    saldo_acumulado REAL,
+    percentual_salario REAL,
+    status_meta TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transacoes_data ON transacoes (data);
+CREATE INDEX IF NOT EXISTS idx_transacoes_categoria_data ON transacoes (categoria, data);
+
+CREATE TABLE IF NOT EXISTS cartoes (
+    id TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    bandeira TEXT NOT NULL,
+    limite_total REAL NOT NULL,
+    limite_usado REAL NOT NULL,
+    dia_vencimento INTEGER NOT NULL,
+    dia_fechamento INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    cor TEXT
+);
+
+CREATE TABLE IF NOT EXISTS transacoes_cartao (
+    id TEXT PRIMARY KEY,
+    cartao_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    descricao TEXT NOT NULL,
+    valor REAL NOT NULL,
+    categoria TEXT,
+    parcelas INTEGER NOT NULL,
+    parcela_atual INTEGER NOT NULL,
+    estabelecimento TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transacoes_cartao_cartao_id ON transacoes_cartao (cartao_id);
+
+CREATE TABLE IF NOT EXISTS metas (
+    id TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    valor_meta REAL NOT NULL,
+    valor_atual REAL NOT NULL,
+    data_inicio TEXT NOT NULL,
+    data_fim TEXT NOT NULL,
+    categoria TEXT,
+    descricao TEXT,
+    status TEXT NOT NULL,
+    cor TEXT
+);
+
+CREATE TABLE IF NOT EXISTS orcamentos (
+    categoria TEXT NOT NULL,
+    valor_orcado REAL NOT NULL,
+    valor_gasto REAL NOT NULL,
+    mes INTEGER NOT NULL,
+    ano INTEGER NOT NULL,
+    PRIMARY KEY (categoria, ano, mes)
+);
+
+CREATE TABLE IF NOT EXISTS lembretes (
+    id TEXT PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    descricao TEXT,
+    tipo TEXT NOT NULL,
+    data_vencimento TEXT NOT NULL,
+    valor REAL NOT NULL,
+    prioridade TEXT NOT NULL,
+    status TEXT NOT NULL,
+    recorrente INTEGER NOT NULL,
+    categoria TEXT,
+    observacoes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS metadados (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Tabelas gravadas e lidas por gravar_tabelas/ler_tabela
+TABELAS_SISTEMAS = ('cartoes', 'transacoes_cartao', 'metas', 'orcamentos', 'lembretes')
+
+# Colunas do livro na ordem de inserção e o nome de cada uma no DataFrame exportado
+COLUNAS_LIVRO_SQLITE = (
+    ('id', 'ID'),
+    ('data', 'Data'),
+    ('tipo', 'Tipo'),
+    ('tipo_gasto', 'Tipo Gasto'),
+    ('categoria', 'Categoria'),
+    ('descricao', 'Descrição'),
+    ('valor', 'Valor (R$)'),
+    ('recorrente', 'Recorrente'),
+    ('semana', 'Semana'),
+    ('saldo_acumulado', 'Saldo Acumulado'),
+    ('percentual_salario', '% do Salário'),
+    ('status_meta', 'Meta 50-30-20'),
+)
+
+# Movimento de cada transação no saldo (mesma regra de models.transaction._movimento)
+_MOVIMENTO_SQL = "CASE WHEN tipo = :entrada THEN valor ELSE -ABS(valor) END"
+
+
+class ArmazenamentoSQLite(ArmazenamentoTransacoes):
+    """
+    Banco SQLite local com o livro e os dados dos demais gerenciadores
+    (cartões, metas, orçamentos e lembretes)
+
+    O banco usa WAL: leitores (agregados, carregar_periodo) não esperam a
+    gravação do livro, que acontece numa única transação (DELETE e
+    executemany). A tabela transacoes é indexada por data e por
+    (categoria, data), e guarda o tipo de gasto de cada transação, de modo
+    que os agregados mensais saem de consultas GROUP BY sem carregar o
+    histórico no pandas.
+    """
+
+    extensao = '.db'
+
+    def __init__(self, data_dir: str):
+        super().__init__(data_dir)
+        # Um só banco para o livro e os demais dados, não só transações
+        self.caminho = os.path.join(data_dir, f"fintrack360{self.extensao}")
+        self._esquema_criado = False
+
+    @contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        """Conexão nova por operação: o objeto sqlite3 não deve ser compartilhado entre os callbacks"""
+        with closing(sqlite3.connect(self.caminho, timeout=30)) as conexao:
+            if not self._esquema_criado:
+                # WAL fica gravado no arquivo; basta ativá-lo uma vez
+                conexao.execute("PRAGMA journal_mode=WAL")
+                conexao.executescript(ESQUEMA_SQLITE)
+                self._esquema_criado = True
+            # Com WAL, NORMAL só sincroniza nos checkpoints e continua imune a corrupção
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            yield conexao
+
+    def existe(self) -> bool:
+        """O banco pode existir só com cartões ou metas: o livro conta a partir da primeira gravação"""
+        if not os.path.exists(self.caminho):
+            return False
+        with self._conectar() as conexao:
+            return conexao.execute(
+                "SELECT 1 FROM metadados WHERE chave = 'livro_gravado_em'"
+            ).fetchone() is not None
+
+    def ler(self, inicio: Optional[date] = None, fim: Optional[date] = None) -> pd.DataFrame:
+        colunas = ', '.join(f'{coluna} AS "{nome}"' for coluna, nome in COLUNAS_LIVRO_SQLITE)
+        with self._conectar() as conexao:
+            df = pd.read_sql_query(
+                f"SELECT {colunas} FROM transacoes WHERE data BETWEEN ? AND ? ORDER BY ordem",
+                conexao, params=_limites(inicio, fim)
+            )
+        df['Recorrente'] = df['Recorrente'].astype(bool)
+        df['Tipo Gasto'] = df['Tipo Gasto'].fillna('')
+        return df
+
+    def gravar(self, dados: pd.DataFrame):
+        """Substitui o livro inteiro numa única transação: leitores veem o anterior até o commit"""
+        # Tipo de gasto gravado em cada transação na classificação (NULL nas entradas)
+        tipos_gasto = [tipo or None for tipo in dados['Tipo Gasto'].astype(str).tolist()]
+        linhas = zip(
+            dados['ID'].tolist(),
+            range(len(dados)),
+            pd.to_datetime(dados['Data']).dt.strftime('%Y-%m-%d').tolist(),
+            dados['Tipo'].astype(str).tolist(),
+            tipos_gasto,
+            dados['Categoria'].astype(str).tolist(),
+            dados['Descrição'].astype(str).tolist(),
+            dados['Valor (R$)'].tolist(),
+            dados['Recorrente'].eq('Sim').tolist(),
+            dados['Semana'].tolist(),
+            dados['Saldo Acumulado'].tolist(),
+            # '12.5%' -> 12.5 (NULL quando o mês não tem renda)
+            pd.to_numeric(dados['% do Salário'].astype(str).str.rstrip('%'), errors='coerce').tolist(),
+            dados['Meta 50-30-20'].astype(str).tolist(),
+        )
+        with self._conectar() as conexao, conexao:
+            conexao.execute("DELETE FROM transacoes")
+            conexao.executemany(
+                "INSERT INTO transacoes (id, ordem, data, tipo, tipo_gasto, categoria, descricao, valor, "
+                "recorrente, semana, saldo_acumulado, percentual_salario, status_meta) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                linhas
+            )
+            conexao.execute(
+                "INSERT OR REPLACE INTO metadados (chave, valor) VALUES ('livro_gravado_em', datetime('now'))"
+            )
+
+    def copiar(self, destino: str):
+        """Cópia consistente pela API de backup (o arquivo sozinho não inclui o que está no WAL)"""
+        with self._conectar() as conexao, closing(sqlite3.connect(destino)) as copia:
+            conexao.backup(copia)
+
+    # ------------------------------------------------------------------
+    # Agregados em SQL
+    # ------------------------------------------------------------------
+
+    def resumos_mensais(self, inicio: Optional[date] = None, fim: Optional[date] = None,
+                        pendentes: Sequence[tuple] = (), alteradas: Iterable[int] = ()) -> pd.DataFrame:
+        """
+        Agregados de cada mês com transações entre as datas (ambas inclusive)
+
+        Uma linha por mês: ano, mes, quantidade, renda, essencial, variavel,
+        investimento e saldo_final (saldo acumulado de todo o livro ao fim
+        do mês). pendentes e alteradas sobrepõem ao livro gravado as
+        alterações ainda só no diário: alteradas são os IDs cujas linhas
+        gravadas são ignoradas e pendentes as tuplas (id, data, tipo,
+        tipo_gasto, categoria, valor) que as substituem.
+        """
+        inicio_iso, fim_iso = _limites(inicio, fim)
+        parametros = {
+            'inicio': inicio_iso,
+            'fim': fim_iso,
+            'entrada': TipoTransacao.ENTRADA.value,
+            'essencial': TipoGasto.ESSENCIAL.value,
+            'variavel': TipoGasto.VARIAVEL.value,
+            'investimento': TipoGasto.INVESTIMENTO.value,
+        }
+        with self._conectar() as conexao:
+            livro = self._livro_efetivo(conexao, pendentes, alteradas)
+            resumos = pd.read_sql_query(
+                f"""{livro}
+                SELECT CAST(substr(data, 1, 4) AS INTEGER) AS ano,
+                       CAST(substr(data, 6, 2) AS INTEGER) AS mes,
+                       COUNT(*) AS quantidade,
+                       TOTAL(CASE WHEN tipo = :entrada THEN ABS(valor) END) AS renda,
+                       TOTAL(CASE WHEN tipo_gasto = :essencial THEN ABS(valor) END) AS essencial,
+                       TOTAL(CASE WHEN tipo_gasto = :variavel THEN ABS(valor) END) AS variavel,
+                       TOTAL(CASE WHEN tipo_gasto = :investimento THEN ABS(valor) END) AS investimento,
+                       TOTAL({_MOVIMENTO_SQL}) AS fluxo
+                FROM livro
+                WHERE data BETWEEN :inicio AND :fim
+                GROUP BY ano, mes
+                ORDER BY ano, mes""",
+                conexao, params=parametros
+            )
+            saldo_anterior = 0.0
+            if inicio is not None:
+                saldo_anterior = conexao.execute(
+                    f"{livro} SELECT TOTAL({_MOVIMENTO_SQL}) FROM livro WHERE data < :inicio", parametros
+                ).fetchone()[0]
+        resumos['saldo_final'] = saldo_anterior + resumos.pop('fluxo').cumsum()
+        return resumos
+
+    def gastos_por_categoria(self, inicio: Optional[date] = None, fim: Optional[date] = None,
+                             categoria: Optional[str] = None, pendentes: Sequence[tuple] = (),
+                             alteradas: Iterable[int] = ()) -> pd.DataFrame:
+        """
+        Gastos (saídas e investimentos) por mês e categoria entre as datas:
+        colunas ano, mes, categoria e total
+
+        Com categoria, a consulta percorre só o trecho dela no índice
+        (categoria, data). pendentes e alteradas como em resumos_mensais.
+        """
+        inicio_iso, fim_iso = _limites(inicio, fim)
+        parametros = {'inicio': inicio_iso, 'fim': fim_iso, 'entrada': TipoTransacao.ENTRADA.value,
+                      'categoria': categoria}
+        filtro_categoria = "AND categoria = :categoria" if categoria is not None else ""
+        with self._conectar() as conexao:
+            livro = self._livro_efetivo(conexao, pendentes, alteradas)
+            return pd.read_sql_query(
+                f"""{livro}
+                SELECT CAST(substr(data, 1, 4) AS INTEGER) AS ano,
+                       CAST(substr(data, 6, 2) AS INTEGER) AS mes,
+                       categoria,
+                       TOTAL(ABS(valor)) AS total
+                FROM livro
+                WHERE data BETWEEN :inicio AND :fim AND tipo <> :entrada {filtro_categoria}
+                GROUP BY ano, mes, categoria
+                ORDER BY ano, mes, categoria""",
+                conexao, params=parametros
+            )
+
+    @staticmethod
+    def _livro_efetivo(conexao: sqlite3.Connection, pendentes: Sequence[tuple],
+                       alteradas: Iterable[int]) -> str:
+        """
+        Cláusula WITH que define `livro`: a tabela gravada, ou, havendo
+        alterações pendentes, a tabela sem os IDs alterados mais as linhas
+        pendentes (em tabelas temporárias da conexão)
+        """
+        alteradas = list(alteradas)
+        if not alteradas:
+            return "WITH livro AS (SELECT data, tipo, tipo_gasto, categoria, valor FROM transacoes)"
+        conexao.execute("CREATE TEMP TABLE alteradas (id INTEGER PRIMARY KEY)")
+        conexao.execute(
+            "CREATE TEMP TABLE pendentes (id INTEGER PRIMARY KEY, data TEXT, tipo TEXT, tipo_gasto TEXT, "
+            "categoria TEXT, valor REAL)"
+        )
+        conexao.executemany("INSERT INTO temp.alteradas (id) VALUES (?)", ((id_,) for id_ in alteradas))
+        conexao.executemany("INSERT INTO temp.pendentes VALUES (?, ?, ?, ?, ?, ?)", pendentes)
+        return """WITH livro AS (
+            SELECT data, tipo, tipo_gasto, categoria, valor FROM transacoes
+            WHERE id NOT IN (SELECT id FROM temp.alteradas)
+            UNION ALL
+            SELECT data, tipo, tipo_gasto, categoria, valor FROM temp.pendentes
+        )"""
+
+    # ------------------------------------------------------------------
+    # Cartões, metas, orçamentos e lembretes
+    # ------------------------------------------------------------------
+
+    def gravar_tabelas(self, tabelas: Dict[str, Tuple[Sequence[str], Iterable[tuple]]]):
+        """Substitui o conteúdo das tabelas informadas (tabela -> (colunas, linhas)) numa única transação"""
+        with self._conectar() as conexao, conexao:
+            for tabela, (colunas, linhas) in tabelas.items():
+                _validar_tabela(tabela)
+                conexao.execute(f"DELETE FROM {tabela}")
+                conexao.executemany(
+                    f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})",
+                    linhas
+                )
+
+    def ler_tabela(self, tabela: str, colunas: Sequence[str]) -> List[tuple]:
+        """Linhas da tabela, com as colunas na ordem pedida"""
+        _validar_tabela(tabela)
+        with self._conectar() as conexao:
+            return conexao.execute(f"SELECT {', '.join(colunas)} FROM {tabela} ORDER BY rowid").fetchall()
+
+
+def _limites(inicio: Optional[date], fim: Optional[date]) -> Tuple[str, str]:
+    """Datas ISO para BETWEEN; sem limite, o período fica aberto daquele lado"""
+    return (inicio.isoformat() if inicio is not None else '0001-01-01',
+            fim.isoformat() if fim is not None else '9999-12-31')
+
+
+def _validar_tabela(tabela: str):
+    if tabela not in TABELAS_SISTEMAS:
+        raise ValueError(f"Tabela desconhecida: {tabela}")
+
+
+ARMAZENAMENTOS = {
+    'csv': ArmazenamentoCSV,
+    'parquet': ArmazenamentoParquet,
+    'sqlite': ArmazenamentoSQLite,
+}
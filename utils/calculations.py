@@ -20,8 +20,9 @@ class CalculadoraFinanceira:
         Returns:
             Dict com valores ideais, reais e diferenças
         """
-        renda_mensal = self.gerenciador.obter_renda_mensal(mes, ano)
-        gastos_por_tipo = self.gerenciador.obter_gastos_por_tipo(mes, ano)
+        resumo = self.gerenciador.obter_resumo_mes(mes, ano)
+        renda_mensal = resumo.renda
+        gastos_por_tipo = resumo.gastos_por_tipo
         
         # Valores ideais
         ideal_essencial = renda_mensal * 0.50
@@ -125,23 +126,22 @@ class CalculadoraFinanceira:
     
     def calcular_gastos_por_categoria(self, mes: int, ano: int) -> Dict[str, float]:
         """Calcula gastos detalhados por categoria específica"""
-        transacoes_mes = self.gerenciador.obter_transacoes_mes(mes, ano)
-        gastos_categoria = {}
-        
-        for transacao in transacoes_mes:
-            if transacao.tipo_transacao != TipoTransacao.ENTRADA:
-                categoria = transacao.categoria
-                if categoria not in gastos_categoria:
-                    gastos_categoria[categoria] = 0.0
-                gastos_categoria[categoria] += abs(transacao.valor)
-        
-        return gastos_categoria
+        return self.gerenciador.obter_gastos_por_categoria(mes, ano)
     
     def calcular_kpis_mensais(self, mes: int, ano: int) -> Dict[str, float]:
         """Calcula os principais KPIs do mês"""
-        renda_mensal = self.gerenciador.obter_renda_mensal(mes, ano)
-        gastos_por_tipo = self.gerenciador.obter_gastos_por_tipo(mes, ano)
-        saldo_atual = self.gerenciador.obter_saldo_atual(mes, ano)
+        return self.kpis_do_resumo(self.gerenciador.obter_resumo_mes(mes, ano))
+    
+    def calcular_kpis_periodo(self, inicio: date, fim: date) -> Dict[str, float]:
+        """Calcula os mesmos KPIs do mês para um período qualquer (datas inclusive)"""
+        return self.kpis_do_resumo(self.gerenciador.obter_resumo_periodo(inicio, fim))
+    
+    @staticmethod
+    def kpis_do_resumo(resumo) -> Dict[str, float]:
+        """Monta os KPIs a partir dos agregados de um mês ou período (também os lidos do SQLite)"""
+        renda_mensal = resumo.renda
+        gastos_por_tipo = resumo.gastos_por_tipo
+        saldo_atual = resumo.saldo_final
 
         total_gastos = sum(gastos_por_tipo.values())
         economia_mensal = renda_mensal - total_gastos
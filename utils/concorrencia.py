@@ -0,0 +1,116 @@
+"""
+Primitivas de concorrência para FinTrack360
+
+Os gerenciadores são objetos globais compartilhados pelos callbacks do Dash;
+com o servidor em modo threaded, leituras e escritas acontecem ao mesmo tempo.
+Cada gerenciador guarda um LockLeituraEscrita em `self._lock` e marca seus
+métodos com os decoradores `leitura` e `escrita`.
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class LockLeituraEscrita:
+    """
+    Lock de leitura/escrita reentrante, com preferência para escritores
+
+    Vários leitores entram ao mesmo tempo; um escritor entra sozinho. Um
+    escritor esperando bloqueia a entrada de novos leitores, para que um
+    fluxo contínuo de leituras não o deixe esperando para sempre.
+
+    Reentrância por thread: quem lê pode ler de novo (mesmo com escritor
+    na fila) e quem escreve pode ler ou escrever de novo. Promover leitura
+    a escrita levanta RuntimeError: dois leitores tentando a promoção
+    esperariam um pelo outro indefinidamente.
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition(threading.Lock())
+        self._leitores: Dict[int, int] = {}  # thread -> leituras em aberto
+        self._escritor: Optional[int] = None
+        self._escritas = 0
+        self._escritores_aguardando = 0
+
+    def adquirir_leitura(self):
+        thread = threading.get_ident()
+        with self._condicao:
+            if thread in self._leitores or self._escritor == thread:
+                self._leitores[thread] = self._leitores.get(thread, 0) + 1
+                return
+            while self._escritor is not None or self._escritores_aguardando:
+                self._condicao.wait()
+            self._leitores[thread] = 1
+
+    def liberar_leitura(self):
+        thread = threading.get_ident()
+        with self._condicao:
+            restantes = self._leitores[thread] - 1
+            if restantes:
+                self._leitores[thread] = restantes
+                return
+            del self._leitores[thread]
+            if not self._leitores:
+                self._condicao.notify_all()
+
+    def adquirir_escrita(self):
+        thread = threading.get_ident()
+        with self._condicao:
+            if self._escritor == thread:
+                self._escritas += 1
+                return
+            if thread in self._leitores:
+                raise RuntimeError("Não é possível promover um lock de leitura a escrita")
+            self._escritores_aguardando += 1
+            try:
+                while self._escritor is not None or self._leitores:
+                    self._condicao.wait()
+            finally:
+                self._escritores_aguardando -= 1
+            self._escritor = thread
+            self._escritas = 1
+
+    def liberar_escrita(self):
+        with self._condicao:
+            if self._escritor != threading.get_ident():
+                raise RuntimeError("Lock de escrita liberado por thread que não o detém")
+            self._escritas -= 1
+            if not self._escritas:
+                self._escritor = None
+                self._condicao.notify_all()
+
+    @contextmanager
+    def leitura(self) -> Iterator[None]:
+        self.adquirir_leitura()
+        try:
+            yield
+        finally:
+            self.liberar_leitura()
+
+    @contextmanager
+    def escrita(self) -> Iterator[None]:
+        self.adquirir_escrita()
+        try:
+            yield
+        finally:
+            self.liberar_escrita()
+
+
+def leitura(metodo: Callable) -> Callable:
+    """Executa o método sob o lock de leitura `_lock` da instância"""
+    @wraps(metodo)
+    def envolvido(self, *args, **kwargs) -> Any:
+        with self._lock.leitura():
+            return metodo(self, *args, **kwargs)
+    return envolvido
+
+
+def escrita(metodo: Callable) -> Callable:
+    """Executa o método sob o lock de escrita `_lock` da instância"""
+    @wraps(metodo)
+    def envolvido(self, *args, **kwargs) -> Any:
+        with self._lock.escrita():
+            return metodo(self, *args, **kwargs)
+    return envolvido
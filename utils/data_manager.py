@@ -2,39 +2,148 @@
 Gerenciador de persistência de dados para FinTrack360
 """
 
+import numpy as np
 import pandas as pd
+import calendar
 import json
 import os
+import threading
+import warnings
+from dataclasses import fields
 from datetime import datetime, date
-from typing import List, Dict, Optional
-from models.transaction import GerenciadorTransacoes, Transacao
-from models.categories import TipoTransacao, TipoGasto
+from enum import Enum
+from functools import partial
+from typing import Any, List, Dict, Optional, Set, Tuple
+from models.transaction import GerenciadorTransacoes, ResumoMensal, Transacao
+from models.transaction_columnar import GerenciadorTransacoesColunar
+from models.categories import TipoTransacao, TipoGasto, TAMANHO_BLOCO_PARALELO
+from utils.armazenamento import ARMAZENAMENTOS, ArmazenamentoSQLite
+
+# Motores de armazenamento de transações: lista de objetos ou colunas NumPy
+MOTORES_TRANSACOES = {
+    'lista': GerenciadorTransacoes,
+    'colunar': GerenciadorTransacoesColunar,
+}
+
+# Registros acumulados no diário antes de compactá-lo no arquivo principal
+LIMITE_DIARIO = 1000
+
+# Formatos aceitos na coluna de data em texto, na ordem em que são tentados:
+# o ISO gravado por salvar_transacoes e o dia/mês/ano de arquivos antigos
+FORMATOS_DATA = ('%Y-%m-%d', '%d/%m/%Y')
+
+def _converter_datas(valores: pd.Series, flexivel: bool = False) -> pd.Series:
+    """
+    Converte a coluna inteira de datas; cada formato seguinte só é tentado nas linhas ainda não convertidas
+    
+    Com flexivel=True (extratos de outros bancos), o que nenhum formato fixo
+    converteu passa pela inferência do pandas, valor a valor e com o dia
+    primeiro ('2024-01-15 10:30:00', '15/01/24', 'Jan 15 2024'...).
+    """
+    if pd.api.types.is_datetime64_any_dtype(valores):
+        return valores
+    datas = pd.to_datetime(valores, format=FORMATOS_DATA[0], errors='coerce')
+    for formato in FORMATOS_DATA[1:]:
+        pendentes = datas.isna() & valores.notna()
+        if not pendentes.any():
+            break
+        datas[pendentes] = pd.to_datetime(valores[pendentes], format=formato, errors='coerce')
+    
+    pendentes = datas.isna() & valores.notna()
+    if flexivel and pendentes.any():
+        # Cada texto distinto é inferido uma vez; formatos diferentes podem conviver na coluna.
+        # Textos com o ano primeiro ignoram dayfirst, e o pandas avisa a cada um
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            convertidas = {
+                texto: pd.to_datetime(texto, dayfirst=True, errors='coerce')
+                for texto in valores[pendentes].astype(str).unique()
+            }
+        datas[pendentes] = pd.to_datetime(valores[pendentes].astype(str).map(convertidas))
+    return datas
+
+def _para_sqlite(valor: Any) -> Any:
+    """Campo de dataclass -> valor de coluna SQLite (enums pelo valor, datas em ISO)"""
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+def _de_sqlite(tipo: type, valor: Any) -> Any:
+    """Valor de coluna SQLite -> campo de dataclass do tipo declarado"""
+    if valor is None:
+        return valor
+    if isinstance(tipo, type) and issubclass(tipo, Enum):
+        return tipo(valor)
+    if tipo is date:
+        return date.fromisoformat(valor)
+    if tipo is bool:
+        return bool(valor)
+    return valor
 
 class DataManager:
     """Classe responsável por salvar e carregar dados"""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", motor: str = "lista", limite_diario: int = LIMITE_DIARIO,
+                 armazenamento: str = "csv"):
+        if motor not in MOTORES_TRANSACOES:
+            raise ValueError(f"Motor de transações desconhecido: {motor}")
+        if armazenamento not in ARMAZENAMENTOS:
+            raise ValueError(f"Formato de armazenamento desconhecido: {armazenamento}")
+        
         self.data_dir = data_dir
+        self.motor = motor
         self.csv_file = os.path.join(data_dir, "transactions.csv")
+        
+        # Arquivo principal do livro: 'csv' (texto), 'parquet' (colunas tipadas, requer pyarrow)
+        # ou 'sqlite' (banco com o livro e os demais gerenciadores, agregados em SQL)
+        self.formato_armazenamento = armazenamento
+        self.armazenamento = ARMAZENAMENTOS[armazenamento](data_dir)
         self.backup_dir = os.path.join(data_dir, "backups")
         
+        # Diário (write-ahead log) das alterações posteriores ao último arquivo gravado:
+        # salvar uma transação custa um append com fsync, não reescrever o livro inteiro
+        self.journal_file = os.path.join(data_dir, "transactions_journal.jsonl")
+        self.limite_diario = limite_diario
+        self._pendentes_diario: List[Tuple[int, str]] = []  # (versão do livro, linha do diário)
+        self._lock_diario = threading.Lock()
+        
+        # Linhas descartadas na última carga/importação (com número da linha e motivo)
+        self.linhas_rejeitadas = pd.DataFrame()
+        
         # Criar diretórios se não existirem
         os.makedirs(data_dir, exist_ok=True)
         os.makedirs(self.backup_dir, exist_ok=True)
     
+    def _novo_gerenciador(self):
+        """Cria um gerenciador vazio do motor configurado"""
+        return MOTORES_TRANSACOES[self.motor]()
+    
     def salvar_transacoes(self, gerenciador: GerenciadorTransacoes) -> bool:
-        """Salva todas as transações em CSV"""
+        """
+        Salva todas as transações no arquivo principal e compacta o diário
+        
+        Chamado automaticamente quando o diário atinge limite_diario registros.
+        Do diário sobram só os registros posteriores ao snapshot gravado.
+        """
         try:
             # Criar backup antes de salvar
             self._criar_backup()
             
-            # Converter transações para DataFrame
-            df = gerenciador.exportar_para_dataframe()
+            # Snapshot consistente mesmo com callbacks escrevendo em paralelo
+            snapshot = gerenciador.snapshot()
             
-            # Salvar CSV
-            df.to_csv(self.csv_file, index=False, encoding='utf-8')
+            # Arquivo temporário + troca atômica: uma queda não deixa o arquivo pela metade
+            self.armazenamento.gravar(snapshot.dados)
             
-            print(f"Dados salvos com sucesso em {self.csv_file}")
+            with self._lock_diario:
+                self._pendentes_diario = [
+                    (versao, linha) for versao, linha in self._pendentes_diario if versao > snapshot.versao
+                ]
+                self._reescrever_diario([linha for _, linha in self._pendentes_diario])
+            
+            print(f"Dados salvos com sucesso em {self.armazenamento.caminho}")
             return True
             
         except Exception as e:
@@ -44,69 +153,426 @@ class DataManager:
     def load_data(self) -> pd.DataFrame:
         """Carrega dados como DataFrame para compatibilidade"""
         try:
-            if not os.path.exists(self.csv_file):
+            if not self.armazenamento.existe():
                 print("Arquivo de dados não encontrado. Retornando DataFrame vazio.")
                 return pd.DataFrame()
 
-            df = pd.read_csv(self.csv_file)
+            df = self.armazenamento.ler()
             return df
 
         except Exception as e:
             print(f"Erro ao carregar dados: {e}")
             return pd.DataFrame()
 
-    def carregar_transacoes(self) -> Optional[GerenciadorTransacoes]:
-        """Carrega transações do CSV"""
+    def carregar_transacoes(self) -> GerenciadorTransacoes:
+        """
+        Carrega transações do arquivo principal e reaplica o diário
+        
+        O gerenciador devolvido registra no diário cada inserção, edição e
+        remoção; não é preciso chamar salvar_transacoes a cada alteração.
+        Sem arquivo, devolve um gerenciador vazio (também ligado ao diário).
+        
+        Raises:
+            RuntimeError: o arquivo ou o diário existem mas não puderam ser
+                lidos. Começar com um livro vazio esconderia os dados e a
+                próxima compactação gravaria o livro vazio por cima deles.
+        """
         try:
-            if not os.path.exists(self.csv_file):
-                print("Arquivo de dados não encontrado. Criando novo gerenciador.")
-                return GerenciadorTransacoes()
+            gerenciador = self._ler_gerenciador()
             
-            # Ler CSV
-            df = pd.read_csv(self.csv_file, encoding='utf-8')
-            
-            # Criar gerenciador
-            gerenciador = GerenciadorTransacoes()
+            # Alterações gravadas depois do último arquivo: reaplicadas e compactadas
+            if self._reproduzir_diario(gerenciador):
+                self.salvar_transacoes(gerenciador)
+        except Exception as e:
+            raise RuntimeError(
+                f"Não foi possível carregar o livro de {self.armazenamento.caminho} "
+                f"e do diário {self.journal_file}: {e}"
+            ) from e
+        
+        gerenciador.adicionar_ouvinte(partial(self._registrar_no_diario, gerenciador))
+        return gerenciador
+    
+    def carregar_periodo(self, inicio: date, fim: date) -> Optional[GerenciadorTransacoes]:
+        """
+        Carrega só as transações entre as datas (ambas inclusive), com o diário aplicado
+        
+        No Parquet, os meses fora do período nem são lidos do disco. O
+        gerenciador devolvido é somente para consulta: alterações nele não
+        vão para o diário, e o saldo acumulado parte de zero no início do
+        período.
+        """
+        try:
+            gerenciador = self._ler_gerenciador(inicio, fim)
+            self._reproduzir_diario(gerenciador, inicio, fim)
+            return gerenciador
             
-            # Converter DataFrame para transações
-            for _, row in df.iterrows():
-                try:
-                    # Converter data
-                    data_transacao = pd.to_datetime(row['Data']).date()
-                    
-                    # Extrair valores
-                    descricao = str(row['Descrição'])
-                    valor = float(row['Valor (R$)'])
-                    recorrente = row['Recorrente'] == 'Sim' if 'Recorrente' in row else False
-                    
-                    # Adicionar transação
-                    gerenciador.adicionar_transacao(
-                        data=data_transacao,
-                        descricao=descricao,
-                        valor=valor,
-                        recorrente=recorrente
-                    )
-                    
-                except Exception as e:
-                    print(f"Erro ao processar linha: {e}")
-                    continue
-            
-            print(f"Carregadas {len(gerenciador.transacoes)} transações")
+        except Exception as e:
+            print(f"Erro ao carregar dados: {e}")
+            return None
+    
+    def _ler_gerenciador(self, inicio: Optional[date] = None, fim: Optional[date] = None):
+        """Lê o arquivo principal (inteiro ou só o período) para um gerenciador novo, sem o diário"""
+        gerenciador = self._novo_gerenciador()
+        
+        if not self.armazenamento.existe():
+            if self.formato_armazenamento != 'csv' and os.path.exists(self.csv_file):
+                # Começar vazio aqui compactaria o diário do CSV num arquivo novo sem o resto do livro
+                raise FileNotFoundError(
+                    f"{self.armazenamento.caminho} não existe, mas há um CSV; converta-o com "
+                    f"DataManager(armazenamento='csv').migrar_armazenamento('{self.formato_armazenamento}')"
+                )
+            print("Arquivo de dados não encontrado. Criando novo gerenciador.")
             return gerenciador
+        
+        df = self.armazenamento.ler(inicio, fim)
+        
+        # Converter colunas inteiras; linhas que não convertem vão para linhas_rejeitadas
+        datas = _converter_datas(df['Data'])
+        valores = pd.to_numeric(df['Valor (R$)'], errors='coerce')
+        
+        # Formatos sem filtro na leitura (CSV) devolvem tudo; datas inválidas seguem para o relatório
+        no_periodo = pd.Series(True, index=df.index)
+        if inicio is not None:
+            no_periodo &= ~(datas < pd.Timestamp(inicio))
+        if fim is not None:
+            no_periodo &= ~(datas > pd.Timestamp(fim))
+        if not no_periodo.all():
+            df, datas, valores = df[no_periodo], datas[no_periodo], valores[no_periodo]
+        
+        validas = self._separar_rejeitadas(df, datas, valores)
+        
+        recorrentes = df['Recorrente'] if 'Recorrente' in df.columns else pd.Series(False, index=df.index)
+        linhas = pd.DataFrame({
+            'data': datas,
+            'descricao': df['Descrição'].astype(str),
+            'valor': valores,
+            # Texto 'Sim'/'Não' no CSV, booleano nos formatos tipados
+            'recorrente': recorrentes if pd.api.types.is_bool_dtype(recorrentes) else recorrentes.eq('Sim'),
+            # ID salvo por versões com edição/remoção (arquivos antigos não têm a coluna)
+            'id': pd.to_numeric(df['ID'], errors='coerce') if 'ID' in df.columns else np.nan
+        })[validas]
+        
+        # Classificar e adicionar todas as transações de uma vez
+        gerenciador.adicionar_transacoes(linhas)
+        
+        print(f"Carregadas {len(linhas)} transações")
+        return gerenciador
+    
+    def migrar_armazenamento(self, destino: str) -> bool:
+        """
+        Converte o livro do formato atual para outro (ex.: 'csv' -> 'parquet')
+        e passa a usar o novo formato
+        
+        Migração única, para ser feita sem o app rodando: o diário pendente
+        é aplicado e compactado no novo arquivo; o arquivo de origem fica
+        intacto como cópia.
+        """
+        if destino not in ARMAZENAMENTOS:
+            raise ValueError(f"Formato de armazenamento desconhecido: {destino}")
+        
+        try:
+            gerenciador = self._ler_gerenciador()
+            self._reproduzir_diario(gerenciador)
+            
+            self.armazenamento = ARMAZENAMENTOS[destino](self.data_dir)
+            self.formato_armazenamento = destino
+            with self._lock_diario:
+                self._pendentes_diario = []
+            return self.salvar_transacoes(gerenciador)
+            
+        except Exception as e:
+            print(f"Erro ao migrar armazenamento: {e}")
+            return False
+    
+    def obter_resumos_mensais(self, inicio: Optional[date] = None,
+                              fim: Optional[date] = None) -> Dict[Tuple[int, int], ResumoMensal]:
+        """
+        Agregados de cada mês com transações entre as datas, calculados no
+        SQLite com GROUP BY (requer armazenamento='sqlite')
+        
+        O livro não é carregado: do banco saem só as somas por mês. As
+        alterações ainda no diário entram por cima do livro gravado, então os
+        valores são os de obter_resumo_mes num gerenciador carregado.
+        """
+        armazenamento = self._armazenamento_sql()
+        pendentes, alteradas = self._alteracoes_do_diario()
+        
+        resumos = {}
+        for linha in armazenamento.resumos_mensais(inicio, fim, pendentes, alteradas).itertuples(index=False):
+            resumos[(int(linha.ano), int(linha.mes))] = ResumoMensal(
+                renda=linha.renda,
+                gastos_por_tipo={
+                    TipoGasto.ESSENCIAL: linha.essencial,
+                    TipoGasto.VARIAVEL: linha.variavel,
+                    TipoGasto.INVESTIMENTO: linha.investimento
+                },
+                saldo_final=linha.saldo_final,
+                quantidade=int(linha.quantidade)
+            )
+        gastos = armazenamento.gastos_por_categoria(inicio, fim, pendentes=pendentes, alteradas=alteradas)
+        for linha in gastos.itertuples(index=False):
+            resumos[(int(linha.ano), int(linha.mes))].gastos_por_categoria[linha.categoria] = linha.total
+        return resumos
+    
+    def obter_resumo_mes(self, mes: int, ano: int) -> ResumoMensal:
+        """Agregados do mês direto do SQLite (vazio se não houver transações)"""
+        inicio = date(ano, mes, 1)
+        fim = date(ano, mes, calendar.monthrange(ano, mes)[1])
+        return self.obter_resumos_mensais(inicio, fim).get((ano, mes), ResumoMensal())
+    
+    def calcular_kpis_mensais(self, mes: int, ano: int) -> Dict[str, float]:
+        """KPIs do mês (os de CalculadoraFinanceira.calcular_kpis_mensais) sem carregar o livro"""
+        from utils.calculations import CalculadoraFinanceira
+        
+        return CalculadoraFinanceira.kpis_do_resumo(self.obter_resumo_mes(mes, ano))
+    
+    def obter_gastos_categoria(self, categoria: str, inicio: Optional[date] = None,
+                               fim: Optional[date] = None) -> Dict[Tuple[int, int], float]:
+        """Gasto mensal de uma categoria, (ano, mes) -> total, pelo índice (categoria, data) do SQLite"""
+        armazenamento = self._armazenamento_sql()
+        pendentes, alteradas = self._alteracoes_do_diario()
+        gastos = armazenamento.gastos_por_categoria(inicio, fim, categoria, pendentes, alteradas)
+        return {
+            (int(ano), int(mes)): float(total)
+            for ano, mes, total in zip(gastos['ano'], gastos['mes'], gastos['total'])
+        }
+    
+    def _armazenamento_sql(self) -> ArmazenamentoSQLite:
+        if not isinstance(self.armazenamento, ArmazenamentoSQLite):
+            raise ValueError(
+                f"Operação disponível só com armazenamento='sqlite' (atual: '{self.formato_armazenamento}')"
+            )
+        return self.armazenamento
+    
+    def _alteracoes_do_diario(self) -> Tuple[List[tuple], Set[int]]:
+        """
+        Estado final das transações alteradas no diário, para os agregados em SQL
+        
+        Returns:
+            (pendentes, alteradas): as linhas (id, data, tipo, tipo_gasto,
+            categoria, valor) das transações inseridas ou editadas, e os IDs
+            de todas as transações tocadas (removidas inclusive)
+        """
+        gerenciador = GerenciadorTransacoes()
+        alteradas = set()
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, encoding='utf-8') as arquivo:
+                for linha in arquivo:
+                    try:
+                        registro = json.loads(linha)
+                        self._aplicar_registro(gerenciador, registro)
+                        alteradas.add(int(registro['id']))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        
+        pendentes = [
+            (t.id, t.data.isoformat(), t.tipo_transacao.value, t.tipo_gasto.value if t.tipo_gasto else None,
+             t.categoria, t.valor)
+            for t in gerenciador.transacoes
+        ]
+        return pendentes, alteradas
+    
+    def salvar_sistemas(self, cartoes=None, metas=None, lembretes=None) -> bool:
+        """
+        Grava no SQLite os gerenciadores informados: cartões (e suas
+        transações), metas (e orçamentos) e lembretes
+        
+        Cada gerenciador é lido sob seu lock de leitura; todas as tabelas
+        são substituídas numa única transação, com executemany.
+        """
+        try:
+            armazenamento = self._armazenamento_sql()
+            tabelas = {}
+            for gerenciador, especificacao in self._tabelas_sistemas(cartoes, metas, lembretes):
+                with gerenciador._lock.leitura():
+                    for tabela, classe, atributo in especificacao:
+                        colunas = [campo.name for campo in fields(classe)]
+                        tabelas[tabela] = (colunas, [
+                            tuple(_para_sqlite(getattr(item, coluna)) for coluna in colunas)
+                            for item in getattr(gerenciador, atributo)
+                        ])
+            armazenamento.gravar_tabelas(tabelas)
+            return True
+            
+        except Exception as e:
+            print(f"Erro ao salvar dados: {e}")
+            return False
+    
+    def carregar_sistemas(self, cartoes=None, metas=None, lembretes=None) -> bool:
+        """Substitui o conteúdo dos gerenciadores informados pelo que está gravado no SQLite"""
+        try:
+            armazenamento = self._armazenamento_sql()
+            for gerenciador, especificacao in self._tabelas_sistemas(cartoes, metas, lembretes):
+                conteudo = {}
+                for tabela, classe, atributo in especificacao:
+                    campos = fields(classe)
+                    conteudo[atributo] = [
+                        classe(**{campo.name: _de_sqlite(campo.type, valor) for campo, valor in zip(campos, linha)})
+                        for linha in armazenamento.ler_tabela(tabela, [campo.name for campo in campos])
+                    ]
+                with gerenciador._lock.escrita():
+                    for atributo, itens in conteudo.items():
+                        setattr(gerenciador, atributo, itens)
+            return True
             
         except Exception as e:
             print(f"Erro ao carregar dados: {e}")
-            return GerenciadorTransacoes()
+            return False
+    
+    @staticmethod
+    def _tabelas_sistemas(cartoes, metas, lembretes) -> List[Tuple[Any, Tuple[Tuple[str, type, str], ...]]]:
+        """Gerenciadores informados e, para cada um, (tabela, dataclass, atributo com a lista)"""
+        from sistema_cartoes import Cartao, TransacaoCartao
+        from sistema_metas import Meta, OrcamentoCategoria
+        from sistema_lembretes import Lembrete
+        
+        especificacoes = [
+            (cartoes, (('cartoes', Cartao, 'cartoes'), ('transacoes_cartao', TransacaoCartao, 'transacoes'))),
+            (metas, (('metas', Meta, 'metas'), ('orcamentos', OrcamentoCategoria, 'orcamentos'))),
+            (lembretes, (('lembretes', Lembrete, 'lembretes'),)),
+        ]
+        return [(gerenciador, especificacao) for gerenciador, especificacao in especificacoes if gerenciador is not None]
+    
+    def _registrar_no_diario(self, gerenciador: GerenciadorTransacoes, operacao: str,
+                             transacoes: List[Transacao], versao: int):
+        """Ouvinte do gerenciador: anexa as alterações ao diário com fsync e compacta ao atingir o limite"""
+        linhas = [json.dumps(self._registro_diario(operacao, t), ensure_ascii=False) for t in transacoes]
+        with self._lock_diario:
+            with open(self.journal_file, 'a', encoding='utf-8') as arquivo:
+                arquivo.write(''.join(f"{linha}\n" for linha in linhas))
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            self._pendentes_diario.extend((versao, linha) for linha in linhas)
+            compactar = len(self._pendentes_diario) >= self.limite_diario
+        
+        if compactar:
+            self.salvar_transacoes(gerenciador)
+    
+    @staticmethod
+    def _registro_diario(operacao: str, transacao: Transacao) -> Dict:
+        """
+        Registro do diário: a remoção só precisa do ID; inserção e edição levam
+        a transação inteira, com a classificação que ela tinha no livro
+        """
+        if operacao == 'remover':
+            return {'operacao': operacao, 'id': transacao.id}
+        return {
+            'operacao': operacao,
+            'id': transacao.id,
+            'data': transacao.data.isoformat(),
+            'descricao': transacao.descricao,
+            'valor': transacao.valor,
+            'recorrente': bool(transacao.recorrente),
+            'tipo_transacao': transacao.tipo_transacao.value,
+            'tipo_gasto': transacao.tipo_gasto.value if transacao.tipo_gasto else None,
+            'categoria': transacao.categoria
+        }
+    
+    @staticmethod
+    def _classificacao_do_registro(registro: Dict) -> Optional[tuple]:
+        """Classificação gravada no registro, ou None nos registros antigos (que são reclassificados)"""
+        if 'tipo_transacao' not in registro:
+            return None
+        tipo_gasto = registro['tipo_gasto']
+        return (
+            TipoTransacao(registro['tipo_transacao']),
+            TipoGasto(tipo_gasto) if tipo_gasto else None,
+            registro['categoria']
+        )
+    
+    def _reescrever_diario(self, linhas: List[str]):
+        """Substitui o diário pelas linhas informadas (vazio após uma compactação completa)"""
+        temporario = f"{self.journal_file}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(''.join(f"{linha}\n" for linha in linhas))
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self.journal_file)
+    
+    def _reproduzir_diario(self, gerenciador: GerenciadorTransacoes, inicio: Optional[date] = None,
+                           fim: Optional[date] = None) -> int:
+        """
+        Reaplica o diário sobre o gerenciador recém-carregado e retorna
+        quantas linhas ele tinha
+        
+        Os registros são idempotentes (inserção de um ID existente vira
+        edição; remoção de um ID ausente é ignorada): se uma queda acontecer
+        entre gravar o arquivo e esvaziar o diário, reaplicá-lo não duplica
+        nada. Com inicio/fim, uma transação que ficou fora do período vira
+        remoção.
+        """
+        if not os.path.exists(self.journal_file):
+            return 0
+        
+        total = 0
+        invalidos = 0
+        with open(self.journal_file, encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                total += 1
+                try:
+                    self._aplicar_registro(gerenciador, json.loads(linha), inicio, fim)
+                except (ValueError, KeyError, TypeError):
+                    # Ex.: última linha truncada por uma queda no meio da escrita
+                    invalidos += 1
+        
+        if total:
+            print(f"Reaplicadas {total - invalidos} alterações do diário")
+        if invalidos:
+            print(f"{invalidos} registro(s) inválido(s) no diário ignorado(s)")
+        return total
+    
+    @classmethod
+    def _aplicar_registro(cls, gerenciador: GerenciadorTransacoes, registro: Dict,
+                          inicio: Optional[date] = None, fim: Optional[date] = None):
+        """Aplica um registro do diário ao gerenciador, com a classificação gravada nele"""
+        id_transacao = int(registro['id'])
+        if registro['operacao'] == 'remover':
+            gerenciador.remover_transacao(id_transacao)
+            return
+        
+        data_transacao = date.fromisoformat(registro['data'])
+        if (inicio is not None and data_transacao < inicio) or (fim is not None and data_transacao > fim):
+            gerenciador.remover_transacao(id_transacao)
+        elif gerenciador.obter_transacao(id_transacao) is None:
+            gerenciador.adicionar_transacao(
+                data_transacao, registro['descricao'], float(registro['valor']),
+                bool(registro['recorrente']), classificacao=cls._classificacao_do_registro(registro),
+                id_transacao=id_transacao
+            )
+        else:
+            gerenciador.editar_transacao(
+                id_transacao, data_transacao, registro['descricao'], float(registro['valor']),
+                bool(registro['recorrente']), classificacao=cls._classificacao_do_registro(registro)
+            )
+    
+    def _separar_rejeitadas(self, df: pd.DataFrame, datas: pd.Series, valores: pd.Series) -> pd.Series:
+        """Guarda em linhas_rejeitadas as linhas com data ou valor inválidos e retorna a máscara das válidas"""
+        data_invalida = datas.isna()
+        valor_invalido = valores.isna()
+        validas = ~(data_invalida | valor_invalido)
+        
+        rejeitadas = df[~validas].copy()
+        # Número da linha no arquivo (a linha 1 é o cabeçalho)
+        rejeitadas.insert(0, 'Linha', rejeitadas.index + 2)
+        rejeitadas['Motivo'] = np.select(
+            [data_invalida[~validas] & valor_invalido[~validas], data_invalida[~validas]],
+            ['data e valor inválidos', 'data inválida'],
+            default='valor inválido'
+        )
+        self.linhas_rejeitadas = rejeitadas.reset_index(drop=True)
+        
+        if len(rejeitadas):
+            print(f"{len(rejeitadas)} linha(s) rejeitada(s); detalhes em linhas_rejeitadas")
+        return validas
     
     def _criar_backup(self):
         """Cria backup do arquivo atual"""
-        if os.path.exists(self.csv_file):
+        if self.armazenamento.existe():
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = os.path.join(self.backup_dir, f"transactions_backup_{timestamp}.csv")
+            backup_file = os.path.join(self.backup_dir, f"transactions_backup_{timestamp}{self.armazenamento.extensao}")
             
             try:
-                import shutil
-                shutil.copy2(self.csv_file, backup_file)
+                self.armazenamento.copiar(backup_file)
                 print(f"Backup criado: {backup_file}")
             except Exception as e:
                 print(f"Erro ao criar backup: {e}")
@@ -122,14 +588,14 @@ class DataManager:
             df_principal = gerenciador.exportar_para_dataframe()
             
             # Criar análises por mês
-            meses_anos = set((t.data.year, t.data.month) for t in gerenciador.transacoes)
+            meses_anos = gerenciador.obter_meses()
             
             with pd.ExcelWriter(filename, engine='openpyxl') as writer:
                 # Aba principal com todas as transações
                 df_principal.to_excel(writer, sheet_name='Todas_Transações', index=False)
                 
                 # Aba para cada mês
-                for ano, mes in sorted(meses_anos):
+                for ano, mes in meses_anos:
                     transacoes_mes = gerenciador.obter_transacoes_mes(mes, ano)
                     if transacoes_mes:
                         # Criar DataFrame do mês
@@ -165,10 +631,10 @@ class DataManager:
         calc = CalculadoraFinanceira(gerenciador)
         
         # Obter meses únicos
-        meses_anos = set((t.data.year, t.data.month) for t in gerenciador.transacoes)
+        meses_anos = gerenciador.obter_meses()
         
         resumo_dados = []
-        for ano, mes in sorted(meses_anos):
+        for ano, mes in meses_anos:
             kpis = calc.calcular_kpis_mensais(mes, ano)
             distribuicao = calc.calcular_distribuicao_50_30_20(mes, ano)
             
@@ -190,7 +656,9 @@ class DataManager:
             df_resumo = pd.DataFrame(resumo_dados)
             df_resumo.to_excel(writer, sheet_name='Resumo_Mensal', index=False)
     
-    def importar_csv_externo(self, arquivo_csv: str, mapeamento_colunas: Dict[str, str]) -> Optional[GerenciadorTransacoes]:
+    def importar_csv_externo(self, arquivo_csv: str, mapeamento_colunas: Dict[str, str],
+                             paralelo: bool = False, max_workers: Optional[int] = None,
+                             tamanho_bloco: int = TAMANHO_BLOCO_PARALELO) -> Optional[GerenciadorTransacoes]:
         """
         Importa dados de CSV externo com mapeamento de colunas
         
@@ -198,33 +666,46 @@ class DataManager:
             arquivo_csv: Caminho para o arquivo CSV
             mapeamento_colunas: Dict mapeando colunas do CSV para campos esperados
                                 Ex: {'data': 'Data', 'descricao': 'Histórico', 'valor': 'Valor'}
+            paralelo: Classifica as descrições distintas em vários processos
+            max_workers: Número de processos usados quando paralelo=True
+            tamanho_bloco: Descrições distintas por tarefa quando paralelo=True
         """
         try:
             df = pd.read_csv(arquivo_csv, encoding='utf-8')
-            gerenciador = GerenciadorTransacoes()
+            gerenciador = self._novo_gerenciador()
             
-            for _, row in df.iterrows():
-                try:
-                    # Mapear colunas
-                    data_str = row[mapeamento_colunas['data']]
-                    descricao = str(row[mapeamento_colunas['descricao']])
-                    valor = float(str(row[mapeamento_colunas['valor']]).replace(',', '.'))
-                    
-                    # Converter data
-                    data_transacao = pd.to_datetime(data_str).date()
-                    
-                    # Adicionar transação
-                    gerenciador.adicionar_transacao(
-                        data=data_transacao,
-                        descricao=descricao,
-                        valor=valor
-                    )
-                    
-                except Exception as e:
-                    print(f"Erro ao processar linha: {e}")
-                    continue
-            
-            print(f"Importadas {len(gerenciador.transacoes)} transações do arquivo externo")
+            # Converter colunas inteiras; linhas que não convertem vão para linhas_rejeitadas
+            datas = _converter_datas(df[mapeamento_colunas['data']], flexivel=True)
+            valores = pd.to_numeric(
+                df[mapeamento_colunas['valor']].astype(str).str.replace(',', '.'), errors='coerce'
+            )
+            validas = self._separar_rejeitadas(df, datas, valores)
+            descricoes = df.loc[validas, mapeamento_colunas['descricao']].astype(str)
+            valores = valores[validas]
+            
+            # Classificar todas as descrições de uma vez
+            classificacoes = gerenciador.categorizador.classificar_lote(
+                descricoes, valores,
+                paralelo=paralelo, max_workers=max_workers, tamanho_bloco=tamanho_bloco
+            )
+            
+            linhas = [
+                {
+                    'data': data_transacao,
+                    'descricao': descricao,
+                    'valor': valor,
+                    'classificacao': classificacao
+                }
+                for data_transacao, descricao, valor, classificacao in zip(
+                    datas[validas].dt.date.tolist(), descricoes.tolist(), valores.tolist(),
+                    classificacoes.itertuples(index=False, name=None)
+                )
+            ]
+            
+            # Adicionar todas as transações de uma vez
+            gerenciador.adicionar_transacoes(linhas)
+            
+            print(f"Importadas {len(linhas)} transações do arquivo externo")
             return gerenciador
             
         except Exception as e: